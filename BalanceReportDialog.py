@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QTextBrowser,
+    QVBoxLayout,
+)
+
+from roster_analytics import BalanceReport
+
+
+class BalanceReportDialog(QDialog):
+    """
+    Shows the roster balance report. **Refresh** re-runs it after edits;
+    only trainers changed since the last run are re-read.
+    """
+
+    def __init__(self, build: Callable[[], tuple[BalanceReport, int, float]], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Roster balance report")
+        self.resize(900, 700)
+        self.build = build
+        self.report: BalanceReport | None = None
+
+        self.view = QTextBrowser()
+        self.status = QLabel()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        save_btn = QPushButton("Save as HTML…")
+        save_btn.clicked.connect(self.save_html)
+
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.status, 1)
+        bottom.addWidget(refresh_btn)
+        bottom.addWidget(save_btn)
+        lay = QVBoxLayout()
+        lay.addWidget(self.view)
+        lay.addLayout(bottom)
+        self.setLayout(lay)
+        self.refresh()
+
+    def refresh(self) -> None:
+        self.report, rebuilt, seconds = self.build()
+        self.view.setHtml(self.report.to_html())
+        self.status.setText(f"{rebuilt} trainer(s) re-read, report built in {seconds * 1000:.0f} ms")
+
+    def save_html(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "Save report", "balance_report.html", "HTML files (*.html)")
+        if not path or self.report is None:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.report.to_html())
+        except OSError as e:
+            QMessageBox.critical(self, "Save failed", str(e))
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import sys
-from datetime import datetime
 from typing import List
 
 from PyQt6.QtCore import pyqtSlot
@@ -18,8 +17,21 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QTabWidget,
     QMessageBox,
+    QFileDialog,
+    QListWidget,
 )
 
+from map_catalogue import MapCatalogue
+from opponents_header import OpponentsHeader
+from script_generators import (
+    ScriptSpec, render, render_dialog, render_starter, render_trainer, run_batch,
+)
+from pory_parser import PoryDocument
+from script_index import ScriptIndex, scan_text
+from script_log import ScriptLog
+from ScriptHistoryDialog import ScriptHistoryDialog
+from script_templates import registry
+
 
 class EventScriptEditor(QWidget):
     """
@@ -28,11 +40,11 @@ class EventScriptEditor(QWidget):
     • After pressing **Generate**, the widget reveals:
       – A short “script-ID” you paste into the Object Event in PoryMap  
       – The full Poryscript snippet (read-only) for copy-&-paste  
-    • Every script is logged to **generated_scripts.txt** in the same folder
-      as the .py / .exe.
+    • Every script is logged to **generated_scripts.jsonl** in the same folder
+      as the .py / .exe, and can be found and re-inserted from **History…**.
     • NEW: each generated script is automatically appended to the selected
-      map’s **scripts.pory** file. If a script with the same ID already
-      exists, the user is warned (in English) that overwriting may break the
+      map’s **scripts.pory** file. If any label it defines already exists
+      anywhere in the project, the user is warned (in English) that overwriting may break the
       build and is advised to use a unique name instead.
     """
 
@@ -56,12 +68,27 @@ class EventScriptEditor(QWidget):
         map_box = QVBoxLayout()
         map_box.addWidget(QLabel("Select map:"))
         map_box.addWidget(self.comboMapName)
+        batch_btn = QPushButton("Generate batch from spec file…")
+        batch_btn.setToolTip(
+            "JSON or CSV with kind (trainer/dialog/starter), map, name and the text fields.\n"
+            "Everything is checked first; each map's scripts.pory is then written once."
+        )
+        batch_btn.clicked.connect(self.generate_batch_from_file)
+        history_btn = QPushButton("History…")
+        history_btn.clicked.connect(self.show_history)
+        row = QHBoxLayout()
+        row.addWidget(batch_btn, 1)
+        row.addWidget(history_btn)
+        map_box.addLayout(row)
 
         # ---------- tabs ----------
         self.tabWidget = QTabWidget()
         self._build_trainer_tab()
         self._build_dialog_tab()
         self._build_starter_tab()
+        self._build_template_tabs()
+        self._build_edit_tab()
+        self.comboMapName.currentTextChanged.connect(self._load_existing_blocks)
 
         # ---------- assemble ----------
         outer = QVBoxLayout()
@@ -222,6 +249,64 @@ class EventScriptEditor(QWidget):
         tab.setLayout(lay)
         self.tabWidget.addTab(tab, "Starter Pokémon")
 
+    # ---- Other registered script types -------------------------------- #
+    def _build_template_tabs(self) -> None:
+        """One generic form per script type added through script_templates/*.json."""
+        for kind in registry().kinds():
+            if kind in ("trainer", "dialog", "starter"):
+                continue
+            template = registry().get(kind)
+            tab = QWidget()
+            name_edit = QLineEdit()
+            inputs = {}
+            lay = QVBoxLayout()
+            lay.addWidget(QLabel("Script name (without prefix):"))
+            lay.addWidget(name_edit)
+            for f in template.fields:
+                edit = QLineEdit(f.default)
+                inputs[f.key] = edit
+                lay.addWidget(QLabel(f"{f.label or f.key}:"))
+                lay.addWidget(edit)
+            output = QTextEdit()
+            output.setReadOnly(True)
+            output.setVisible(False)
+            gen_btn = QPushButton(f"Generate {template.title} Script")
+            gen_btn.clicked.connect(
+                lambda _=False, k=kind, n=name_edit, i=inputs, o=output:
+                    self.generate_template_script(k, n, i, o)
+            )
+            lay.addWidget(gen_btn)
+            lay.addWidget(output)
+            tab.setLayout(lay)
+            self.tabWidget.addTab(tab, template.title)
+
+    # ---- Edit existing ------------------------------------------------ #
+    def _build_edit_tab(self) -> None:
+        tab = QWidget()
+        self._edit_doc = None
+        self._edit_blocks = []
+        self.block_list = QListWidget()
+        self.block_list.currentRowChanged.connect(self._show_block)
+        self.block_editor = QTextEdit()
+        self.block_editor.setAcceptRichText(False)
+
+        save_btn = QPushButton("Save Block")
+        save_btn.clicked.connect(self.save_existing_block)
+        reload_btn = QPushButton("Reload")
+        reload_btn.clicked.connect(self._load_existing_blocks)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(reload_btn)
+        buttons.addWidget(save_btn)
+        lay = QVBoxLayout()
+        lay.addWidget(QLabel("Blocks in the selected map's scripts.pory:"))
+        lay.addWidget(self.block_list, 1)
+        lay.addWidget(self.block_editor, 2)
+        lay.addLayout(buttons)
+        tab.setLayout(lay)
+        self.edit_tab = tab
+        self.tabWidget.addTab(tab, "Edit Existing")
+
     # ------------------------------------------------------------------ #
     #  DATA HELPERS                                                      #
     # ------------------------------------------------------------------ #
@@ -239,16 +324,13 @@ class EventScriptEditor(QWidget):
         self._load_trainer_ids()
 
     def _populate_map_names(self) -> None:
+        current = self.comboMapName.currentText()
         self.comboMapName.clear()
-        maps_dir = os.path.join(self.project_folder, "data", "maps")
-        if not os.path.isdir(maps_dir):
+        if not self.project_folder:
             return
-        rels = [
-            os.path.relpath(r, maps_dir).replace("\\", "/")
-            for r, _, files in os.walk(maps_dir)
-            if "scripts.pory" in files
-        ]
-        self.comboMapName.addItems(sorted(rels))
+        self.comboMapName.addItems(MapCatalogue.for_project(self.project_folder).script_maps())
+        if current:
+            self.comboMapName.setCurrentText(current)
 
     def _load_trainer_ids(self) -> None:
         if not hasattr(self, "comboTrainerID"):
@@ -257,18 +339,7 @@ class EventScriptEditor(QWidget):
         path = os.path.join(self.project_folder, "include", "constants", "opponents.h")
         if not os.path.isfile(path):
             return
-        ids, inside = [], False
-        with open(path, encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if "#define TRAINER_COUNT" in line:
-                    break
-                if "#define TRAINER_NONE" in line:
-                    inside = True
-                    continue
-                if inside and line.startswith("#define TRAINER_"):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        ids.append(parts[1])
+        ids = OpponentsHeader.open(path).trainer_ids()
         self.comboTrainerID.addItems(sorted(ids))
 
     # ------------------------------------------------------------------ #
@@ -281,68 +352,86 @@ class EventScriptEditor(QWidget):
             else os.path.dirname(os.path.abspath(__file__))
         )
 
-    def _log(self, typ: str, sid: str, desc: str, content: str) -> None:
-        log_path = os.path.join(self._base_dir(), "generated_scripts.txt")
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = (
-            f"[{now}] TYPE: {typ.upper()} | ID: {sid}\n"
-            f"DESC: {desc}\n{'-'*40}\n{content.strip()}\n{'='*60}\n\n"
-        )
+    def _script_log(self) -> ScriptLog:
+        if getattr(self, "_log_store", None) is None:
+            self._log_store = ScriptLog(self._base_dir())
+        return self._log_store
+
+    def _log(self, generated) -> None:
         try:
-            with open(log_path, "a", encoding="utf-8") as fh:
-                fh.write(entry)
+            self._script_log().append([generated])
         except Exception as e:
             QMessageBox.critical(self, "Error saving log", str(e))
 
+    def close_log(self) -> None:
+        if getattr(self, "_log_store", None) is not None:
+            self._log_store.close()
+
+    @pyqtSlot()
+    def show_history(self) -> None:
+        try:
+            log = self._script_log()
+        except OSError as e:
+            QMessageBox.critical(self, "Error reading log", str(e))
+            return
+        ScriptHistoryDialog(log, self._reinsert, self).exec()
+
+    def _reinsert(self, record: dict) -> None:
+        map_rel = self.comboMapName.currentText()
+        if not map_rel:
+            QMessageBox.warning(self, "No map", "Select the map to insert the script into.")
+            return
+        script = record.get("script", "")
+        if record.get("map") and record["map"] != map_rel:
+            # labels carry the map prefix they were generated with
+            script = script.replace(record["map"].replace("/", "_") + "_", map_rel.replace("/", "_") + "_")
+        self._append_to_scripts_pory(map_rel, script)
+
     # ------------------------------------------------------------------ #
     #  FILE HELPERS                                                      #
     # ------------------------------------------------------------------ #
-    def _script_id_exists(self, path: str, sid: str) -> bool:
-        """Return True if a script with the given ID already exists in the file."""
-        if not os.path.isfile(path):
-            return False
-        with open(path, encoding="utf-8") as f:
-            for line in f:
-                if line.strip().startswith(f"script {sid} "):
-                    return True
-        return False
-
-    def _append_to_scripts_pory(self, map_rel: str, script: str, ids: list[str]) -> None:
-        """Append script to the map's scripts.pory, checking for duplicates."""
+    def _script_index(self) -> ScriptIndex:
+        """Project-wide label index, rescanning only files changed on disk."""
+        return ScriptIndex.for_project(self.project_folder)
+
+    def _append_to_scripts_pory(self, map_rel: str, script: str) -> None:
+        """Append script to the map's scripts.pory, checking every label it defines for clashes."""
         path = os.path.join(self.project_folder, "data", "maps", map_rel, "scripts.pory")
         if not os.path.isfile(path):
             QMessageBox.critical(self, "Missing File", f"scripts.pory not found:\n{path}")
             return
 
-        # check for duplicate IDs
-        for sid in ids:
-            if self._script_id_exists(path, sid):
-                reply = QMessageBox.question(
-                    self,
-                    "Script already exists",
-                    f"A script named '{sid}' already exists in scripts.pory.\n\n"
-                    "Overwriting may break other parts of the pokeemerald-expansion build "
-                    "if the script is already referenced. It is recommended to save with a "
-                    "unique name instead.\n\nDo you want to overwrite it?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return  # cancel entire operation
-                break  # user answered Yes → proceed
+        # Poryscript labels are global, so look across the whole project
+        index = self._script_index()
+        clashes = index.collisions(sym.name for sym in scan_text(script))
+        if clashes:
+            where = "\n".join(
+                f"  {name}  ({sym.where(self.project_folder)})" for name, sym in clashes.items()
+            )
+            reply = QMessageBox.question(
+                self,
+                "Script already exists",
+                f"These labels are already defined:\n{where}\n\n"
+                "Overwriting may break other parts of the pokeemerald-expansion build "
+                "if the script is already referenced. It is recommended to save with a "
+                "unique name instead.\n\nDo you want to overwrite it?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            )
+            if reply == QMessageBox.StandardButton.No:
+                return  # cancel entire operation
 
         try:
             with open(path, "a", encoding="utf-8") as f:
                 f.write(f"\n\n{script.strip()}\n")
         except Exception as e:
             QMessageBox.critical(self, "Error Writing File", str(e))
+        index.refresh_file(path)
+        if map_rel == self.comboMapName.currentText():
+            self._load_existing_blocks()
 
     # ------------------------------------------------------------------ #
     #  SCRIPT GENERATORS                                                 #
     # ------------------------------------------------------------------ #
-    @staticmethod
-    def _to_pascal(txt: str) -> str:
-        return "".join(p.capitalize() for p in txt.split("_"))
-
     # ---- Trainer ------------------------------------------------------ #
     @pyqtSlot()
     def generate_trainer_script(self) -> None:
@@ -352,35 +441,14 @@ class EventScriptEditor(QWidget):
         if not (map_rel and trainer_id and prefix):
             return
 
-        intro = self.trainer_intro.text().strip()
-        defeat = self.trainer_defeat.text().strip()
-        post = self.trainer_post.text().strip()
-
-        map_name = map_rel.replace("/", "_")
-        name = self._to_pascal(prefix)
-        sid = f"{map_name}_{name}_Battle"
-
-        script = f'''
-script {sid} {{
-    trainerbattle_single({trainer_id}, {map_name}_Text_{name}Intro, {map_name}_Text_{name}Defeated)
-    msgbox({map_name}_Text_{name}PostBattle)
-    waitmessage
-    closemessage
-    end
-}}
-
-text {map_name}_Text_{name}Intro {{
-    format("{intro}")
-}}
-
-text {map_name}_Text_{name}Defeated {{
-    format("{defeat}")
-}}
-
-text {map_name}_Text_{name}PostBattle {{
-    format("{post}")
-}}
-'''.strip()
+        generated = self._render(
+            render_trainer, map_rel, prefix, trainer_id,
+            self.trainer_intro.text().strip(),
+            self.trainer_defeat.text().strip(),
+            self.trainer_post.text().strip(),
+        )
+        if generated is None:
+            return
 
         # reveal & set
         for w in (
@@ -391,10 +459,10 @@ text {map_name}_Text_{name}PostBattle {{
         ):
             w.setVisible(True)
 
-        self.trainer_hint.setPlainText(sid)
-        self.trainer_output.setPlainText(script)
-        self._log("trainer", sid, f"Intro: {intro}", script)
-        self._append_to_scripts_pory(map_rel, script, [sid])
+        self.trainer_hint.setPlainText(generated.sid)
+        self.trainer_output.setPlainText(generated.script)
+        self._log(generated)
+        self._append_to_scripts_pory(map_rel, generated.script)
 
     # ---- Dialog ------------------------------------------------------- #
     @pyqtSlot()
@@ -404,24 +472,9 @@ text {map_name}_Text_{name}PostBattle {{
         if not (map_rel and prefix):
             return
 
-        dialog = self.dialog_text.toPlainText().strip()
-        map_name = map_rel.replace("/", "_")
-        name = self._to_pascal(prefix)
-        sid = f"{map_name}_{name}_Dialog"
-
-        script = f'''
-script {sid} {{
-    faceplayer
-    msgbox({map_name}_Text_{name}Dialog)
-    waitmessage
-    closemessage
-    end
-}}
-
-text {map_name}_Text_{name}Dialog {{
-    format("{dialog}")
-}}
-'''.strip()
+        generated = self._render(render_dialog, map_rel, prefix, self.dialog_text.toPlainText().strip())
+        if generated is None:
+            return
 
         for w in (
             self.lbl_dialog_hint,
@@ -431,10 +484,10 @@ text {map_name}_Text_{name}Dialog {{
         ):
             w.setVisible(True)
 
-        self.dialog_hint.setPlainText(sid)
-        self.dialog_output.setPlainText(script)
-        self._log("dialog", sid, f"Dialog: {dialog}", script)
-        self._append_to_scripts_pory(map_rel, script, [sid])
+        self.dialog_hint.setPlainText(generated.sid)
+        self.dialog_output.setPlainText(generated.script)
+        self._log(generated)
+        self._append_to_scripts_pory(map_rel, generated.script)
 
     # ---- Starter ------------------------------------------------------ #
     @pyqtSlot()
@@ -444,67 +497,14 @@ text {map_name}_Text_{name}Dialog {{
         if not (map_rel and prefix):
             return
 
-        s1, s2, s3 = (
+        generated = self._render(
+            render_starter, map_rel, prefix,
             self.starter1.currentText(),
             self.starter2.currentText(),
             self.starter3.currentText(),
         )
-        map_name = map_rel.replace("/", "_")
-        name = self._to_pascal(prefix)
-
-        sid_choose = f"{map_name}_{name}Choose"
-        sid_b1 = f"{map_name}_{name}Ball1"
-        sid_b2 = f"{map_name}_{name}Ball2"
-        sid_b3 = f"{map_name}_{name}Ball3"
-
-        script = f'''
-script {sid_choose} {{
-    lock
-    faceplayer
-    msgbox({map_name}_Text_{name}Choose)
-    waitmessage
-    closemessage
-    setvar VAR_RESULT 0
-    call {sid_b1}
-    call {sid_b2}
-    call {sid_b3}
-    end
-}}
-
-script {sid_b1} {{
-    checkflag FLAG_STARTER_CHOSEN_1
-    if SET, return
-    msgbox("You chose {s1}!")
-    givepokemon {s1}, 5
-    setflag FLAG_STARTER_CHOSEN_1
-    removeobject THIS_EVENT
-    return
-}}
-
-script {sid_b2} {{
-    checkflag FLAG_STARTER_CHOSEN_2
-    if SET, return
-    msgbox("You chose {s2}!")
-    givepokemon {s2}, 5
-    setflag FLAG_STARTER_CHOSEN_2
-    removeobject THIS_EVENT
-    return
-}}
-
-script {sid_b3} {{
-    checkflag FLAG_STARTER_CHOSEN_3
-    if SET, return
-    msgbox("You chose {s3}!")
-    givepokemon {s3}, 5
-    setflag FLAG_STARTER_CHOSEN_3
-    removeobject THIS_EVENT
-    return
-}}
-
-text {map_name}_Text_{name}Choose {{
-    format("Choose your starter Pokémon!")
-}}
-'''.strip()
+        if generated is None:
+            return
 
         for w in (
             self.lbl_start_hint,
@@ -517,18 +517,142 @@ text {map_name}_Text_{name}Choose {{
         ):
             w.setVisible(True)
 
-        self.st_hint_choose.setPlainText(sid_choose)
-        self.st_hint_b1.setPlainText(sid_b1)
-        self.st_hint_b2.setPlainText(sid_b2)
-        self.st_hint_b3.setPlainText(sid_b3)
-        self.starter_output.setPlainText(script)
-        self._log(
-            "starter",
-            sid_choose,
-            f"Starters: {s1}, {s2}, {s3}",
-            script,
+        for box, sid in zip(
+            (self.st_hint_choose, self.st_hint_b1, self.st_hint_b2, self.st_hint_b3),
+            generated.ids,
+        ):
+            box.setPlainText(sid)
+        self.starter_output.setPlainText(generated.script)
+        self._log(generated)
+        self._append_to_scripts_pory(map_rel, generated.script)
+
+    # ---- Other registered script types -------------------------------- #
+    def generate_template_script(self, kind: str, name_edit: QLineEdit,
+                                 inputs: dict, output: QTextEdit) -> None:
+        map_rel = self.comboMapName.currentText()
+        prefix = name_edit.text().strip()
+        if not (map_rel and prefix):
+            return
+        values = {key: edit.text().strip() for key, edit in inputs.items()}
+        generated = self._render(render, ScriptSpec(kind, map_rel, prefix, values))
+        if generated is None:
+            return
+        output.setPlainText("\n".join(generated.ids) + "\n\n" + generated.script)
+        output.setVisible(True)
+        self._log(generated)
+        self._append_to_scripts_pory(map_rel, generated.script)
+
+    def _render(self, renderer, *args):
+        """Run a renderer, showing bad input (e.g. an invalid ID) as a warning."""
+        try:
+            return renderer(*args)
+        except ValueError as e:
+            QMessageBox.warning(self, "Cannot generate script", str(e))
+            return None
+
+    # ---- Edit existing ------------------------------------------------ #
+    def _scripts_path(self, map_rel: str) -> str:
+        return os.path.join(self.project_folder, "data", "maps", map_rel, "scripts.pory")
+
+    @pyqtSlot()
+    def _load_existing_blocks(self) -> None:
+        self.block_list.clear()
+        self.block_editor.clear()
+        self._edit_doc = None
+        map_rel = self.comboMapName.currentText()
+        path = self._scripts_path(map_rel) if map_rel and self.project_folder else ""
+        if not os.path.isfile(path):
+            return
+        try:
+            self._edit_doc = PoryDocument.open(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Cannot parse scripts.pory", str(e))
+            return
+        self._edit_blocks = [b for b in self._edit_doc.blocks if b.name]
+        self.block_list.addItems(f"{b.kind}  {b.name}" for b in self._edit_blocks)
+
+    def _show_block(self, row: int) -> None:
+        if self._edit_doc is None or not 0 <= row < len(self._edit_blocks):
+            return
+        self.block_editor.setPlainText(self._edit_doc.block_text(self._edit_blocks[row]))
+
+    def show_block(self, map_rel: str, name: str) -> None:
+        """Open the Edit Existing tab on block *name* in *map_rel*'s scripts.pory."""
+        if self.comboMapName.findText(map_rel) < 0:
+            return
+        self.comboMapName.setCurrentText(map_rel)
+        if self._edit_doc is None or self._edit_doc.path != self._scripts_path(map_rel):
+            self._load_existing_blocks()
+        self.tabWidget.setCurrentWidget(self.edit_tab)
+        for row, block in enumerate(self._edit_blocks):
+            if block.name == name:
+                self.block_list.setCurrentRow(row)
+                break
+
+    @pyqtSlot()
+    def save_existing_block(self) -> None:
+        row = self.block_list.currentRow()
+        if self._edit_doc is None or not 0 <= row < len(self._edit_blocks):
+            return
+        doc, node = self._edit_doc, self._edit_blocks[row]
+        new_text = self.block_editor.toPlainText()
+
+        renamed = [s.name for s in scan_text(new_text) if s.name != node.name]
+        index = self._script_index()
+        clashes = index.collisions(renamed)
+        if clashes:
+            where = "\n".join(f"  {n}  ({s.where(self.project_folder)})" for n, s in clashes.items())
+            reply = QMessageBox.question(
+                self, "Script already exists",
+                f"These labels are already defined:\n{where}\n\nSave anyway?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            )
+            if reply == QMessageBox.StandardButton.No:
+                return
+        try:
+            doc.replace_block(node, new_text)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Block not saved", str(e))
+            return
+        index.refresh_file(doc.path)
+        self._edit_blocks = [b for b in doc.blocks if b.name]
+        self.block_list.blockSignals(True)
+        self.block_list.clear()
+        self.block_list.addItems(f"{b.kind}  {b.name}" for b in self._edit_blocks)
+        self.block_list.setCurrentRow(min(row, len(self._edit_blocks) - 1))
+        self.block_list.blockSignals(False)
+
+    # ---- Batch -------------------------------------------------------- #
+    @pyqtSlot()
+    def generate_batch_from_file(self) -> None:
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select script spec", self.project_folder, "Script specs (*.json *.csv)"
+        )
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                spec_text = f.read()
+            scripts = run_batch(self.project_folder, spec_text, self._script_log())
+        except ValueError as e:
+            lines = str(e).splitlines()
+            more = f"\n… and {len(lines) - 30} more" if len(lines) > 30 else ""
+            QMessageBox.warning(
+                self, "Batch not written",
+                "Nothing was written:\n\n" + "\n".join(lines[:30]) + more,
+            )
+            return
+        except OSError as e:
+            QMessageBox.critical(self, "Error Writing File", str(e))
+            return
+        maps = {s.map_rel for s in scripts}
+        QMessageBox.information(
+            self, "Batch written",
+            f"Generated {len(scripts)} script(s) in {len(maps)} map(s).",
         )
-        self._append_to_scripts_pory(map_rel, script, [sid_choose, sid_b1, sid_b2, sid_b3])
 
 
 # ---------------------------------------------------------------------- #
@@ -6,7 +6,9 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('main_window.ui', '.')],
-    hiddenimports=[],
+    # numpy is imported by the data modules (species_data, move_data, stat_engine, ...);
+    # listed explicitly so the bundle never ships without it
+    hiddenimports=['numpy'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
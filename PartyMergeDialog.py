@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import (
+    QDialog,
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+)
+
+from party_merge import MergeResult
+
+
+class PartyMergeDialog(QDialog):
+    """
+    Resolve the conflicts left by a trainers.party merge, one field at a time.
+
+    Everything that merged cleanly is already in the result; only true
+    conflicts are listed. **Save merged file** is enabled once every
+    conflict has a resolution. The caller writes ``result.text()``.
+    """
+
+    def __init__(self, result: MergeResult, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Merge trainers.party")
+        self.resize(1000, 640)
+        self.result = result
+        self.conflicts = result.conflicts
+
+        self.list = QListWidget()
+        self.list.currentRowChanged.connect(self.show_conflict)
+        mono = QFont("Consolas")
+        mono.setStyleHint(QFont.StyleHint.Monospace)
+        self.panes = {}
+        for name in ("Base", "Ours", "Theirs", "Result"):
+            pane = QPlainTextEdit()
+            pane.setFont(mono)
+            pane.setReadOnly(name != "Result")
+            self.panes[name] = pane
+
+        buttons = QHBoxLayout()
+        for label, side in (("Use ours", "ours"), ("Use theirs", "theirs"), ("Use base", "base")):
+            btn = QPushButton(label)
+            btn.clicked.connect(lambda _=False, s=side: self.take(getattr(self.current(), s)))
+            buttons.addWidget(btn)
+        edited = QPushButton("Use edited result")
+        edited.clicked.connect(lambda: self.take(self.panes["Result"].toPlainText() or None))
+        buttons.addWidget(edited)
+
+        grid = QGridLayout()
+        for i, name in enumerate(("Base", "Ours", "Theirs", "Result")):
+            grid.addWidget(QLabel(name), (i // 2) * 2, i % 2)
+            grid.addWidget(self.panes[name], (i // 2) * 2 + 1, i % 2)
+
+        self.status = QLabel()
+        self.btnSave = QPushButton("Save merged file")
+        self.btnSave.clicked.connect(self.accept)
+        cancel = QPushButton("Cancel")
+        cancel.clicked.connect(self.reject)
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.status, 1)
+        bottom.addWidget(self.btnSave)
+        bottom.addWidget(cancel)
+
+        right = QVBoxLayout()
+        right.addLayout(grid)
+        right.addLayout(buttons)
+        top = QHBoxLayout()
+        top.addWidget(self.list, 1)
+        top.addLayout(right, 3)
+        lay = QVBoxLayout()
+        lay.addLayout(top)
+        lay.addLayout(bottom)
+        self.setLayout(lay)
+
+        for conflict in self.conflicts:
+            where = conflict.trainer or "File header"
+            what = conflict.field or ("whole trainer" if conflict.trainer else "")
+            self.list.addItem(QListWidgetItem(f"{where} · {what}" if what else where))
+        self.update_status()
+        if self.conflicts:
+            self.list.setCurrentRow(0)
+
+    def current(self):
+        row = self.list.currentRow()
+        return self.conflicts[row] if 0 <= row < len(self.conflicts) else None
+
+    def show_conflict(self, row: int) -> None:
+        conflict = self.current()
+        if conflict is None:
+            return
+        for name, value in (("Base", conflict.base), ("Ours", conflict.ours), ("Theirs", conflict.theirs)):
+            self.panes[name].setPlainText("(removed)" if value is None else value)
+        result = conflict.resolution if conflict.resolved else conflict.ours
+        self.panes["Result"].setPlainText(result or "")
+
+    def take(self, value) -> None:
+        conflict = self.current()
+        if conflict is None:
+            return
+        conflict.resolve(value)
+        row = self.list.currentRow()
+        self.list.item(row).setText("✔ " + self.list.item(row).text().lstrip("✔ "))
+        self.update_status()
+        for nxt in list(range(row + 1, len(self.conflicts))) + list(range(row)):
+            if not self.conflicts[nxt].resolved:
+                self.list.setCurrentRow(nxt)
+                return
+        self.show_conflict(row)
+
+    def update_status(self) -> None:
+        done = sum(c.resolved for c in self.conflicts)
+        self.status.setText(
+            f"{done} of {len(self.conflicts)} conflict(s) resolved · "
+            f"{self.result.auto_merged} trainer(s) edited on both sides merged automatically"
+        )
+        self.btnSave.setEnabled(done == len(self.conflicts))
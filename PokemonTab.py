@@ -1,15 +1,25 @@
 # PokemonTab.py
 import os
+from dataclasses import replace
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QFormLayout, QGroupBox, QLabel,
-    QComboBox, QLineEdit, QSpinBox, QCheckBox
+    QComboBox, QLineEdit, QSpinBox, QCheckBox, QPushButton, QToolTip
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QEvent, pyqtSignal
+
+from move_data import CATEGORY_LABELS
+
+from stat_engine import mon_stats
 
 
 STAT_NAMES = ["HP", "Atk", "Def", "SpA", "SpD", "Spe"]
+MOVE_CHIPS = CATEGORY_LABELS + ("STAB",)
+CHIP_STYLE = (
+    "QPushButton { border: 1px solid #888; border-radius: 9px; padding: 1px 8px; }"
+    "QPushButton:checked { background: #3b7dd8; color: white; border-color: #3b7dd8; }"
+)
 
 
 class PokemonTab(QWidget):
@@ -24,15 +34,28 @@ class PokemonTab(QWidget):
     Pokémon front sprite (left-aligned)
     """
     species_changed = pyqtSignal(str)  # signal: ny art
+    edited = pyqtSignal()              # signal: brukeren endret et felt
     def __init__(
         self,
         pokemon,                   # dataclass instance
         species_list, move_list, item_list,
         nature_list, ability_list, ball_list, tera_types,
-        project_root               # root folder of the ROM project
+        project_root,              # root folder of the ROM project
+        learnsets=None,            # LearnsetIndex, or None to list every move
+        move_ids=None,             # move name -> move ID
+        species_table=None,        # SpeciesTable for the live stat line
+        damage_calc=None,          # DamageCalc for the threat summary
+        move_table=None,           # MoveTable for move tooltips and filter chips
     ):
         super().__init__()
         self.project_root = project_root
+        self.learnsets = learnsets
+        self.move_list = list(move_list)
+        self.move_ids = move_ids or {}
+        self.species_table = species_table
+        self.damage_calc = damage_calc
+        self.move_table = move_table if move_table is not None and len(move_table) else None
+        self._move_rows = None      # move name -> MoveTable row, built on first use
 
         # ========== 1. TOP ROW (two group-boxes) ==========
         top_hbox = QHBoxLayout()
@@ -72,9 +95,34 @@ class PokemonTab(QWidget):
             cb.setCurrentText(
                 pokemon.moves[i] if i < len(pokemon.moves) and pokemon.moves[i] else "None"
             )
+            cb.currentTextChanged.connect(self.mark_illegal_moves)
+            # tooltips are made when hovered, not stored on ~900 items per combo
+            cb.installEventFilter(self)
+            cb.view().viewport().installEventFilter(self)
             self.move_inputs.append(cb)
             left_form.addRow(f"Move {i+1}:", cb)
 
+        self.legal_only = QCheckBox("Only moves this species can learn")
+        self.legal_only.setChecked(learnsets is not None)
+        self.legal_only.setEnabled(learnsets is not None)
+        self.legal_only.toggled.connect(self.filter_moves)
+        left_form.addRow(self.legal_only)
+
+        chips_row = QWidget()
+        chips_layout = QHBoxLayout(chips_row)
+        chips_layout.setContentsMargins(0, 0, 0, 0)
+        self.move_chips = {}
+        for label in MOVE_CHIPS:
+            chip = QPushButton(label)
+            chip.setCheckable(True)
+            chip.setStyleSheet(CHIP_STYLE)
+            chip.setEnabled(self.move_table is not None)
+            chip.toggled.connect(self.filter_moves)
+            chips_layout.addWidget(chip)
+            self.move_chips[label] = chip
+        chips_layout.addStretch()
+        left_form.addRow("Show:", chips_row)
+
         left_group.setLayout(left_form)
         top_hbox.addWidget(left_group)
 
@@ -152,12 +200,30 @@ class PokemonTab(QWidget):
         iv_container, self.iv_spins = stat_row(pokemon.ivs, 31)
         bottom_form.addRow("IVs   HP/Atk/Def/SpA/SpD/Spe:", iv_container)
 
+        self.stats_label = QLabel()
+        self.stats_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        bottom_form.addRow("Stats HP/Atk/Def/SpA/SpD/Spe:", self.stats_label)
+        for sb in self.ev_spins + self.iv_spins:
+            sb.valueChanged.connect(self.update_stats)
+        self.level.valueChanged.connect(self.update_stats)
+        self.nature.currentTextChanged.connect(self.update_stats)
+
+        self.threat_label = QLabel()
+        self.threat_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        bottom_form.addRow("Threat vs reference team:", self.threat_label)
+        for cb in self.move_inputs:
+            cb.currentTextChanged.connect(self.update_threats)
+
         # ========== 3. IMAGE ==========
         self.image_label = QLabel()
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
         self.update_image(pokemon.species)
         # Oppdater bilde når species endres
         self.species.currentTextChanged.connect(self.on_species_changed)
+        self.level.valueChanged.connect(self.filter_moves)
+        self.filter_moves()
+        self.update_stats()
+        self._watch_edits()
 
         # ========== 4. MAIN V-BOX ==========
         main_vbox = QVBoxLayout()
@@ -169,6 +235,18 @@ class PokemonTab(QWidget):
         self.setLayout(main_vbox)
 
     # ----------------- HELPERS -----------------
+    def _watch_edits(self):
+        """Emit :attr:`edited` on any later change; the values set while building stay silent."""
+        emit = lambda *_: self.edited.emit()
+        self.nickname.textChanged.connect(emit)
+        for cb in [self.species, self.gender, self.held_item, self.ability,
+                   self.nature, self.ball, self.tera_type] + self.move_inputs:
+            cb.currentTextChanged.connect(emit)
+        for sb in [self.level, self.dynamax_level, self.happiness] + self.ev_spins + self.iv_spins:
+            sb.valueChanged.connect(emit)
+        for box in (self.shiny, self.gigantamax):
+            box.toggled.connect(emit)
+
     def limit_total_evs(self):
         total = sum(sb.value() for sb in self.ev_spins)
         if total > 510:
@@ -178,22 +256,26 @@ class PokemonTab(QWidget):
             sender.blockSignals(False)
 
     def apply_changes(self):
-        self.pokemon.nickname        = self.nickname.text().strip()
-        self.pokemon.species         = self.species.currentText().strip()
-        self.pokemon.level           = self.level.value()
-        self.pokemon.gender          = self.gender.currentText().strip() if self.gender.currentText() != "None" else ""
-        self.pokemon.held_item       = self.held_item.currentText().strip() if self.held_item.currentText() != "None" else ""
-        self.pokemon.ability         = self.ability.currentText().strip() if self.ability.currentText() != "None" else ""
-        self.pokemon.nature          = self.nature.currentText().strip() if self.nature.currentText() != "None" else ""
-        self.pokemon.ball            = self.ball.currentText().strip() if self.ball.currentText() != "None" else ""
-        self.pokemon.tera_type       = self.tera_type.currentText().strip() if self.tera_type.currentText() != "None" else ""
-        self.pokemon.dynamax_level   = self.dynamax_level.value()
-        self.pokemon.happiness = self.happiness.value() if self.happiness.value() > 0 else None
-        self.pokemon.is_shiny        = self.shiny.isChecked()
-        self.pokemon.is_gigantamax   = self.gigantamax.isChecked()
+        self.write_to(self.pokemon)
+
+    def write_to(self, pokemon):
+        """Copy the form into *pokemon*, which need not be the tab's own."""
+        pokemon.nickname        = self.nickname.text().strip()
+        pokemon.species         = self.species.currentText().strip()
+        pokemon.level           = self.level.value()
+        pokemon.gender          = self.gender.currentText().strip() if self.gender.currentText() != "None" else ""
+        pokemon.held_item       = self.held_item.currentText().strip() if self.held_item.currentText() != "None" else ""
+        pokemon.ability         = self.ability.currentText().strip() if self.ability.currentText() != "None" else ""
+        pokemon.nature          = self.nature.currentText().strip() if self.nature.currentText() != "None" else ""
+        pokemon.ball            = self.ball.currentText().strip() if self.ball.currentText() != "None" else ""
+        pokemon.tera_type       = self.tera_type.currentText().strip() if self.tera_type.currentText() != "None" else ""
+        pokemon.dynamax_level   = self.dynamax_level.value()
+        pokemon.happiness = self.happiness.value() if self.happiness.value() > 0 else None
+        pokemon.is_shiny        = self.shiny.isChecked()
+        pokemon.is_gigantamax   = self.gigantamax.isChecked()
 
         # Moves
-        self.pokemon.moves = [
+        pokemon.moves = [
             cb.currentText().strip()
             for cb in self.move_inputs
             if cb.currentText().strip() and cb.currentText() != "None"
@@ -201,12 +283,9 @@ class PokemonTab(QWidget):
 
         # IVs / EVs – hent fra spinnere hvis de finnes
         if hasattr(self, "iv_spins"):
-            self.pokemon.ivs = [s.value() if s.value() >= 0 else None for s in self.iv_spins]
+            pokemon.ivs = [s.value() if s.value() >= 0 else None for s in self.iv_spins]
         if hasattr(self, "ev_spins"):
-            self.pokemon.evs = [s.value() if s.value() > 0 else None for s in self.ev_spins]
-
-
-
+            pokemon.evs = [s.value() if s.value() > 0 else None for s in self.ev_spins]
 
     def update_image(self, species_name):
         base_path = os.path.join(self.project_root, "graphics", "pokemon")
@@ -237,5 +316,127 @@ class PokemonTab(QWidget):
 
     def on_species_changed(self, new_species):
         self.update_image(new_species)
+        self.filter_moves()
+        self.update_stats()
         self.species_changed.emit(new_species)
 
+    def update_stats(self):
+        """Final battle stats from the values currently in the form."""
+        if self.species_table is None:
+            self.stats_label.setText("(species data not loaded)")
+            return
+        stats = mon_stats(self._form_pokemon(), self.species_table)
+        if stats is None:
+            self.stats_label.setText("(unknown species)")
+        else:
+            self.stats_label.setText("  /  ".join(map(str, stats)) + f"    (total {sum(stats)})")
+        self.update_threats()
+
+    def _form_pokemon(self):
+        """The Pokémon as currently entered, without touching self.pokemon."""
+        nature = self.nature.currentText()
+        return replace(
+            self.pokemon,
+            species=self.species.currentText().strip(),
+            level=self.level.value(),
+            nature="" if nature == "None" else nature,
+            # 0 IVs are not written to trainers.party, so the game uses its default
+            ivs=[sb.value() or None for sb in self.iv_spins],
+            evs=[sb.value() for sb in self.ev_spins],
+            moves=[cb.currentText() for cb in self.move_inputs if cb.currentText() not in ("", "None")],
+        )
+
+    def update_threats(self):
+        """Best move and damage range against each Pokémon of the reference team."""
+        if self.damage_calc is None or not self.damage_calc.ready:
+            self.threat_label.setText("(needs move info and a reference team: Trainer Editor > Reference Team…)")
+            return
+        self.threat_label.setText("\n".join(self.damage_calc.threats(self._form_pokemon())))
+
+    def filter_moves(self):
+        """
+        List only moves the species can know at the current level, and mark
+        chosen moves it cannot learn. Without learnset data every move is listed.
+        """
+        species = self.species.currentText()
+        mask = self.learnsets.mask(species, self.level.value()) if self.learnsets else 0
+        if mask and self.legal_only.isChecked():
+            names = [n for n in self.move_list if mask >> self.move_ids.get(n, -1) & 1]
+        else:
+            names = self.move_list
+        names = self._chip_filter(names)
+
+        for cb in self.move_inputs:
+            current = cb.currentText()
+            cb.blockSignals(True)
+            cb.clear()
+            cb.addItems(["None"] + names)
+            if current not in ("", "None") and cb.findText(current) < 0:
+                cb.insertItem(1, current)
+            cb.setCurrentText(current or "None")
+            cb.blockSignals(False)
+        self.mark_illegal_moves()
+
+    def _move_row(self, name: str):
+        if self.move_table is None:
+            return None
+        if self._move_rows is None:
+            self._move_rows = self.move_table.rows_for(self.move_list)
+        row = self._move_rows.get(name)
+        if row is None and name not in ("", "None"):
+            row = self.move_table.row(self.move_table.move_for(name) or "")
+        return row
+
+    def _chip_filter(self, names):
+        """Moves matching the checked category chips and, if checked, the STAB chip."""
+        categories = {i for i, label in enumerate(CATEGORY_LABELS) if self.move_chips[label].isChecked()}
+        stab = self.move_chips["STAB"].isChecked()
+        if self.move_table is None or not (categories or stab):
+            return names
+        own_types = set()
+        if stab and self.species_table is not None:
+            constant = self.species_table.species_for(self.species.currentText())
+            info = self.species_table.info(constant) if constant else None
+            own_types = set(info.types) if info else set()
+        table = self.move_table
+        kept = []
+        for name in names:
+            row = self._move_row(name)
+            if row is None:
+                continue
+            if categories and table.category[row] not in categories:
+                continue
+            if stab and table.type_names[table.type[row]] not in own_types:
+                continue
+            kept.append(name)
+        return kept
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.ToolTip and self.move_table is not None:
+            for cb in self.move_inputs:
+                if obj is cb:
+                    name, note = cb.currentText(), cb.toolTip()
+                    break
+                if obj is cb.view().viewport():
+                    index = cb.view().indexAt(event.pos())
+                    name, note = (index.data() or ""), ""
+                    break
+            else:
+                return super().eventFilter(obj, event)
+            row = self._move_row(name)
+            if row is not None:
+                text = self.move_table.describe(row)
+                QToolTip.showText(event.globalPos(), f"{note}\n\n{text}" if note else text, obj)
+                return True
+        return super().eventFilter(obj, event)
+
+    def mark_illegal_moves(self):
+        species, level = self.species.currentText(), self.level.value()
+        mask = self.learnsets.mask(species, level) if self.learnsets else 0
+        for cb in self.move_inputs:
+            move = cb.currentText()
+            move_id = self.move_ids.get(move)
+            illegal = bool(mask) and move != "None" and (move_id is None or not mask >> move_id & 1)
+            cb.setStyleSheet("color: #d9534f;" if illegal else "")
+            cb.setToolTip(f"{species} cannot learn {move} by level {level}." if illegal else "")
+
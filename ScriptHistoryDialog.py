@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Callable, List
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QTextEdit,
+    QVBoxLayout,
+)
+
+from script_log import LogEntry, ScriptLog
+
+
+class ScriptHistoryDialog(QDialog):
+    """
+    Browse every script ever generated and insert one again.
+
+    Filtering runs on the in-memory offset index. Only the selected record is
+    read, straight from the memory-mapped log segment.
+    """
+
+    def __init__(self, log: ScriptLog, insert: Callable[[dict], None], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Generated script history")
+        self.resize(820, 560)
+        self.log = log
+        self.insert = insert
+        self._shown: List[LogEntry] = []
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Filter by script ID…")
+        self.comboMap = QComboBox()
+        self.comboMap.addItems(["All maps"] + log.maps())
+        self.comboKind = QComboBox()
+        self.comboKind.addItems(["All types"] + log.kinds())
+        for signal in (self.search.textChanged, self.comboMap.currentIndexChanged,
+                       self.comboKind.currentIndexChanged):
+            signal.connect(self.refresh)
+
+        self.results = QListWidget()
+        self.results.currentRowChanged.connect(self.show_entry)
+        self.preview = QTextEdit()
+        self.preview.setReadOnly(True)
+        self.status = QLabel()
+
+        self.btnInsert = QPushButton("Insert into selected map")
+        self.btnInsert.clicked.connect(self.insert_selected)
+        self.btnInsert.setEnabled(False)
+
+        filters = QHBoxLayout()
+        filters.addWidget(self.search, 2)
+        filters.addWidget(self.comboMap, 1)
+        filters.addWidget(self.comboKind, 1)
+        body = QHBoxLayout()
+        body.addWidget(self.results, 1)
+        body.addWidget(self.preview, 2)
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.status, 1)
+        bottom.addWidget(self.btnInsert)
+
+        lay = QVBoxLayout()
+        lay.addLayout(filters)
+        lay.addLayout(body)
+        lay.addLayout(bottom)
+        self.setLayout(lay)
+        self.refresh()
+
+    def refresh(self) -> None:
+        map_rel = self.comboMap.currentText() if self.comboMap.currentIndex() > 0 else ""
+        kind = self.comboKind.currentText() if self.comboKind.currentIndex() > 0 else ""
+        self._shown = self.log.search(self.search.text().strip(), map_rel, kind)
+        self.results.clear()
+        for entry in self._shown:
+            label = f"{entry.time}  {entry.id}"
+            if entry.map:
+                label += f"  [{entry.map}]"
+            item = QListWidgetItem(label)
+            item.setData(Qt.ItemDataRole.ToolTipRole, entry.kind)
+            self.results.addItem(item)
+        self.status.setText(f"{len(self._shown)} shown of {len(self.log.entries)} logged")
+        self.preview.clear()
+        self.btnInsert.setEnabled(False)
+
+    def _selected(self) -> dict | None:
+        row = self.results.currentRow()
+        if not 0 <= row < len(self._shown):
+            return None
+        return self.log.record(self._shown[row])
+
+    def show_entry(self, _row: int) -> None:
+        record = self._selected()
+        if record is None:
+            return
+        self.preview.setPlainText(
+            f"// {record.get('desc', '')}\n// IDs: {', '.join(record.get('ids', []))}\n\n"
+            + record.get("script", "")
+        )
+        self.btnInsert.setEnabled(True)
+
+    def insert_selected(self) -> None:
+        record = self._selected()
+        if record is not None:
+            self.insert(record)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from type_chart import RosterCoverage, type_label
+
+
+class _CountItem(QTableWidgetItem):
+    """Sorts by the number stored in UserRole instead of the text."""
+
+    def __lt__(self, other):
+        return self.data(Qt.ItemDataRole.UserRole) < other.data(Qt.ItemDataRole.UserRole)
+
+
+class TypeCoverageDialog(QDialog):
+    """
+    Shared weaknesses and STAB coverage gaps for every trainer party.
+    Double-click a row to open that trainer in the editor.
+    """
+
+    COLUMNS = ["Trainer", "Pokémon", "Shared weaknesses", "No super-effective STAB vs"]
+
+    def __init__(self, build: Callable[[], RosterCoverage],
+                 open_trainer: Optional[Callable[[str], None]] = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Party type coverage")
+        self.resize(980, 640)
+        self.build = build
+        self.open_trainer = open_trainer
+
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText("Filter trainers…")
+        self.filter.textChanged.connect(self.apply_filter)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.cellDoubleClicked.connect(self._open_row)
+        self.status = QLabel()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.status, 1)
+        bottom.addWidget(refresh_btn)
+        lay = QVBoxLayout()
+        lay.addWidget(self.filter)
+        lay.addWidget(self.table)
+        lay.addLayout(bottom)
+        self.setLayout(lay)
+        self.refresh()
+
+    def refresh(self) -> None:
+        coverage = self.build()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        flagged = 0
+        for i, trainer in enumerate(coverage.trainers):
+            if not coverage.sizes[i]:
+                continue
+            weak = coverage.shared_weaknesses(i)
+            gaps = coverage.uncovered(i)
+            flagged += bool(weak)
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.table.setItem(row, 0, QTableWidgetItem(trainer))
+            size = _CountItem(str(int(coverage.sizes[i])))
+            size.setData(Qt.ItemDataRole.UserRole, int(coverage.sizes[i]))
+            self.table.setItem(row, 1, size)
+            weak_item = _CountItem(", ".join(f"{type_label(t)} ({n})" for t, n in weak))
+            weak_item.setData(Qt.ItemDataRole.UserRole, max((n for _, n in weak), default=0))
+            self.table.setItem(row, 2, weak_item)
+            gap_item = _CountItem(", ".join(type_label(t) for t in gaps))
+            gap_item.setData(Qt.ItemDataRole.UserRole, len(gaps))
+            self.table.setItem(row, 3, gap_item)
+        self.table.setSortingEnabled(True)
+        self.table.sortItems(2, Qt.SortOrder.DescendingOrder)
+        self.table.resizeColumnsToContents()
+        self.status.setText(
+            f"{self.table.rowCount()} parties, {flagged} with a weakness shared by most members "
+            f"· chart: {coverage.chart.source}"
+        )
+        self.apply_filter(self.filter.text())
+
+    def apply_filter(self, text: str) -> None:
+        needle = text.strip().lower()
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            self.table.setRowHidden(row, bool(needle) and needle not in item.text().lower())
+
+    def _open_row(self, row: int, _column: int) -> None:
+        if self.open_trainer is not None:
+            self.open_trainer(self.table.item(row, 0).text())
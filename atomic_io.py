@@ -0,0 +1,83 @@
+import os
+from typing import Callable, Dict, List, Optional
+
+
+class FileTransaction:
+    """
+    Stage writes to several project files and commit them together.
+
+    Every file is first written to a temp file and fsynced. The temp files are
+    then swapped in one by one. If any step fails, the files already replaced
+    are restored from their original bytes, so either all of them change or
+    none do.
+    """
+
+    def __init__(self):
+        self._staged: Dict[str, str] = {}
+        self._on_commit: List[Callable[[], None]] = []
+        self._on_rollback: List[Callable[[], None]] = []
+
+    def write(self, path: str, text: str) -> None:
+        self._staged[os.path.abspath(path)] = text
+
+    def append(self, path: str, text: str) -> None:
+        key = os.path.abspath(path)
+        if key not in self._staged:
+            self._staged[key] = self._read(key) or ""
+        self._staged[key] += text
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self._on_commit.append(callback)
+
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        self._on_rollback.append(callback)
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self._staged)
+
+    @staticmethod
+    def _read(path: str) -> Optional[str]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def commit(self) -> None:
+        temps: Dict[str, str] = {}
+        originals: Dict[str, Optional[bytes]] = {}
+        replaced: List[str] = []
+        try:
+            for path, text in self._staged.items():
+                tmp = f"{path}.tmp~"
+                with open(tmp, "w", encoding="utf-8", newline="") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                temps[path] = tmp
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        originals[path] = f.read()
+                else:
+                    originals[path] = None
+
+            for path, tmp in temps.items():
+                os.replace(tmp, path)
+                replaced.append(path)
+        except BaseException:
+            for path in replaced:
+                if originals[path] is None:
+                    os.remove(path)
+                else:
+                    with open(path, "wb") as f:
+                        f.write(originals[path])
+            for path, tmp in temps.items():
+                if path not in replaced and os.path.exists(tmp):
+                    os.remove(tmp)
+            for callback in self._on_rollback:
+                callback()
+            raise
+
+        self._staged.clear()
+        for callback in self._on_commit:
+            callback()
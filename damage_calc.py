@@ -0,0 +1,213 @@
+"""
+Damage ranges for every move of every trainer Pokémon against a reference
+player team, computed in one array pass.
+
+The formula is the Gen 5+ one the expansion uses, in the game's order and
+with integer truncation at each step:
+
+    base  = ((2*Level//5 + 2) * Power * A // D) // 50 + 2
+    roll  = base * R // 100           R = 85 (min) .. 100 (max)
+    STAB  = roll * 3 // 2             if the move shares a type with the user
+    type  = STAB * effectiveness      0, 0.25 .. 4, see type_chart.TypeChart
+
+A and D are the attacker's Atk or SpA and the target's Def or SpD,
+depending on the move's category. Abilities, items, weather, critical hits,
+stat stages and variable-power moves are not modelled. Multi-strike moves
+count every hit.
+"""
+import csv
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from move_data import PHYSICAL, MoveTable
+from species_data import SpeciesTable
+from stat_engine import party_stats
+from type_chart import TypeChart
+
+MAX_MOVES = 4
+
+
+def compute_damage(
+    levels: np.ndarray,
+    power: np.ndarray,
+    attack: np.ndarray,
+    defense: np.ndarray,
+    stab: np.ndarray,
+    effectiveness: np.ndarray,
+    strikes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (min, max) damage; all inputs broadcast together. *effectiveness* is a
+    multiple of 0.25, so applying it stays in integer maths.
+    """
+    power = power.astype(np.int64)
+    base = ((2 * levels.astype(np.int64) // 5 + 2) * power * attack // np.maximum(defense, 1)) // 50 + 2
+    quarter = np.rint(effectiveness * 4).astype(np.int64)
+    out = []
+    for roll in (85, 100):
+        dmg = base * roll // 100
+        dmg = np.where(stab, dmg * 3 // 2, dmg)
+        dmg = dmg * quarter // 4
+        dmg = np.where(quarter > 0, np.maximum(dmg, 1), 0) * strikes
+        out.append(np.where(power > 1, dmg, 0).astype(np.int32))
+    return out[0], out[1]
+
+
+@dataclass
+class DamageMatrix:
+    """``low[i, m, t]`` / ``high[i, m, t]``: attacker *i*'s move *m* against target *t*."""
+    rows: List[Tuple[str, int, str]]     # trainer, slot, species
+    moves: List[List[str]]               # move names per attacker, up to MAX_MOVES
+    targets: List[str]
+    target_hp: np.ndarray                # (targets,)
+    target_speed: np.ndarray             # (targets,)
+    speed: np.ndarray                    # (attackers,); -1 where the species is unknown
+    low: np.ndarray                      # (attackers, MAX_MOVES, targets) int32
+    high: np.ndarray
+
+    def percent(self, values: np.ndarray) -> np.ndarray:
+        return values * 100.0 / np.maximum(self.target_hp, 1)
+
+    def threats(self, i: int) -> List[str]:
+        """One line per target: attacker *i*'s strongest move and its range."""
+        if self.speed[i] < 0:
+            return [f"{self.rows[i][2]}: species not found in species_info"]
+        lines = []
+        best = self.high[i].argmax(axis=0)      # per target, the move with the highest max roll
+        for t, target in enumerate(self.targets):
+            m = best[t]
+            low, high = int(self.low[i, m, t]), int(self.high[i, m, t])
+            speed = "faster" if self.speed[i] > self.target_speed[t] else (
+                "speed tie" if self.speed[i] == self.target_speed[t] else "slower")
+            if high == 0:
+                lines.append(f"{target}: no damaging move ({speed})")
+                continue
+            hp = int(self.target_hp[t])
+            lo_pct, hi_pct = low * 100 / hp, high * 100 / hp
+            hits = math.ceil(hp / high)
+            ko = "OHKO" if hits == 1 else f"{hits}HKO"
+            if math.ceil(hp / max(low, 1)) != hits:
+                ko = "possible " + ko
+            lines.append(f"{target}: {self.moves[i][m]} {lo_pct:.0f}–{hi_pct:.0f}% ({ko}, {speed})")
+        return lines
+
+    def write_csv(self, path: str) -> None:
+        low_pct, high_pct = self.percent(self.low), self.percent(self.high)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Trainer", "Slot", "Species", "Move", "Target", "Min", "Max", "Min %", "Max %"])
+            for i, (trainer, slot, species) in enumerate(self.rows):
+                for m, move in enumerate(self.moves[i]):
+                    if not move:
+                        continue        # padding for a free move slot
+                    for t, target in enumerate(self.targets):
+                        writer.writerow([
+                            trainer, slot, species, move, target,
+                            int(self.low[i, m, t]), int(self.high[i, m, t]),
+                            f"{low_pct[i, m, t]:.1f}", f"{high_pct[i, m, t]:.1f}",
+                        ])
+
+
+class DamageCalc:
+    """
+    Species, move and type data plus a reference team. The team's stats and
+    types are worked out once; :meth:`matrix` then handles any number of attackers.
+    """
+
+    def __init__(self, species: SpeciesTable, moves: MoveTable, chart: TypeChart, reference: List):
+        self.species = species
+        self.moves = moves
+        self.chart = chart
+        self.reference = list(reference)
+
+        # an extra all-1x row and column for types missing from the chart
+        n = len(chart.names)
+        self.effect = np.ones((n + 1, n + 1), np.float32)
+        self.effect[:n, :n] = chart.matrix
+        self.species_types = np.array([chart.index.get(t, n) for t in species.type_names], np.int64)
+        self.move_types = np.array([chart.index.get(t, n) for t in moves.type_names], np.int64)
+        self._species_rows: Dict[str, int] = {}
+        self._move_rows: Dict[str, int] = {}
+
+        sheet = party_stats((("", slot, mon) for slot, mon in enumerate(self.reference, 1)), species)
+        known = sheet.stats[:, 0] > 0
+        self.reference = [mon for mon, ok in zip(self.reference, known) if ok]
+        self.target_stats = sheet.stats[known]
+        rows = np.array([self._species_row(mon.species) for mon in self.reference], np.int64)
+        self.target_types = self.species_types[species.types[rows]] if len(rows) else np.zeros((0, 2), np.int64)
+
+    def _species_row(self, name: str) -> int:
+        if name not in self._species_rows:
+            constant = self.species.species_for(name) if name else None
+            self._species_rows[name] = self.species.row(constant) if constant else -1
+        return self._species_rows[name]
+
+    def _move_row(self, name: str) -> int:
+        if name not in self._move_rows:
+            constant = self.moves.move_for(name) if name else None
+            self._move_rows[name] = self.moves.row(constant) if constant else -1
+        return self._move_rows[name]
+
+    @property
+    def ready(self) -> bool:
+        return bool(len(self.moves) and len(self.species) and self.reference)
+
+    def roster(self, trainers: Iterable) -> DamageMatrix:
+        return self.matrix((trainer.id, slot, mon) for trainer in trainers
+                           for slot, mon in enumerate(trainer.party, start=1))
+
+    def matrix(self, members: Iterable[Tuple[str, int, object]]) -> DamageMatrix:
+        members = list(members)
+        sheet = party_stats(members, self.species)
+        n = len(members)
+        move_names = [[m for m in mon.moves[:MAX_MOVES] if m] for _, _, mon in members]
+        move_rows = np.full((n, MAX_MOVES), -1, np.int64)
+        species_rows = np.empty(n, np.int64)
+        for i, (_, _, mon) in enumerate(members):
+            species_rows[i] = self._species_row(mon.species)
+            for m, name in enumerate(move_names[i]):
+                move_rows[i, m] = self._move_row(name)
+
+        known = (species_rows >= 0)[:, None] & (move_rows >= 0)
+        safe = np.where(move_rows >= 0, move_rows, 0)
+        power = np.where(known, self.moves.power[safe], 0)
+        physical = self.moves.category[safe] == PHYSICAL
+        move_type = self.move_types[self.moves.type[safe]]
+
+        own = np.full((n, 2), -1, np.int64)
+        if len(self.species):
+            own[species_rows >= 0] = self.species_types[self.species.types[species_rows[species_rows >= 0]]]
+        stab = (move_type == own[:, :1]) | (move_type == own[:, 1:])
+
+        targets = self.target_types
+        mono = targets[:, 0] == targets[:, 1]
+        effectiveness = self.effect[move_type[:, :, None], targets[None, None, :, 0]] * np.where(
+            mono, 1.0, self.effect[move_type[:, :, None], targets[None, None, :, 1]])
+
+        stats = np.maximum(sheet.stats, 0)
+        attack = np.where(physical, stats[:, 1:2], stats[:, 3:4])[:, :, None]
+        defense = np.where(physical[:, :, None],
+                           self.target_stats[None, None, :, 2], self.target_stats[None, None, :, 4])
+        low, high = compute_damage(
+            np.array([mon.level for _, _, mon in members], np.int64)[:, None, None],
+            power[:, :, None], attack, defense, stab[:, :, None], effectiveness,
+            self.moves.strikes[safe].astype(np.int64)[:, :, None],
+        )
+        return DamageMatrix(
+            rows=[(trainer, slot, mon.species) for trainer, slot, mon in members],
+            moves=[names + [""] * (MAX_MOVES - len(names)) for names in move_names],
+            targets=[f"{mon.species} L{mon.level}" for mon in self.reference],
+            target_hp=self.target_stats[:, 0],
+            target_speed=self.target_stats[:, 5],
+            speed=sheet.stats[:, 5],
+            low=low,
+            high=high,
+        )
+
+    def threats(self, mon) -> List[str]:
+        """Threat summary for one Pokémon, as shown in its party tab."""
+        return self.matrix([("", 1, mon)]).threats(0)
+
@@ -0,0 +1,128 @@
+import ast
+import glob
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from header_scanner import Define, HeaderScanner, HeaderScan
+
+_TOKEN_RX = re.compile(
+    r"\s*(?:"
+    r"(?P<number>0[xX][0-9A-Fa-f]+|0[bB][01]+|\d+)[uUlL]*"
+    r"|(?P<ident>[A-Za-z_]\w*)"
+    r"|(?P<op><<|>>|[-+*/%&|^~()])"
+    r")"
+)
+_CAST_RX = re.compile(r"\(\s*(?:u8|u16|u32|s8|s16|s32|int|unsigned)\s*\)")
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod,
+    ast.LShift, ast.RShift, ast.BitAnd, ast.BitOr, ast.BitXor,
+    ast.Invert, ast.USub, ast.UAdd,
+)
+
+
+class DefineTable:
+    """
+    Symbol table over the project's include headers.
+
+    Values are evaluated lazily the first time they are asked for, so aliases
+    (``#define MOVES_COUNT MOVES_COUNT_GEN9``) and arithmetic
+    (``TRAINERS_COUNT + 1``) resolve to exact integers, and every result is
+    memoised until one of the headers changes on disk.
+    """
+
+    def __init__(self, scanner: Optional[HeaderScanner] = None):
+        self.scanner = scanner or HeaderScanner()
+        self.paths: List[str] = []
+        self._scans: List[HeaderScan] = []
+        self._symbols: Dict[str, Define] = {}
+        self._memo: Dict[str, Optional[int]] = {}
+
+    def load_headers(self, paths: Iterable[str]) -> None:
+        self.paths = [os.path.abspath(p) for p in paths]
+        self._scans = []
+        self.refresh()
+
+    def load_include_dirs(self, project_root: str) -> None:
+        """Collect every header under include/constants and include/config."""
+        paths = []
+        for sub in ("constants", "config"):
+            paths += sorted(glob.glob(os.path.join(project_root, "include", sub, "*.h")))
+        self.load_headers(paths)
+
+    def refresh(self) -> None:
+        """Re-scan headers that changed on disk; drops memoised values if any did."""
+        scans = [self.scanner.scan(p) for p in self.paths]
+        if len(scans) == len(self._scans) and all(a is b for a, b in zip(scans, self._scans)):
+            return
+        self._scans = scans
+        self._symbols = {}
+        for scan in scans:
+            for name, define in scan.defines.items():
+                self._symbols.setdefault(name, define)
+        self._memo.clear()
+
+    # ------------------------------------------------------------------
+    def __contains__(self, name: str) -> bool:
+        return name in self._symbols
+
+    def define(self, name: str) -> Optional[Define]:
+        return self._symbols.get(name)
+
+    def names(self, prefix: str = "") -> List[str]:
+        return [n for n in self._symbols if n.startswith(prefix)]
+
+    def value(self, name: str) -> Optional[int]:
+        """Integer value of *name*, or None if it is unknown or not constant."""
+        if name in self._memo:
+            return self._memo[name]
+        define = self._symbols.get(name)
+        if define is None or not define.value:
+            self._memo[name] = None
+            return None
+
+        self._memo[name] = None  # guards against self-referencing defines
+        result = self.evaluate(define.value)
+        self._memo[name] = result
+        return result
+
+    def evaluate(self, expr: str) -> Optional[int]:
+        """Evaluate a C constant expression, resolving identifiers through the table."""
+        expr = _CAST_RX.sub("", expr)
+        parts = []
+        pos = 0
+        while pos < len(expr):
+            match = _TOKEN_RX.match(expr, pos)
+            if not match or match.end() == pos:
+                if expr[pos:].strip():
+                    return None
+                break
+            pos = match.end()
+            if match.group("number"):
+                number = match.group("number")
+                base = 8 if len(number) > 1 and number.isdigit() and number[0] == "0" else 0
+                parts.append(str(int(number, base)))
+            elif match.group("ident"):
+                resolved = self.value(match.group("ident"))
+                if resolved is None:
+                    return None
+                parts.append(f"({resolved})")
+            else:
+                op = match.group("op")
+                parts.append("//" if op == "/" else op)
+
+        if not parts:
+            return None
+        try:
+            tree = ast.parse(" ".join(parts), mode="eval")
+        except SyntaxError:
+            return None
+        if not all(isinstance(node, _ALLOWED_NODES) for node in ast.walk(tree)):
+            return None
+        try:
+            result = eval(compile(tree, "<define>", "eval"), {"__builtins__": {}})
+        except (ArithmeticError, ValueError):
+            return None
+        return result if isinstance(result, int) else None
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import pickle
+from typing import Any, Callable, Optional
+
+CACHE_DIR = os.path.join(os.getcwd(), ".pe_editor_cache")
+# bump when the layout of cached values changes
+CACHE_VERSION = 3
+
+
+def content_key(*parts: bytes) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Small pickle store keyed by content hash, one file per entry.
+
+    Lives next to pe_editor_settings.json. Entries are written to a temp file
+    and swapped in, so a crash never leaves a half-written entry behind. A
+    corrupt or unreadable entry counts as a miss.
+    """
+
+    def __init__(self, namespace: str, root: str = CACHE_DIR):
+        self.dir = os.path.join(root, f"{namespace}-v{CACHE_VERSION}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, key[:2], key + ".pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp~"
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass    # the cache is only an optimisation
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
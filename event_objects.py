@@ -0,0 +1,215 @@
+import os
+import re
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from atomic_io import FileTransaction
+from gba_tiles import TileSheet, load_sheet
+from sprite_import import ProgressCallback, Writer, copy_if_changed, plan_copies, run_copies
+
+PEOPLE_DIR = os.path.join("graphics", "object_events", "pics", "people")
+CONSTANTS_FILE = os.path.join("include", "constants", "event_objects.h")
+GRAPHICS_FILE = os.path.join("src", "data", "object_events", "object_event_graphics.h")
+PIC_TABLES_FILE = os.path.join("src", "data", "object_events", "object_event_pic_tables.h")
+
+_GFX_RX = re.compile(r"^\s*#\s*define\s+(OBJ_EVENT_GFX_\w+)(?!\()\s")
+_NUM_RX = re.compile(r"^(?P<head>\s*#\s*define\s+NUM_OBJ_EVENT_GFX\s+)(?P<value>\w+)(?P<tail>.*)$", re.S)
+_SYMBOL_RX = re.compile(r"\b(gObjectEventPic_\w+|sPicTable_\w+)\s*\[")
+
+
+def png_size(path: str) -> Tuple[int, int]:
+    """Width and height from a PNG's IHDR chunk."""
+    with open(path, "rb") as f:
+        head = f.read(24)
+    if head[:8] != b"\x89PNG\r\n\x1a\n" or head[12:16] != b"IHDR":
+        raise ValueError(f"{os.path.basename(path)} is not a PNG file.")
+    return struct.unpack(">II", head[16:24])
+
+
+def newline_of(path: str) -> str:
+    """The line ending a text file uses, judged by its first line ("\n" if unknown)."""
+    try:
+        with open(path, "rb") as f:
+            first = f.readline()
+    except OSError:
+        return "\n"
+    return "\r\n" if first.endswith(b"\r\n") else "\n"
+
+
+def pascal_case(name: str) -> str:
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+class EventObjectsHeader:
+    """include/constants/event_objects.h parsed once: GFX names in a set, NUM line located."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, encoding="utf-8", newline="") as f:
+            self.lines = f.readlines()
+        self.newline = "\r\n" if self.lines and self.lines[0].endswith("\r\n") else "\n"
+        self.names = set()
+        self.num_index = -1
+        self.num_value = 0
+        for i, line in enumerate(self.lines):
+            match = _GFX_RX.match(line)
+            if match:
+                self.names.add(match.group(1))
+                continue
+            num = _NUM_RX.match(line)
+            if num:
+                self.num_index = i
+                try:
+                    self.num_value = int(num.group("value"), 0)
+                except ValueError:
+                    raise ValueError("Invalid number for NUM_OBJ_EVENT_GFX.")
+        if self.num_index < 0:
+            raise ValueError("Could not find NUM_OBJ_EVENT_GFX.")
+
+    def __contains__(self, define: str) -> bool:
+        return define in self.names
+
+    def add_many(self, names: List[str]) -> Dict[str, int]:
+        """Give each sprite name the next GFX id and splice all defines in at once."""
+        ids, new_lines = {}, []
+        for name in names:
+            define = f"OBJ_EVENT_GFX_{name.upper()}"
+            ids[name] = self.num_value
+            new_lines.append(f"//New_PIC {name}.png{self.newline}")
+            new_lines.append(f"#define {define} {self.num_value}{self.newline}")
+            self.names.add(define)
+            self.num_value += 1
+
+        num = _NUM_RX.match(self.lines[self.num_index])
+        self.lines[self.num_index] = f"{num.group('head')}{self.num_value}{num.group('tail')}"
+        self.lines[self.num_index:self.num_index] = new_lines
+        self.num_index += len(new_lines)
+        return ids
+
+    def text(self) -> str:
+        return "".join(self.lines)
+
+
+@dataclass
+class OverworldImportResult:
+    imported: List[str] = field(default_factory=list)
+    duplicates: List[str] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    missing_tables: List[str] = field(default_factory=list)
+
+
+def _existing_symbols(path: str) -> Optional[set]:
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return set(_SYMBOL_RX.findall(f.read()))
+
+
+def import_overworld_sprites(
+    project_folder: str,
+    sources: List[str],
+    progress: Optional[ProgressCallback] = None,
+    writer: Writer = copy_if_changed,
+) -> OverworldImportResult:
+    """
+    Copy overworld sheets into graphics/object_events/pics/people and register them.
+
+    Duplicates are checked against the GFX set parsed once from
+    event_objects.h, and files are copied on a worker pool. Each copied sheet
+    is then encoded to 4bpp (see :mod:`gba_tiles`); sheets that are not
+    indexed, use more than 16 colours or do not split into GBA-sized frames
+    are reported as failed instead of being registered. The new
+    OBJ_EVENT_GFX defines, gObjectEventPic_* INCBINs and sPicTable_* frame
+    tables are then committed in one transaction. If that fails, the freshly
+    copied PNGs are removed again. *writer* can convert the sheets (see
+    :class:`sprite_convert.SpriteConverter`) instead of copying them as-is.
+    """
+    result = OverworldImportResult()
+    header = EventObjectsHeader(os.path.join(project_folder, CONSTANTS_FILE))
+    dest_dir = os.path.join(project_folder, PEOPLE_DIR)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    wanted: Dict[str, str] = {}
+    for src in sources:
+        name = os.path.splitext(os.path.basename(src))[0].lower()
+        if f"OBJ_EVENT_GFX_{name.upper()}" in header or name in wanted:
+            result.duplicates.append(name)
+        else:
+            wanted[name] = src
+    if not wanted:
+        return result
+
+    for name, src in list(wanted.items()):
+        try:
+            png_size(src)
+        except (OSError, ValueError) as e:
+            result.failed.append((src, str(e)))
+            del wanted[name]
+
+    jobs = plan_copies(wanted.values(), dest_dir)
+    for job, name in zip(jobs, wanted):
+        job.dest = os.path.join(dest_dir, f"{name}.png")
+    fresh = [job.dest for job in jobs if not os.path.exists(job.dest)]
+    copies = run_copies(jobs, progress, writer=writer)
+    result.failed += copies.failed
+    failed_sources = {src for src, _ in copies.failed}
+
+    # encode what was written, so a sheet that would not build is caught here
+    sheets: Dict[str, TileSheet] = {}
+    for job, (name, src) in zip(jobs, wanted.items()):
+        if src in failed_sources:
+            continue
+        try:
+            sheets[name] = load_sheet(job.dest)
+        except (OSError, ValueError) as e:
+            result.failed.append((src, str(e)))
+            if job.dest in fresh and os.path.exists(job.dest):
+                os.remove(job.dest)
+    names = list(sheets)
+    if not names:
+        return result
+
+    ids = header.add_many(names)
+    transaction = FileTransaction()
+    transaction.write(header.path, header.text())
+
+    graphics_path = os.path.join(project_folder, GRAPHICS_FILE)
+    tables_path = os.path.join(project_folder, PIC_TABLES_FILE)
+    graphics_symbols = _existing_symbols(graphics_path)
+    table_symbols = _existing_symbols(tables_path)
+
+    pics, tables = [], []
+    for name in ids:
+        pic, table = f"gObjectEventPic_{pascal_case(name)}", f"sPicTable_{pascal_case(name)}"
+        rel = "/".join([*PEOPLE_DIR.split(os.sep), f"{name}.4bpp"])
+        if graphics_symbols is not None and pic not in graphics_symbols:
+            pics.append(f'const u32 {pic}[] = INCBIN_U32("{rel}");\n')
+        if table_symbols is not None and table not in table_symbols:
+            sheet = sheets[name]
+            body = "".join(
+                f"    overworld_frame({pic}, {sheet.frame_w // 8}, {sheet.frame_h // 8}, {i}),\n"
+                for i in range(sheet.frames)
+            )
+            tables.append(f"static const struct SpriteFrameImage {table}[] = {{\n{body}}};\n")
+
+    if graphics_symbols is None:
+        result.missing_tables.append(GRAPHICS_FILE)
+    elif pics:
+        text = "\n" + "".join(pics)
+        transaction.append(graphics_path, text.replace("\n", newline_of(graphics_path)))
+    if table_symbols is None:
+        result.missing_tables.append(PIC_TABLES_FILE)
+    elif tables:
+        text = "\n" + "\n".join(tables)
+        transaction.append(tables_path, text.replace("\n", newline_of(tables_path)))
+
+    def remove_fresh_copies():
+        for path in fresh:
+            if os.path.exists(path):
+                os.remove(path)
+
+    transaction.on_rollback(remove_fresh_copies)
+    transaction.commit()
+    result.imported = list(ids)
+    return result
@@ -0,0 +1,147 @@
+"""
+Encode indexed PNG sheets into GBA 4bpp tile data and a BGR555 palette.
+
+This produces the same bytes the project's ``gbagfx`` step would, so a
+sheet can be checked and previewed in the editor without a build. Each
+frame of a sheet is treated as a metatile, like the ``-mwidth/-mheight``
+flags in spritesheet_rules.mk. Tiles are therefore emitted frame by frame,
+row-major inside each frame.
+
+Results are cached on disk by content hash. Re-encoding an unchanged sheet
+costs one file read and one hash.
+
+Run ``python gba_tiles.py SHEET.png [WxH]`` to write SHEET.4bpp and
+SHEET.gbapal next to the PNG.
+"""
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from disk_cache import DiskCache, content_key
+from sprite_convert import PALETTE_SIZE, encode_gbapal
+
+# sprite shapes the OAM can display; every overworld frame must be one of these
+OAM_SIZES = {
+    (8, 8), (16, 16), (32, 32), (64, 64),
+    (16, 8), (32, 8), (32, 16), (64, 32),
+    (8, 16), (8, 32), (16, 32), (32, 64),
+}
+
+_cache = DiskCache("tiles")
+
+
+def frame_size(width: int, height: int) -> Tuple[int, int]:
+    """Guess the frame size of an overworld sheet (9 or 3 frames in a row, else one)."""
+    for frames in (9, 3):
+        if width % frames == 0 and (width // frames) % 8 == 0 and width // frames <= height:
+            return width // frames, height
+    return width, height
+
+
+@dataclass
+class TileSheet:
+    width: int
+    height: int
+    frame_w: int
+    frame_h: int
+    tiles: bytes        # 4bpp, 32 bytes per 8x8 tile
+    palette: bytes      # 16 BGR555 colours, little-endian
+
+    @property
+    def frames(self) -> int:
+        return (self.width // self.frame_w) * (self.height // self.frame_h)
+
+    @property
+    def tile_count(self) -> int:
+        return len(self.tiles) // 32
+
+
+def decode_indexed(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Palette indices (H, W) and RGB palette (N, 3) of an indexed PNG."""
+    img = QImage.fromData(data, "PNG")
+    if img.isNull():
+        raise ValueError("Not a readable PNG file.")
+    if img.format() in (QImage.Format.Format_Mono, QImage.Format.Format_MonoLSB):
+        img = img.convertToFormat(QImage.Format.Format_Indexed8)
+    if img.format() != QImage.Format.Format_Indexed8:
+        raise ValueError("Not an indexed PNG; convert it to a 16-colour palette first.")
+    table = np.array(img.colorTable(), dtype=np.uint32)
+    palette = np.stack([(table >> 16) & 255, (table >> 8) & 255, table & 255], axis=1)
+    bits = img.constBits()
+    bits.setsize(img.sizeInBytes())
+    rows = np.frombuffer(bits, np.uint8).reshape(img.height(), img.bytesPerLine())
+    return rows[:, : img.width()].copy(), palette.astype(np.uint8)
+
+
+def validate(width: int, height: int, frame_w: int, frame_h: int) -> None:
+    if (frame_w, frame_h) not in OAM_SIZES:
+        raise ValueError(f"Frame size {frame_w}x{frame_h} is not a GBA sprite size.")
+    if width % frame_w or height % frame_h:
+        raise ValueError(
+            f"Sheet is {width}x{height}, which is not a whole number of {frame_w}x{frame_h} frames."
+        )
+
+
+def encode_tiles(indices: np.ndarray, frame_w: int, frame_h: int) -> bytes:
+    """Pack (H, W) palette indices into 4bpp tiles, frame by frame."""
+    h, w = indices.shape
+    tiles = indices.reshape(h // frame_h, frame_h // 8, 8, w // frame_w, frame_w // 8, 8)
+    # (frame row, frame col, tile row, tile col, y, x)
+    tiles = np.ascontiguousarray(tiles.transpose(0, 3, 1, 4, 2, 5)).reshape(-1, 2)
+    return (tiles[:, 0] | (tiles[:, 1] << 4)).astype(np.uint8).tobytes()
+
+
+def encode_sheet(data: bytes, frame: Optional[Tuple[int, int]] = None) -> TileSheet:
+    """Encode PNG bytes without touching the cache. Raises ValueError if it won't fit."""
+    indices, palette = decode_indexed(data)
+    height, width = indices.shape
+    frame_w, frame_h = frame or frame_size(width, height)
+    validate(width, height, frame_w, frame_h)
+    if len(palette) > PALETTE_SIZE or (indices.size and int(indices.max()) >= PALETTE_SIZE):
+        raise ValueError(f"Uses {len(palette)} colours; 4bpp sprites allow at most {PALETTE_SIZE}.")
+    padded = np.zeros((PALETTE_SIZE, 3), np.uint8)
+    padded[: len(palette)] = palette
+    return TileSheet(
+        width, height, frame_w, frame_h,
+        tiles=encode_tiles(indices, frame_w, frame_h),
+        palette=encode_gbapal(padded),
+    )
+
+
+def load_sheet(path: str, frame: Optional[Tuple[int, int]] = None) -> TileSheet:
+    """Encode the PNG at *path*, reusing the cached result if its bytes are unchanged."""
+    with open(path, "rb") as f:
+        data = f.read()
+    key = content_key(data, repr(frame).encode())
+    sheet = _cache.get(key)
+    if sheet is None:
+        sheet = encode_sheet(data, frame)
+        _cache.put(key, sheet)
+    return sheet
+
+
+def write_sheet(png_path: str, frame: Optional[Tuple[int, int]] = None) -> TileSheet:
+    """Write ``.4bpp`` and ``.gbapal`` next to *png_path*, as gbagfx would."""
+    sheet = load_sheet(png_path, frame)
+    stem = os.path.splitext(png_path)[0]
+    for ext, data in ((".4bpp", sheet.tiles), (".gbapal", sheet.palette)):
+        with open(stem + ext, "wb") as f:
+            f.write(data)
+    return sheet
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("usage: gba_tiles.py SHEET.png [WxH]")
+        sys.exit(2)
+    size = tuple(int(v) for v in sys.argv[2].lower().split("x")) if len(sys.argv) == 3 else None
+    try:
+        result = write_sheet(sys.argv[1], size)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}")
+        sys.exit(1)
+    print(f"{result.frames} frame(s) of {result.frame_w}x{result.frame_h}, {result.tile_count} tiles.")
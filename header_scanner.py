@@ -0,0 +1,148 @@
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Prefixes of the constant vocabularies the editor reads from include/constants.
+DEFAULT_PREFIXES = ("MOVE_", "ITEM_", "NATURE_", "ABILITY_", "TYPE_", "TRAINER_")
+
+_SECTION_RX = re.compile(r"^\s*//\s*(?P<title>\S.*?)\s*$")
+_BLOCK_COMMENT_RX = re.compile(r"/\*.*?\*/")
+
+
+def section_key(title: str) -> str:
+    """Normalise a section comment so "Poké Balls" and "poke balls" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]", "", stripped.casefold())
+
+
+@dataclass
+class Define:
+    name: str
+    value: str
+    line: int                 # 1-based line number in the header
+    prefix: str = ""          # matched vocabulary prefix, "" if none
+    section: str = ""         # title of the enclosing // comment section
+    comment: str = ""         # trailing // comment, if any
+
+    @property
+    def suffix(self) -> str:
+        return self.name[len(self.prefix):]
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.value[:1].isdigit()
+
+
+@dataclass
+class Section:
+    title: str
+    start: int                # line of the // comment that opens the section
+    end: int                  # first line of the next section (exclusive)
+
+
+@dataclass
+class HeaderScan:
+    path: str
+    mtime: float = 0.0
+    size: int = 0
+    defines: Dict[str, Define] = field(default_factory=dict)
+    sections: List[Section] = field(default_factory=list)
+    by_prefix: Dict[str, List[Define]] = field(default_factory=dict)
+
+    def section(self, title: str) -> Optional[Section]:
+        key = section_key(title)
+        return next((s for s in self.sections if section_key(s.title) == key), None)
+
+    def span(self, start_title: str, end_title: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Line range from one section comment up to (not including) another."""
+        start = self.section(start_title)
+        if start is None:
+            return None
+        end = self.section(end_title) if end_title else None
+        if end is not None and end.start > start.start:
+            return start.start, end.start
+        return start.start, start.end
+
+    def with_prefix(self, prefix: str, span: Optional[Tuple[int, int]] = None) -> List[Define]:
+        found = self.by_prefix.get(prefix, [])
+        if span is None:
+            return list(found)
+        lo, hi = span
+        return [d for d in found if lo <= d.line < hi]
+
+
+class HeaderScanner:
+    """
+    Reads C headers once and keeps every ``#define`` with its line number and
+    section, so all constant vocabularies can be served from a single pass.
+
+    Results are cached per file and only re-read when the file changes.
+    """
+
+    def __init__(self, prefixes: Iterable[str] = DEFAULT_PREFIXES):
+        self.prefixes = tuple(sorted(set(prefixes), key=len, reverse=True))
+        alternation = "|".join(re.escape(p) for p in self.prefixes)
+        self._define_rx = re.compile(
+            r"^\s*#\s*define\s+"
+            rf"(?P<name>(?P<prefix>{alternation})?[A-Za-z_]\w*)(?!\()"
+            r"(?:\s+(?P<value>.*?))?\s*(?://\s*(?P<comment>.*))?$"
+        )
+        self._cache: Dict[str, HeaderScan] = {}
+
+    def scan(self, path: str) -> HeaderScan:
+        """Return the scan of *path*, re-reading it only if it changed on disk."""
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self._cache.pop(key, None)
+            return HeaderScan(path=key)
+
+        cached = self._cache.get(key)
+        if cached and cached.mtime == st.st_mtime and cached.size == st.st_size:
+            return cached
+
+        result = HeaderScan(path=key, mtime=st.st_mtime, size=st.st_size)
+        result.by_prefix = {p: [] for p in self.prefixes}
+        current: Optional[Section] = None
+        lineno = 0
+
+        with open(key, encoding="utf-8", errors="ignore") as f:
+            for lineno, line in enumerate(f, start=1):
+                if "#" in line:
+                    match = self._define_rx.match(line)
+                    if match:
+                        value = _BLOCK_COMMENT_RX.sub("", match.group("value") or "").strip()
+                        define = Define(
+                            name=match.group("name"),
+                            value=value,
+                            line=lineno,
+                            prefix=match.group("prefix") or "",
+                            section=current.title if current else "",
+                            comment=(match.group("comment") or "").strip(),
+                        )
+                        result.defines.setdefault(define.name, define)
+                        if define.prefix:
+                            result.by_prefix[define.prefix].append(define)
+                        continue
+
+                section = _SECTION_RX.match(line)
+                if section:
+                    current = Section(section.group("title"), lineno, lineno + 1)
+                    result.sections.append(current)
+
+        # each section runs until the next one opens (or the end of the file)
+        for this, following in zip(result.sections, result.sections[1:] + [None]):
+            this.end = following.start if following else lineno + 1
+
+        self._cache[key] = result
+        return result
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        if path is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(os.path.abspath(path), None)
@@ -0,0 +1,169 @@
+"""
+Undo/redo for the in-memory trainer roster.
+
+History entries are deltas, not snapshots. An edit copies only the trainers
+it touches, runs, and is then compared field by field with what it started
+from. The step keeps just the fields that changed, as ``(old, new)`` pairs:
+a trainer field (``("name",)``), one party member's field
+(``("party", 2, "level")``), or the members added or removed at the end of
+the party (``("party", 3)``). Memory therefore grows with the size of the
+edits, and history has no length limit.
+
+Edits that do not change the trainer's trainers.party text (an empty IV
+spinner becoming 0 rather than None, say) are not recorded.
+"""
+import copy
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from trainer_parser import Pokemon, Trainer, format_trainer
+
+_TRAINER_FIELDS = [f.name for f in fields(Trainer) if f.name != "party"]
+_POKEMON_FIELDS = [f.name for f in fields(Pokemon)]
+
+
+@dataclass(frozen=True)
+class Change:
+    index: int              # trainer's position in the roster
+    path: Tuple             # see module docstring
+    old: Any
+    new: Any
+
+
+@dataclass(frozen=True)
+class Step:
+    label: str
+    changes: Tuple[Change, ...]
+
+    @property
+    def trainers(self) -> List[int]:
+        return list(dict.fromkeys(c.index for c in self.changes))
+
+
+def diff_trainer(index: int, before: Trainer, after: Trainer) -> List[Change]:
+    """Field-level changes from *before* to *after*; values are private copies."""
+    changes = []
+    for name in _TRAINER_FIELDS:
+        old, new = getattr(before, name), getattr(after, name)
+        if old != new:
+            changes.append(Change(index, (name,), copy.deepcopy(old), copy.deepcopy(new)))
+    common = min(len(before.party), len(after.party))
+    for slot in range(common):
+        a, b = before.party[slot], after.party[slot]
+        for name in _POKEMON_FIELDS:
+            old, new = getattr(a, name), getattr(b, name)
+            if old != new:
+                changes.append(Change(index, ("party", slot, name), copy.deepcopy(old), copy.deepcopy(new)))
+    if len(before.party) != len(after.party):
+        changes.append(Change(
+            index, ("party", common),
+            copy.deepcopy(tuple(before.party[common:])), copy.deepcopy(tuple(after.party[common:])),
+        ))
+    return changes
+
+
+def _apply(roster: List[Trainer], change: Change, value: Any) -> None:
+    trainer = roster[change.index]
+    value = copy.deepcopy(value)        # history keeps its own copy
+    if change.path[0] != "party":
+        setattr(trainer, change.path[0], value)
+    elif len(change.path) == 2:
+        trainer.party[change.path[1]:] = list(value)
+    else:
+        setattr(trainer.party[change.path[1]], change.path[2], value)
+
+
+def apply_step(roster: List[Trainer], step: Step, undo: bool = False) -> None:
+    """Apply *step* to *roster*, or take it back if *undo*."""
+    if undo:
+        for change in reversed(step.changes):
+            _apply(roster, change, change.old)
+    else:
+        for change in step.changes:
+            _apply(roster, change, change.new)
+
+
+class UndoStack:
+    """
+    Unlimited undo/redo over a roster list. Wrap every mutation in
+    :meth:`edit`; :meth:`undo` and :meth:`redo` apply the stored deltas
+    back to the same list. Listeners are called with ``(kind, step)``, where
+    *kind* is "do", "undo", "redo", "clear" or "restore" (*step* is None
+    for the last two).
+    """
+
+    def __init__(self):
+        self._undo: List[Step] = []
+        self._redo: List[Step] = []
+        self._listeners: List[Callable[[str, Optional[Step]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, Optional[Step]], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, kind: str, step: Optional[Step]) -> None:
+        for listener in self._listeners:
+            listener(kind, step)
+
+    @contextmanager
+    def edit(self, label: str, roster: List[Trainer], indexes: Sequence[int]) -> Iterator[None]:
+        """Record what the body changes in ``roster[i]`` for *i* in *indexes* as one step."""
+        before: Dict[int, Trainer] = {i: copy.deepcopy(roster[i]) for i in indexes if 0 <= i < len(roster)}
+        yield
+        changes: List[Change] = []
+        for i, old in before.items():
+            if format_trainer(old) != format_trainer(roster[i]):
+                changes.extend(diff_trainer(i, old, roster[i]))
+        self.push(Step(label, tuple(changes)))
+
+    def push(self, step: Step) -> None:
+        if not step.changes:
+            return
+        self._undo.append(step)
+        self._redo.clear()
+        self._notify("do", step)
+
+    def undo(self, roster: List[Trainer]) -> Optional[Step]:
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        apply_step(roster, step, undo=True)
+        self._redo.append(step)
+        self._notify("undo", step)
+        return step
+
+    def redo(self, roster: List[Trainer]) -> Optional[Step]:
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        apply_step(roster, step)
+        self._undo.append(step)
+        self._notify("redo", step)
+        return step
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._notify("clear", None)
+
+    def restore(self, undo: Sequence[Step], redo: Sequence[Step]) -> None:
+        """Replace both stacks, e.g. with history recovered from the edit journal."""
+        self._undo = list(undo)
+        self._redo = list(redo)
+        self._notify("restore", None)
+
+    @property
+    def undo_steps(self) -> Tuple[Step, ...]:
+        return tuple(self._undo)
+
+    @property
+    def redo_steps(self) -> Tuple[Step, ...]:
+        return tuple(self._redo)
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
@@ -0,0 +1,218 @@
+"""
+Crash-recovery journal for unsaved trainer edits.
+
+Every undo step is appended to a small binary file as it happens: a header
+naming the ``trainers.party`` it applies to (a hash of the file's bytes),
+then one record per step. Undo and redo are logged as bare markers. Records
+are flushed to the OS at once and fsynced by :meth:`EditJournal.sync` on
+the editor's timer, so at worst the last couple of seconds are lost if the
+machine goes down.
+
+A record is ``<length, crc32, kind>`` followed by a pickled payload. Reading
+stops at the first short or corrupt record, so a half-written tail is
+dropped. On the next start the records are replayed on top of the freshly
+parsed roster, but only if ``trainers.party`` still has the hash in the
+header.
+
+The file never needs more than one snapshot: :meth:`EditJournal.start`
+rewrites it as a header plus a single state record (the trainers that
+differ from the file on disk and the undo/redo stacks). That happens on
+save, when the file on disk changes, and whenever the journal passes
+:data:`COMPACT_BYTES`.
+"""
+import copy
+import hashlib
+import os
+import pickle
+import struct
+import zlib
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from history import Step, UndoStack, apply_step
+from trainer_parser import Trainer
+
+JOURNAL_DIR = os.path.join(os.getcwd(), ".pe_editor_journal")
+SYNC_MS = 2000
+COMPACT_BYTES = 256 * 1024
+
+MAGIC = b"PEJ1"
+_HEADER = struct.Struct("<4s20s")       # magic, trainers.party fingerprint
+_RECORD = struct.Struct("<IIB")         # payload length, crc32 of payload, kind
+DO, UNDO, REDO, STATE = 1, 2, 3, 4
+_KINDS = {"do": DO, "undo": UNDO, "redo": REDO}
+
+
+def fingerprint(path: str) -> bytes:
+    """Hash of the file's bytes; all zeros if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=20).digest()
+    except OSError:
+        return bytes(20)
+
+
+def _record(kind: int, payload: bytes = b"") -> bytes:
+    return _RECORD.pack(len(payload), zlib.crc32(payload), kind) + payload
+
+
+@dataclass
+class Recovery:
+    """What a journal holds: a state snapshot plus the steps logged after it."""
+    state: Dict[int, Trainer] = field(default_factory=dict)
+    undo: List[Step] = field(default_factory=list)
+    redo: List[Step] = field(default_factory=list)
+    tail: List[Tuple[int, Optional[Step]]] = field(default_factory=list)
+
+    @property
+    def trainers(self) -> Set[int]:
+        touched = set(self.state)
+        for _, step in self.tail:
+            if step is not None:
+                touched.update(step.trainers)
+        return touched
+
+    def __bool__(self) -> bool:
+        return bool(self.state or self.tail)
+
+    def apply(self, roster: List[Trainer], history: UndoStack) -> None:
+        """Bring *roster* (as parsed from disk) and *history* to where the journal left off."""
+        for i, saved in self.state.items():
+            if i < len(roster):
+                for f in fields(Trainer):
+                    setattr(roster[i], f.name, copy.deepcopy(getattr(saved, f.name)))
+        undo, redo = list(self.undo), list(self.redo)
+        for kind, step in self.tail:
+            if kind == DO:
+                apply_step(roster, step)
+                undo.append(step)
+                redo.clear()
+            elif kind == UNDO and undo:
+                step = undo.pop()
+                apply_step(roster, step, undo=True)
+                redo.append(step)
+            elif kind == REDO and redo:
+                step = redo.pop()
+                apply_step(roster, step)
+                undo.append(step)
+        history.restore(undo, redo)
+
+
+class EditJournal:
+    """One journal file per project, opened for appending after :meth:`start`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.base = bytes(20)
+        self._file = None
+        self._dirty = False
+
+    @classmethod
+    def for_project(cls, project_root: str, root: str = JOURNAL_DIR) -> "EditJournal":
+        key = hashlib.blake2b(os.path.abspath(project_root).encode("utf-8"), digest_size=8).hexdigest()
+        return cls(os.path.join(root, f"{key}.journal"))
+
+    # ------------------------------------------------------------------ #
+    #  Reading                                                           #
+    # ------------------------------------------------------------------ #
+    def read(self, base: bytes) -> Optional[Recovery]:
+        """The journal's edits if it was written against *base*; None if there is nothing to recover."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, journal_base = _HEADER.unpack_from(data)
+        if magic != MAGIC or journal_base != base:
+            return None
+
+        recovery = Recovery()
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            length, crc, kind = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            payload = data[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break                           # torn or corrupt tail
+            try:
+                value = pickle.loads(payload) if payload else None
+            except Exception:
+                break
+            if kind == STATE:
+                recovery.state, recovery.undo, recovery.redo = value
+                recovery.tail.clear()
+            elif kind in (DO, UNDO, REDO):
+                recovery.tail.append((kind, value))
+            offset = start + length
+        return recovery or None
+
+    # ------------------------------------------------------------------ #
+    #  Writing                                                           #
+    # ------------------------------------------------------------------ #
+    def start(
+        self,
+        base: bytes,
+        state: Optional[Dict[int, Trainer]] = None,
+        undo: Sequence[Step] = (),
+        redo: Sequence[Step] = (),
+    ) -> None:
+        """
+        Replace the journal with one for *base*: the trainers in *state*
+        differ from that file, and *undo*/*redo* are the current stacks.
+        """
+        self.close()
+        self.base = base
+        data = _HEADER.pack(MAGIC, base)
+        if state or undo or redo:
+            value = (dict(state or {}), list(undo), list(redo))
+            data += _record(STATE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp~"
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._file = open(self.path, "ab")
+        except OSError:
+            self._file = None                   # recovery is best effort; editing goes on
+
+    def record(self, kind: str, step: Optional[Step]) -> None:
+        """UndoStack listener: log "do", "undo" and "redo"."""
+        code = _KINDS.get(kind)
+        if code is None or self._file is None:
+            return
+        payload = pickle.dumps(step, protocol=pickle.HIGHEST_PROTOCOL) if code == DO else b""
+        try:
+            self._file.write(_record(code, payload))
+            self._file.flush()
+            self._dirty = True
+        except OSError:
+            self.close()
+
+    def sync(self) -> None:
+        if self._file is None or not self._dirty:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+        self._dirty = False
+
+    @property
+    def size(self) -> int:
+        return self._file.tell() if self._file is not None else 0
+
+    def close(self, discard: bool = False) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+        if discard:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
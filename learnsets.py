@@ -0,0 +1,236 @@
+"""
+Which moves each species can know, as bitsets over move IDs.
+
+Sources are the learnset headers under ``src/data/pokemon``:
+
+* ``level_up_learnsets/*.h`` - ``LEVEL_UP_MOVE(level, MOVE_X)`` arrays
+* ``teachable_learnsets.h`` - TM, HM and tutor moves
+* ``egg_moves.h`` - ``sXEggMoveLearnset`` arrays or ``egg_moves(X, ...)``
+* older trees: ``tmhm_learnsets.h`` / ``tutor_learnsets.h`` entries keyed by
+  ``[SPECIES_X]`` and ``level_up_learnset_pointers.h``
+
+Species info links each species to its arrays (see :mod:`species_data`).
+Moves known by a pre-evolution are inherited.
+
+Every species gets one Python int per level, 0-100, in which bit *n* is set
+when move ID *n* is learnable by then. TM, tutor and egg moves are set at
+every level. Level-0 entries (moves learned on evolution) count from level
+1. "Can X know this move at level L?" is then a list index and a shift.
+"""
+import glob
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from disk_cache import DiskCache, content_key
+from species_data import SpeciesTable, active_lines
+
+MAX_LEVEL = 100
+TEACHABLE, EGG = "teachable", "egg"
+
+_ARRAY_RX = re.compile(r"\b(s\w+)\s*\[\s*\w*\s*\]\s*=\s*\{?")
+_LEVEL_MOVE_RX = re.compile(r"LEVEL_UP_MOVE\(\s*(\d+)\s*,\s*(MOVE_\w+)\s*\)")
+_MOVE_RX = re.compile(r"\bMOVE_(?!NONE\b|UNAVAILABLE\b)\w+")
+_TMHM_RX = re.compile(r"\b(?:TM|HM)\d+_(\w+)")
+_SPECIES_ENTRY_RX = re.compile(r"^\[(SPECIES_\w+)\]\s*=\s*(.*)$")
+_EGG_MACRO_RX = re.compile(r"\begg_moves\(\s*(\w+)\s*,(.*)$")
+_POINTER_RX = re.compile(r"\b(s\w+Learnset)\b")
+
+# (level, MOVE_X); level is 0 outside level-up learnsets
+Entry = Tuple[int, str]
+
+
+def learnset_files(folder: str) -> List[str]:
+    """Learnset headers under *folder* (``src/data/pokemon``)."""
+    paths = glob.glob(os.path.join(folder, "level_up_learnsets", "*.h"))
+    for path in glob.glob(os.path.join(folder, "*.h")):
+        name = os.path.basename(path)
+        if "learnset" in name or name.startswith("egg_moves"):
+            paths.append(path)
+    return sorted(paths)
+
+
+def _gather(first: str, lines, opening: str, closing: str) -> str:
+    """*first* plus following lines until the brackets it opened are closed."""
+    chunks = [first]
+    depth = first.count(opening) - first.count(closing)
+    while depth > 0:
+        nxt = next(lines, None)
+        if nxt is None:
+            break
+        depth += nxt.count(opening) - nxt.count(closing)
+        chunks.append(nxt)
+    return " ".join(chunks)
+
+
+def _moves_in(text: str) -> List[Entry]:
+    entries = [(int(level), move) for level, move in _LEVEL_MOVE_RX.findall(text)]
+    if entries:
+        return entries
+    moves = _MOVE_RX.findall(text) + ["MOVE_" + m for m in _TMHM_RX.findall(text)]
+    return [(0, move) for move in moves]
+
+
+def parse_learnset_file(path: str) -> Dict[str, Dict]:
+    """
+    ``{"arrays": {symbol: [entry]}, "species": {SPECIES_X: {category: [entry]}},
+    "pointers": {SPECIES_X: symbol}}`` for one header.
+    """
+    arrays: Dict[str, List[Entry]] = {}
+    species: Dict[str, Dict[str, List[Entry]]] = {}
+    pointers: Dict[str, str] = {}
+    lines = active_lines(path)
+    for line in lines:
+        m = _ARRAY_RX.search(line)
+        if m and ("{" in line or line.rstrip().endswith("=")):
+            body = _gather(line[m.end() - 1:] if "{" in line else next(lines, ""), lines, "{", "}")
+            arrays[m.group(1)] = _moves_in(body)
+            continue
+
+        m = _EGG_MACRO_RX.search(line)
+        if m:
+            body = _gather(m.group(2), lines, "(", ")")
+            key = "SPECIES_" + m.group(1)
+            species.setdefault(key, {}).setdefault(EGG, []).extend(_moves_in(body))
+            continue
+
+        m = _SPECIES_ENTRY_RX.match(line)
+        if m:
+            body = _gather(m.group(2), lines, "(", ")")
+            pointer = _POINTER_RX.search(body)
+            if pointer:
+                pointers[m.group(1)] = pointer.group(1)
+            else:
+                species.setdefault(m.group(1), {}).setdefault(TEACHABLE, []).extend(_moves_in(body))
+    return {"arrays": arrays, "species": species, "pointers": pointers}
+
+
+class LearnsetIndex:
+    """Per-species move bitsets; species may be given as a constant or a display name."""
+
+    _shared: Dict[str, Tuple[List[Tuple[float, int]], SpeciesTable, "LearnsetIndex"]] = {}
+    _store = DiskCache("learnsets")
+
+    def __init__(self, table: SpeciesTable):
+        self.table = table
+        self._by_level: List[List[int]] = []
+        self._names: Dict[str, Optional[int]] = {}
+
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def load(cls, folder: str, table: SpeciesTable,
+             resolve: Callable[[str], Optional[int]]) -> "LearnsetIndex":
+        """
+        Index for the learnsets under *folder*. *resolve* maps ``MOVE_X`` to
+        its ID. Parsed headers come from the disk cache when unchanged; the
+        index itself is reused while the files and species table are the same.
+        """
+        paths = learnset_files(folder)
+        stamps = []
+        for path in paths:
+            st = os.stat(path)
+            stamps.append((st.st_mtime, st.st_size))
+        key = os.path.abspath(folder)
+        shared = cls._shared.get(key)
+        if shared is not None and shared[0] == stamps and shared[1] is table:
+            return shared[2]
+
+        parsed = []
+        for path in paths:
+            with open(path, "rb") as f:
+                file_key = content_key(path.encode(), f.read())
+            parsed.append(cls._store.get_or_compute(file_key, lambda p=path: parse_learnset_file(p)))
+        index = cls(table)
+        index.build(parsed, resolve)
+        cls._shared[key] = (stamps, table, index)
+        return index
+
+    def build(self, parsed: List[Dict[str, Dict]], resolve: Callable[[str], Optional[int]]) -> None:
+        arrays: Dict[str, List[Entry]] = {}
+        species: Dict[str, Dict[str, List[Entry]]] = {}
+        pointers: Dict[str, str] = {}
+        for part in parsed:
+            arrays.update(part["arrays"])
+            pointers.update(part["pointers"])
+            for name, by_cat in part["species"].items():
+                for cat, entries in by_cat.items():
+                    species.setdefault(name, {}).setdefault(cat, []).extend(entries)
+
+        bits: Dict[str, int] = {}
+
+        def bit(move: str) -> int:
+            if move not in bits:
+                move_id = resolve(move)
+                bits[move] = 0 if move_id is None or move_id < 0 else 1 << move_id
+            return bits[move]
+
+        t = self.table
+        own: List[List[int]] = []
+        for i, sp in enumerate(t.ids):
+            level_symbol = t.level_up_learnsets[i] or pointers.get(sp, "")
+            if not level_symbol:
+                # forms without their own learnset use their base form's
+                level_symbol = next((t.level_up_learnsets[t.index[f]] for f in t.forms_of(sp)
+                                     if t.level_up_learnsets[t.index[f]]), "")
+            always = 0
+            for symbol in (t.teachable_learnsets[i], t.egg_learnsets[i]):
+                for _, move in arrays.get(symbol, ()):
+                    always |= bit(move)
+            for entries in species.get(sp, {}).values():
+                for _, move in entries:
+                    always |= bit(move)
+
+            learned = [0] * (MAX_LEVEL + 1)
+            for level, move in arrays.get(level_symbol, ()):
+                learned[min(max(level, 1), MAX_LEVEL)] |= bit(move)
+            row, mask = [], always
+            for level in range(MAX_LEVEL + 1):
+                mask |= learned[level]
+                row.append(mask)
+            own.append(row)
+
+        # a species can know everything its pre-evolutions could at the same level
+        prevo = t.pre_evolutions()
+        done: Dict[int, List[int]] = {}
+
+        def final(i: int, seen: Tuple[int, ...] = ()) -> List[int]:
+            if i in done:
+                return done[i]
+            row = own[i]
+            parent = prevo.get(t.ids[i])
+            if parent is not None and t.index[parent] not in seen:
+                inherited = final(t.index[parent], seen + (i,))
+                row = [a | b for a, b in zip(row, inherited)]
+            done[i] = row
+            return row
+
+        self._by_level = [final(i) for i in range(len(t.ids))]
+        self._names.clear()
+
+    # ------------------------------------------------------------------ #
+    def _row(self, species: str) -> Optional[int]:
+        if species not in self._names:
+            constant = species if species in self.table else self.table.species_for(species)
+            self._names[species] = self.table.row(constant) if constant else None
+        return self._names[species]
+
+    def mask(self, species: str, level: int = MAX_LEVEL) -> int:
+        """Bitset of move IDs *species* can know at *level*; 0 if unknown."""
+        i = self._row(species)
+        if i is None or i >= len(self._by_level):
+            return 0
+        return self._by_level[i][min(max(level, 0), MAX_LEVEL)]
+
+    def has_data(self, species: str) -> bool:
+        return self.mask(species) != 0
+
+    def is_legal(self, species: str, move_id: int, level: int = MAX_LEVEL) -> bool:
+        return bool(self.mask(species, level) >> move_id & 1)
+
+    def legal_ids(self, species: str, level: int = MAX_LEVEL) -> List[int]:
+        mask, ids = self.mask(species, level), []
+        while mask:
+            low = mask & -mask
+            ids.append(low.bit_length() - 1)
+            mask ^= low
+        return ids
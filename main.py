@@ -1,27 +1,52 @@
 import sys
 import os
+import copy
 import glob
 import re
 import json
 import shutil
 import textwrap
 import webbrowser
+import bisect
+import html
+import time
+import subprocess
 
-from typing import List
-from PyQt6.QtCore import Qt, QStringListModel
+from typing import Dict, List, Optional
+from PyQt6.QtCore import Qt, QStringListModel, QTimer
 from PyQt6.QtGui import (
     QPixmap, QShortcut, QKeySequence, QAction, QIcon
 )
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QMessageBox,
-    QTabWidget, QCompleter, QFileDialog, QMenu
+    QTabWidget, QCompleter, QFileDialog, QMenu,
+    QGroupBox, QPlainTextEdit, QPushButton, QLabel, QHBoxLayout, QVBoxLayout,
+    QProgressDialog, QCheckBox, QComboBox, QInputDialog
 )
 
 from main_window_ui import Ui_MainWindow          # generated by pyuic6
-from trainer_parser import TrainerParser, Trainer, Pokemon
+from trainer_parser import TrainerParser, Trainer, Pokemon, format_trainer
 from PokemonTab      import PokemonTab
 from EventScriptEditor import EventScriptEditor
+from map_catalogue import MapCatalogue
+from trainer_xref import TrainerXref, describe_uses
+from stat_engine import roster_stats
+from roster_analytics import RosterAnalytics
+from BalanceReportDialog import BalanceReportDialog
+from type_chart import roster_coverage
+from damage_calc import DamageCalc
+from TypeCoverageDialog import TypeCoverageDialog
+from party_merge import merge_party
+from PartyMergeDialog import PartyMergeDialog
+from atomic_io import FileTransaction
+from history import UndoStack
+from journal import COMPACT_BYTES, SYNC_MS, EditJournal, fingerprint
+from opponents_header import OpponentsHeader
+from trainer_batch import TrainerSpec, create_trainers, parse_trainer_specs
+from sprite_import import copy_if_changed, plan_copies, run_copies
+from sprite_convert import SpriteConverter
+from event_objects import import_overworld_sprites as import_overworld_batch
 
 
 
@@ -143,6 +168,21 @@ class MainApp(QMainWindow):
         # Global shortcut
         QShortcut(QKeySequence("Ctrl+S"), self, activated=self.save_to_file)
 
+        # ---------- Undo / redo ----------
+        self.history = UndoStack()
+        self.history.add_listener(lambda _kind, _step: self.update_undo_actions())
+        self._form_dirty = False        # skjemaet har endringer som ikke er skrevet til treneren
+        self._loading_form = False
+
+        # ---------- Crash-recovery journal ----------
+        # hvert steg logges straks; fsync skjer på timer
+        self.journal: Optional[EditJournal] = None
+        self.history.add_listener(self._journal_edit)
+        self.journal_timer = QTimer(self)
+        self.journal_timer.setInterval(SYNC_MS)
+        self.journal_timer.timeout.connect(self.sync_journal)
+        self.journal_timer.start()
+
         # ---------- Recent-projects ----------
         self.recent_projects: List[str] = self.load_recent_projects()
         self.recent_actions: List[QAction] = []
@@ -168,7 +208,9 @@ class MainApp(QMainWindow):
         self.abilities: List[str] = []
         self.balls: List[str] = []
         self.tera_types: List[str] = []
+        self.map_names: List[str] = []
         self.original_trainers: List[str] = []  # snapshot for unsaved-check
+        self.saved_blocks = {}                  # trainer ID -> (formatted text, block text on disk)
 
         # ---------- Signals ----------
         self.ui.actionOpenProjectFolder.triggered.connect(self.choose_folder)
@@ -195,7 +237,10 @@ class MainApp(QMainWindow):
             lambda: self.ui.stackedWidget.setCurrentWidget(self.ui.pageMapScripts)
         )
 
-                                    
+        self._build_bulk_trainer_panel()
+        self._build_sprite_convert_options()
+        self._build_trainer_uses_panel()
+
         # Make some comboboxes editable/searchable
         for cb in (
             self.ui.comboTrainerClass,
@@ -204,6 +249,7 @@ class MainApp(QMainWindow):
             self.ui.comboTrainerMusic,
         ):
             cb.setEditable(True)
+        self._watch_trainer_form()
 
         # ---------- Auto-load last used project ----------
         if self.recent_projects:
@@ -213,6 +259,449 @@ class MainApp(QMainWindow):
                 self.ui.layoutEventScript.addWidget(self.eventScriptEditor)
                 self.load_project(last)
 
+    def _build_trainer_uses_panel(self) -> None:
+        """"Used in" list under the trainer picture, plus the unreferenced-trainers action."""
+        self.trainer_xref = None
+        self.lblTrainerUses = QLabel(self.ui.TrainerEditor)
+        self.lblTrainerUses.setGeometry(250, 300, 210, 330)
+        self.lblTrainerUses.setWordWrap(True)
+        self.lblTrainerUses.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.lblTrainerUses.setTextFormat(Qt.TextFormat.RichText)
+        self.lblTrainerUses.linkActivated.connect(self.open_trainer_use)
+
+        self.actionOrphanTrainers = QAction("Unreferenced Trainers…", self)
+        self.actionOrphanTrainers.triggered.connect(self.show_orphan_trainers)
+        self.ui.menuTrainer_Editor.addAction(self.actionOrphanTrainers)
+
+        self.actionExportStats = QAction("Export Party Stats (CSV)…", self)
+        self.actionExportStats.triggered.connect(self.export_party_stats)
+        self.ui.menuTrainer_Editor.addAction(self.actionExportStats)
+
+        self.roster_analytics = RosterAnalytics()
+        self.actionBalanceReport = QAction("Balance Report…", self)
+        self.actionBalanceReport.triggered.connect(self.show_balance_report)
+        self.ui.menuTrainer_Editor.addAction(self.actionBalanceReport)
+
+        self.actionTypeCoverage = QAction("Type Coverage…", self)
+        self.actionTypeCoverage.triggered.connect(self.show_type_coverage)
+        self.ui.menuTrainer_Editor.addAction(self.actionTypeCoverage)
+
+        self._damage_calc = None
+        self.actionReferenceTeam = QAction("Reference Team…", self)
+        self.actionReferenceTeam.triggered.connect(self.edit_reference_team)
+        self.ui.menuTrainer_Editor.addAction(self.actionReferenceTeam)
+
+        self.actionExportDamage = QAction("Export Damage Ranges (CSV)…", self)
+        self.actionExportDamage.triggered.connect(self.export_damage_ranges)
+        self.ui.menuTrainer_Editor.addAction(self.actionExportDamage)
+
+        self.actionUndo = QAction("Undo", self)
+        self.actionUndo.setShortcuts([QKeySequence("Ctrl+Z")])
+        self.actionUndo.triggered.connect(self.undo)
+        self.actionRedo = QAction("Redo", self)
+        self.actionRedo.setShortcuts([QKeySequence("Ctrl+Y"), QKeySequence("Ctrl+Shift+Z")])
+        self.actionRedo.triggered.connect(self.redo)
+        first = self.ui.menuTrainer_Editor.actions()[0] if self.ui.menuTrainer_Editor.actions() else None
+        self.ui.menuTrainer_Editor.insertActions(first, [self.actionUndo, self.actionRedo])
+        self.ui.menuTrainer_Editor.insertSeparator(first)
+        self.update_undo_actions()
+
+        self.actionMergeParty = QAction("Merge trainers.party…", self)
+        self.actionMergeParty.triggered.connect(self.merge_trainers_party)
+        self.ui.menuTrainer_Editor.addAction(self.actionMergeParty)
+
+    def refresh_trainer_xref(self) -> None:
+        if not self.project_folder:
+            return
+        try:
+            self.trainer_xref = TrainerXref.for_project(self.project_folder)
+        except OSError as e:
+            self.trainer_xref = None
+            self.lblTrainerUses.setText(f"Could not scan scripts: {html.escape(str(e))}")
+
+    def show_trainer_uses(self, trainer_id: str) -> None:
+        if self.trainer_xref is None:
+            self.lblTrainerUses.clear()
+            return
+        uses = self.trainer_xref.uses(trainer_id)
+        if not uses:
+            self.lblTrainerUses.setText("<b>Used in:</b> nothing – no script references this trainer.")
+            return
+        rows = []
+        for use, text in zip(uses, describe_uses(uses, limit=12)):
+            target = html.escape(f"{use.map}|{use.label}", quote=True)
+            link = f'<a href="{target}">{html.escape(text)}</a>' if use.map and use.label else html.escape(text)
+            rows.append(link)
+        if len(uses) > 12:
+            rows.append(f"… and {len(uses) - 12} more")
+        self.lblTrainerUses.setText("<b>Used in:</b><br>" + "<br>".join(rows))
+
+    def open_trainer_use(self, link: str) -> None:
+        map_rel, _, label = link.partition("|")
+        if not hasattr(self, "eventScriptEditor"):
+            return
+        self.ui.stackedWidget.setCurrentWidget(self.ui.pageMapScripts)
+        self.eventScriptEditor.show_block(map_rel, label)
+
+    def show_orphan_trainers(self) -> None:
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        self.refresh_trainer_xref()
+        if self.trainer_xref is None:
+            return
+        opp_path = os.path.join(self.project_folder, "include", "constants", "opponents.h")
+        if os.path.isfile(opp_path):
+            defined = OpponentsHeader.open(opp_path, self.parser.defines).trainer_ids()
+        else:
+            defined = [t.id for t in self.trainers]
+        orphans = self.trainer_xref.orphans(defined)
+        box = QMessageBox(self)
+        box.setWindowTitle("Unreferenced trainers")
+        box.setText(f"{len(orphans)} of {len(defined)} trainers are not used by any map script.")
+        if orphans:
+            box.setDetailedText("\n".join(orphans))
+        box.exec()
+
+    def export_party_stats(self) -> None:
+        """Final stats of every trainer Pokémon, for balance review."""
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        roster = self._form_roster()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export party stats", os.path.join(self.project_folder, "party_stats.csv"),
+            "CSV files (*.csv)",
+        )
+        if not path:
+            return
+        sheet = roster_stats(roster, self.parser.species_table)
+        try:
+            sheet.write_csv(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export failed", str(e))
+            return
+        unknown = int((sheet.stats[:, 0] < 0).sum())
+        note = f"\n{unknown} had a species missing from species_info and were left blank." if unknown else ""
+        QMessageBox.information(self, "Party stats", f"Wrote stats for {len(sheet.rows)} Pokémon.{note}")
+
+    def build_balance_report(self):
+        """(report, trainers re-read, seconds) for the in-memory roster, form edits included."""
+        started = time.perf_counter()
+        roster = self._form_roster()
+        xref = self.trainer_xref
+
+        def map_of(trainer_id: str) -> str:
+            maps = xref.maps_using(trainer_id) if xref is not None else []
+            return maps[0] if maps else ""
+
+        rebuilt = self.roster_analytics.update(roster, map_of)
+        report = self.roster_analytics.report()
+        return report, rebuilt, time.perf_counter() - started
+
+    def show_balance_report(self) -> None:
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        BalanceReportDialog(self.build_balance_report, self).exec()
+
+    def show_type_coverage(self) -> None:
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+
+        def build():
+            return roster_coverage(self._form_roster(), self.parser.species_table, self.parser.type_chart)
+
+        TypeCoverageDialog(build, self.select_trainer, self).exec()
+
+    def damage_calc(self) -> DamageCalc:
+        """Damage calculator for the loaded project and the saved reference team."""
+        if self._damage_calc is None:
+            try:
+                team = self.parser.parse_party(self.load_settings().get("reference_team", ""))
+            except ValueError:
+                team = []       # en ødelagt lagret tekst skal ikke stoppe innlastingen
+            self._damage_calc = DamageCalc(
+                self.parser.species_table, self.parser.move_table, self.parser.type_chart, team
+            )
+        return self._damage_calc
+
+    def edit_reference_team(self) -> None:
+        """The player team that trainer damage is measured against, in trainers.party format."""
+        text = self.load_settings().get("reference_team", "")
+        while True:
+            text, ok = QInputDialog.getMultiLineText(
+                self, "Reference team",
+                "Player team for damage ranges, written like a party in trainers.party:",
+                text,
+            )
+            if not ok:
+                return
+            try:
+                self.parser.parse_party(text)
+            except ValueError as e:
+                QMessageBox.warning(self, "Reference team", f"{e}\n\nThe team was not saved.")
+                continue
+            break
+        self.save_setting("reference_team", text)
+        self._damage_calc = None
+        if self.project_folder:
+            # bare trusselteksten oppdateres; skjemaet og fanene beholder uanvendte endringer
+            calc = self.damage_calc()
+            for i in range(self.party_tabs.count()):
+                tab = self.party_tabs.widget(i)
+                tab.damage_calc = calc
+                tab.update_threats()
+
+    def export_damage_ranges(self) -> None:
+        """Min/max damage of every trainer move against the reference team."""
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        calc = self.damage_calc()
+        if not calc.ready:
+            QMessageBox.warning(
+                self, "Damage ranges",
+                "Needs src/data/moves_info.h, species info and a reference team (Trainer Editor > Reference Team…).",
+            )
+            return
+        roster = self._form_roster()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export damage ranges", os.path.join(self.project_folder, "damage_ranges.csv"),
+            "CSV files (*.csv)",
+        )
+        if not path:
+            return
+        started = time.perf_counter()
+        matrix = calc.roster(roster)
+        seconds = time.perf_counter() - started
+        try:
+            matrix.write_csv(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export failed", str(e))
+            return
+        QMessageBox.information(
+            self, "Damage ranges",
+            f"Calculated {len(matrix.rows)} Pokémon against {len(matrix.targets)} targets "
+            f"in {seconds * 1000:.0f} ms.",
+        )
+
+    def _party_merge_versions(self, trainer_path: str):
+        """(base, ours, theirs) texts from git's merge stages, or None outside a conflicted merge."""
+        texts = []
+        for stage in (1, 2, 3):
+            try:
+                proc = subprocess.run(
+                    ["git", "show", f":{stage}:./{os.path.basename(trainer_path)}"],
+                    cwd=os.path.dirname(trainer_path), capture_output=True, timeout=30,
+                )
+            except (OSError, subprocess.SubprocessError):
+                return None
+            if proc.returncode != 0:
+                return None
+            texts.append(proc.stdout.decode("utf-8", errors="replace"))
+        return tuple(texts)
+
+    def merge_trainers_party(self) -> None:
+        """Three-way merge of trainers.party; conflicts are resolved in PartyMergeDialog."""
+        if not self.project_folder:
+            QMessageBox.warning(self, "No project", "Open a project folder first.")
+            return
+        if self.has_unsaved_changes():
+            QMessageBox.warning(self, "Merge", "Save or reload your trainer changes before merging.")
+            return
+        trainer_path = os.path.join(self.project_folder, "src", "data", "trainers.party")
+        versions = self._party_merge_versions(trainer_path)
+        if versions is None:
+            # ikke midt i en git-merge: velg de to andre versjonene selv
+            theirs_path, _ = QFileDialog.getOpenFileName(
+                self, "Their trainers.party", self.project_folder, "Party files (*.party);;All files (*)")
+            if not theirs_path:
+                return
+            base_path, _ = QFileDialog.getOpenFileName(
+                self, "Common ancestor (base) trainers.party", os.path.dirname(theirs_path),
+                "Party files (*.party);;All files (*)")
+            if not base_path:
+                return
+            try:
+                versions = tuple(
+                    open(p, encoding="utf-8").read() for p in (base_path, trainer_path, theirs_path)
+                )
+            except OSError as e:
+                QMessageBox.critical(self, "Merge", str(e))
+                return
+
+        result = merge_party(*versions)
+        if result.conflicts and PartyMergeDialog(result, self).exec() != PartyMergeDialog.DialogCode.Accepted:
+            return
+        txn = FileTransaction()
+        txn.write(trainer_path, result.text())
+        try:
+            txn.commit()
+        except OSError as e:
+            QMessageBox.critical(self, "Merge", f"Could not write trainers.party:\n{e}")
+            return
+        self.reload_data_only()
+        QMessageBox.information(
+            self, "Merge",
+            f"trainers.party merged: {len(result.order)} trainers, "
+            f"{result.auto_merged} merged field by field, {len(result.conflicts)} conflict(s) resolved.",
+        )
+
+    # ───────────────────────── Undo / redo ──────────────────────────
+    def update_undo_actions(self) -> None:
+        if not hasattr(self, "actionUndo"):
+            return
+        undo, redo = self.history.undo_label, self.history.redo_label
+        self.actionUndo.setEnabled(undo is not None)
+        self.actionUndo.setText(f"Undo {undo}" if undo else "Undo")
+        self.actionRedo.setEnabled(redo is not None)
+        self.actionRedo.setText(f"Redo {redo}" if redo else "Redo")
+
+    def undo(self) -> None:
+        # uncommitted edits in the form become their own step first, so they are what gets undone
+        if self._form_dirty:
+            self.apply_changes_to_current_trainer()
+        self._show_history_step(self.history.undo(self.trainers))
+
+    def redo(self) -> None:
+        if self._form_dirty:
+            self.apply_changes_to_current_trainer()
+        self._show_history_step(self.history.redo(self.trainers))
+
+    def _show_history_step(self, step) -> None:
+        if step is None:
+            return
+        idx = step.trainers[0]
+        combo = self.ui.comboTrainerDropdown
+        if combo.currentIndex() != idx:
+            combo.setCurrentIndex(idx)      # → update_trainer_fields
+        else:
+            self.update_trainer_fields()
+        self.ui.statusbar.showMessage(f"{step.label}: {len(step.changes)} field(s)", 4000)
+
+    # ───────────────────── Crash-recovery journal ─────────────────────
+    def _journal_edit(self, kind: str, step) -> None:
+        if self.journal is not None:
+            self.journal.record(kind, step)
+
+    def _party_fingerprint(self) -> bytes:
+        return fingerprint(os.path.join(self.project_folder, "src/data/trainers.party"))
+
+    def _unsaved_trainers(self) -> Dict[int, Trainer]:
+        """Trainers that differ from trainers.party as last loaded or saved, by roster index."""
+        return {
+            i: t for i, t in enumerate(self.trainers)
+            if i >= len(self.original_trainers) or repr(t) != self.original_trainers[i]
+        }
+
+    def open_journal(self, recover: bool = False) -> None:
+        """Start a fresh journal for the project; with *recover*, first offer to replay the last one."""
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = EditJournal.for_project(self.project_folder)
+        base = self._party_fingerprint()
+        recovery = self.journal.read(base) if recover else None
+        if recovery is not None:
+            reply = QMessageBox.question(
+                self,
+                "Recover edits",
+                f"The editor was not closed normally last time. Unsaved edits to "
+                f"{len(recovery.trainers)} trainer(s) were recovered.\n\nRestore them?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes,
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                recovery.apply(self.trainers, self.history)
+                self.update_trainer_fields()
+                self.journal.start(base, self._unsaved_trainers(),
+                                   self.history.undo_steps, self.history.redo_steps)
+                return
+        self.journal.start(base)
+
+    def compact_journal(self, rebase: bool = False) -> None:
+        """Rewrite the journal as one snapshot; *rebase* after trainers.party changed on disk."""
+        if self.journal is None:
+            return
+        base = self._party_fingerprint() if rebase else self.journal.base
+        self.journal.start(base, self._unsaved_trainers(), self.history.undo_steps, self.history.redo_steps)
+
+    def sync_journal(self) -> None:
+        if self.journal is None:
+            return
+        self.journal.sync()
+        if self.journal.size > COMPACT_BYTES:
+            self.compact_journal()
+
+    def close_journal(self, discard: bool) -> None:
+        if self.journal is not None:
+            self.journal.close(discard=discard)
+            self.journal = None
+
+    def select_trainer(self, trainer_id: str) -> None:
+        idx = self.ui.comboTrainerDropdown.findText(trainer_id)
+        if idx >= 0:
+            self.ui.stackedWidget.setCurrentWidget(self.ui.TrainerEditor)
+            self.ui.comboTrainerDropdown.setCurrentIndex(idx)
+
+    def _build_bulk_trainer_panel(self) -> None:
+        """Bulk creation box on the New Trainer page (names or CSV)."""
+        box = QGroupBox("Create many trainers", self.ui.newTrainer)
+        box.setGeometry(80, 260, 320, 330)
+        self.bulkTrainerInput = QPlainTextEdit()
+        self.bulkTrainerInput.setPlaceholderText(
+            "One name per line, optionally 'Name, TRAINER_TEMPLATE'\n"
+            "or CSV with columns: name, template, class, pic"
+        )
+        load_btn = QPushButton("Load CSV…")
+        load_btn.clicked.connect(self.load_trainer_list_file)
+        create_btn = QPushButton("Create All")
+        create_btn.clicked.connect(self.create_trainers_from_list)
+        self.labelBulkStatus = QLabel()
+        self.labelBulkStatus.setWordWrap(True)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(load_btn)
+        buttons.addWidget(create_btn)
+        lay = QVBoxLayout(box)
+        lay.addWidget(self.bulkTrainerInput)
+        lay.addLayout(buttons)
+        lay.addWidget(self.labelBulkStatus)
+
+    def _build_sprite_convert_options(self) -> None:
+        """'Convert to GBA palette' options on both sprite import pages."""
+        self.sprite_palette_path = ""
+        self.sprite_palette_labels = []
+
+        def add_options(page, y):
+            check = QCheckBox("Convert to 16-colour GBA palette", page)
+            check.setGeometry(80, y, 300, 20)
+            btn = QPushButton("Remap to palette…", page)
+            btn.setGeometry(80, y + 25, 150, 24)
+            btn.clicked.connect(self.choose_sprite_palette)
+            label = QLabel("Palette: own per sprite", page)
+            label.setGeometry(80, y + 52, 300, 20)
+            self.sprite_palette_labels.append(label)
+            return check
+
+        self.checkConvertTrainerPics = add_options(self.ui.pageImportTrainerPics, 100)
+        self.checkConvertOverworld = add_options(self.ui.pageImportOWSprite, 170)
+
+    def choose_sprite_palette(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select palette", self.project_folder or "", "Palettes (*.pal *.gbapal)"
+        )
+        self.sprite_palette_path = path
+        text = f"Palette: {os.path.basename(path)}" if path else "Palette: own per sprite"
+        for label in self.sprite_palette_labels:
+            label.setText(text)
+
+    def _sprite_writer(self, check: QCheckBox):
+        if not check.isChecked():
+            return copy_if_changed
+        return SpriteConverter(self.sprite_palette_path or None)
+
     def generate_map_script(self, trainer_id: str, map_name: str) -> str:
         return textwrap.dedent(f"""\
             // Auto-generated map script for {map_name}
@@ -265,10 +754,9 @@ class MainApp(QMainWindow):
             QMessageBox.critical(self, "Save Error", str(e))
 
     def populate_map_names(self):
-        maps_dir = os.path.join(self.project_folder, "data", "maps")
-        if not os.path.isdir(maps_dir):
-            return
-        maps = [os.path.splitext(f)[0] for f in os.listdir(maps_dir) if f.endswith(".map")]
+        # delt katalog: EventScriptEditor bruker samme instans
+        self.map_catalogue = MapCatalogue.for_project(self.project_folder)
+        self.map_names = self.map_catalogue.names()
 
     def reload_data_only(self) -> None:
         """Reload all trainer data from disk, but stay on current page."""
@@ -279,6 +767,9 @@ class MainApp(QMainWindow):
             self.trainers = self.parser.trainers
             self.populate_trainer_dropdown()
             self.original_trainers = self._snapshot_trainers()
+            self._remember_party_blocks()
+            self.history.clear()
+            self.open_journal()
         except Exception as e:
             QMessageBox.critical(self, "Reload error", str(e))
     def reload_project_data(self) -> None:
@@ -287,8 +778,13 @@ class MainApp(QMainWindow):
             return
         try:
             self.parser.load_trainers(os.path.join(self.project_folder, "src/data/trainers.party"))
+            self.parser.load_defines(self.project_folder)
             self.parser.load_species(os.path.join(self.project_folder, "src/data/pokemon"))
             self.parser.load_moves(os.path.join(self.project_folder, "include/constants/moves.h"))
+            self.parser.load_learnsets(os.path.join(self.project_folder, "src/data/pokemon"))
+            self.parser.load_type_chart(self.project_folder)
+            self.parser.load_move_info(self.project_folder)
+            self._damage_calc = None
             self.parser.load_items(os.path.join(self.project_folder, "include/constants/items.h"))
             self.parser.load_natures(os.path.join(self.project_folder, "include/constants/nature.h"))
             self.parser.load_abilities(os.path.join(self.project_folder, "include/constants/abilities.h"))
@@ -297,6 +793,10 @@ class MainApp(QMainWindow):
             self.trainers = self.parser.trainers
             self.populate_trainer_dropdown()
             self.original_trainers = self._snapshot_trainers()
+            self._remember_party_blocks()
+            self.history.clear()
+            self.open_journal()
+            self.refresh_trainer_xref()
 
             print("✅ All project data reloaded successfully.")
         except Exception as e:
@@ -312,72 +812,63 @@ class MainApp(QMainWindow):
             self.ui.labelCreateTrainerStatus.setText("❌ Please enter a trainer name.")
             return
 
-        trainer_id = "TRAINER_" + re.sub(r"\s+", "_", name.upper())
-        opp_path = os.path.join(self.project_folder, "include", "constants", "opponents.h")
-        party_path = os.path.join(self.project_folder, "src", "data", "trainers.party")
+        created = self._create_trainers([TrainerSpec(name=name)], self.ui.labelCreateTrainerStatus)
+        if created:
+            self.ui.labelCreateTrainerStatus.setText(f"✅ Created {created[0].id}.")
 
-        if not os.path.isfile(opp_path) or not os.path.isfile(party_path):
-            self.ui.labelCreateTrainerStatus.setText("❌ Missing opponents.h or trainers.party.")
+    def create_trainers_from_list(self):
+        if not self.project_folder:
+            self.labelBulkStatus.setText("❌ No project folder set.")
             return
 
-        try:
-            # Les og oppdater opponents.h
-            with open(opp_path, encoding="utf-8") as f:
-                lines = f.readlines()
-
-            count_i = next(i for i, l in enumerate(lines) if l.startswith("#define TRAINERS_COUNT"))
-            max_i   = next(i for i, l in enumerate(lines) if l.startswith("#define MAX_TRAINERS_COUNT"))
-            trainer_count = int(re.search(r"\d+", lines[count_i]).group())
-            max_count     = int(re.search(r"\d+", lines[max_i]).group())
-
-
-
-            # Sjekk om allerede finnes
-            if any(trainer_id in l for l in lines):
-                self.ui.labelCreateTrainerStatus.setText(f"❌ {trainer_id} already exists.")
-                return
-            
-            # SJEKK GRENSE
-            if trainer_count >= max_count or trainer_count >= 1200:
-                self.ui.labelCreateTrainerStatus.setText("❌ Max number of trainers reached (1200).")
-                return
-            
-            new_id = trainer_count
-            # Fjern gamle COUNT-linjer
-            del lines[max_i]
-            del lines[count_i]
-
-            # Sett inn ny trener + oppdaterte tellere
-            lines.insert(count_i, f"#define {trainer_id} {new_id}\n")
-            lines.insert(count_i + 1, f"#define TRAINERS_COUNT {trainer_count + 1}\n")
-            lines.insert(count_i + 2, f"#define MAX_TRAINERS_COUNT {max_count + 1}\n")
-
+        specs = parse_trainer_specs(self.bulkTrainerInput.toPlainText())
+        if not specs:
+            self.labelBulkStatus.setText("❌ Enter one name per line or a CSV with a name column.")
+            return
 
-            with open(opp_path, "w", encoding="utf-8") as f:
-                f.writelines(lines)
+        created = self._create_trainers(specs, self.labelBulkStatus)
+        if created:
+            self.labelBulkStatus.setText(f"✅ Created {len(created)} trainers.")
+            self.bulkTrainerInput.clear()
 
-            # Legg til i trainers.party
-            block = textwrap.dedent(f"""
-    === {trainer_id} ===
-    Name: {name}
-    Class: Pkmn Trainer 1
-    Pic: Hiker
-    Gender: Male
-    Music: Male
-    Double Battle: No
+    def load_trainer_list_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select trainer list", self.project_folder or "", "Trainer lists (*.csv *.txt)"
+        )
+        if path:
+            with open(path, encoding="utf-8") as f:
+                self.bulkTrainerInput.setPlainText(f.read())
 
-    Bulbasaur
-    Level: 50
-""")
+    def _create_trainers(self, specs: List[TrainerSpec], status_label) -> List[Trainer]:
+        """Write *specs* to opponents.h and trainers.party in one transaction."""
+        try:
+            created = create_trainers(
+                self.project_folder,
+                specs,
+                {t.id: t for t in self.trainers},
+                self.parser.defines,
+            )
+        except (OSError, ValueError) as e:
+            status_label.setText(f"❌ {e}")
+            return []
 
-            with open(party_path, "a", encoding="utf-8") as f:
-                f.write(block)
+        self.add_trainers_to_roster(created)
+        self.compact_journal(rebase=True)
+        return created
 
-            self.ui.labelCreateTrainerStatus.setText(f"✅ Created {trainer_id}.")
-            self.reload_data_only()
+    def add_trainers_to_roster(self, created: List[Trainer]) -> None:
+        """Append freshly written trainers without re-parsing the project."""
+        ids = [t.id for t in created]
+        self.trainers.extend(created)
+        self.original_trainers.extend(repr(t) for t in created)
 
-        except Exception as e:
-            self.ui.labelCreateTrainerStatus.setText(f"❌ Error: {e}")
+        combo = self.ui.comboTrainerDropdown
+        combo.blockSignals(True)
+        combo.addItems(ids)
+        combo.blockSignals(False)
+        completer = combo.completer()
+        if completer and isinstance(completer.model(), QStringListModel):
+            completer.model().setStringList(completer.model().stringList() + ids)
 
     def open_overworld_import(self):
         self.ui.stackedWidget.setCurrentWidget(self.ui.pageImportOWSprite)
@@ -389,53 +880,49 @@ class MainApp(QMainWindow):
             self.ui.labelImportOverworldStatus.setText("❌ No PNG files selected.")
             return
 
-        dest_dir = os.path.join(self.project_folder, "graphics/object_events/pics/people")
-        os.makedirs(dest_dir, exist_ok=True)
-
         constants_path = os.path.join(self.project_folder, "include/constants/event_objects.h")
         if not os.path.exists(constants_path):
             self.ui.labelImportOverworldStatus.setText("❌ Missing event_objects.h")
             return
 
-        with open(constants_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        gfx_line_index = next((i for i, line in enumerate(lines) if "#define NUM_OBJ_EVENT_GFX" in line), -1)
-        if gfx_line_index == -1:
-            self.ui.labelImportOverworldStatus.setText("❌ Could not find NUM_OBJ_EVENT_GFX.")
-            return
-
         try:
-            current_id = int(lines[gfx_line_index].split()[-1])
-        except ValueError:
-            self.ui.labelImportOverworldStatus.setText("❌ Invalid number for NUM_OBJ_EVENT_GFX.")
+            result = import_overworld_batch(
+                self.project_folder,
+                png_files,
+                self._import_progress(len(png_files)),
+                self._sprite_writer(self.checkConvertOverworld),
+            )
+        except (OSError, ValueError) as e:
+            self.ui.labelImportOverworldStatus.setText(f"❌ {e}")
             return
 
-        imported = 0
-        for path in png_files:
-            name = os.path.splitext(os.path.basename(path))[0].lower()
-            upper = name.upper()
-            marker = f"//New_PIC {name}.png"
-            define_line = f"#define OBJ_EVENT_GFX_{upper} {current_id}\n"
-            dest_png = os.path.join(dest_dir, name + ".png")
-
-            if any(f"OBJ_EVENT_GFX_{upper}" in line for line in lines):
-                continue  # skip duplicates
-
-            shutil.copyfile(path, dest_png)
-            lines.insert(gfx_line_index, define_line)
-            lines.insert(gfx_line_index, marker + "\n")
-            current_id += 1
-            imported += 1
-
-        lines[gfx_line_index + 2] = f"#define NUM_OBJ_EVENT_GFX {current_id}\n"
-
-        with open(constants_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
-
-        self.ui.labelImportOverworldStatus.setText(f"✅ Imported {imported} overworld sprite(s).")
+        text = f"✅ Imported {len(result.imported)} overworld sprite(s)."
+        if result.duplicates:
+            text += f" Skipped {len(result.duplicates)} existing."
+        if result.failed:
+            text += f" {len(result.failed)} failed."
+        self.ui.labelImportOverworldStatus.setText(text)
+        if result.failed:
+            QMessageBox.warning(
+                self, "Overworld import",
+                "\n".join(f"{os.path.basename(src)}: {err}" for src, err in result.failed),
+            )
+        if result.missing_tables:
+            QMessageBox.warning(
+                self, "Overworld import",
+                "Could not find:\n" + "\n".join(result.missing_tables)
+                + "\n\nAdd the graphics entries for the new sprites by hand.",
+            )
 
     # ───────────────────── Unsaved-changes utilities ──────────────────
+    def _remember_party_blocks(self) -> None:
+        """Each trainer's block as read from disk, so save can keep unchanged ones byte for byte."""
+        party = self.parser.party_file
+        blocks = party.blocks if party is not None else {}
+        self.saved_blocks = {
+            t.id: ("\n".join(format_trainer(t)) + "\n", blocks[t.id]) for t in self.trainers if t.id in blocks
+        }
+
     def _snapshot_trainers(self) -> List[str]:
         """Return list of repr strings for every trainer (deep-enough for diff)."""
         return [repr(t) for t in self.trainers]
@@ -444,20 +931,29 @@ class MainApp(QMainWindow):
         return self._snapshot_trainers() != self.original_trainers
     
     # ───────────────────── Recent-project helpers ─────────────────────
-    def load_recent_projects(self) -> List[str]:
+    def load_settings(self) -> dict:
         try:
             with open(self.SETTINGS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f).get("recent_projects", [])
+                return json.load(f)
         except Exception:
-            return []
+            return {}
 
-    def save_recent_projects(self) -> None:
+    def save_setting(self, key: str, value) -> None:
+        # les inn resten først, så andre innstillinger ikke blir borte
+        settings = self.load_settings()
+        settings[key] = value
         try:
             with open(self.SETTINGS_FILE, "w", encoding="utf-8") as f:
-                json.dump({"recent_projects": self.recent_projects}, f)
+                json.dump(settings, f)
         except Exception:
             pass
 
+    def load_recent_projects(self) -> List[str]:
+        return self.load_settings().get("recent_projects", [])
+
+    def save_recent_projects(self) -> None:
+        self.save_setting("recent_projects", self.recent_projects)
+
     def update_recent_projects_menu(self) -> None:
         self.recent_menu.clear()
         self.recent_actions.clear()
@@ -477,6 +973,12 @@ class MainApp(QMainWindow):
     def on_page_changed(self, index: int) -> None:
         current_page = self.ui.stackedWidget.widget(index)
         self.party_tabs.setVisible(current_page == self.ui.TrainerEditor)
+        if current_page == self.ui.TrainerEditor and self.project_folder:
+            # fang opp skript skrevet siden sist; skjemaet bygges ikke på nytt, så uanvendte endringer beholdes
+            self.refresh_trainer_xref()
+            idx = self.ui.comboTrainerDropdown.currentIndex()
+            if 0 <= idx < len(self.trainers):
+                self.show_trainer_uses(self.trainers[idx].id)
 
     # ─────────────────────── Choose / load folder ──────────────────────
     def choose_folder(self) -> None:
@@ -519,8 +1021,13 @@ class MainApp(QMainWindow):
 
         try:
             self.parser.load_trainers(os.path.join(folder, "src/data/trainers.party"))
+            self.parser.load_defines(folder)
             self.parser.load_species(os.path.join(folder, "src/data/pokemon/species_info"))
             self.parser.load_moves(os.path.join(folder, "include/constants/moves.h"))
+            self.parser.load_learnsets(os.path.join(folder, "src/data/pokemon"))
+            self.parser.load_type_chart(folder)
+            self.parser.load_move_info(folder)
+            self._damage_calc = None
             self.parser.load_items(os.path.join(folder, "include/constants/items.h"))
             self.parser.load_natures(os.path.join(folder, "include/constants/pokemon.h"))
             self.parser.load_abilities(os.path.join(folder, "include/constants/abilities.h"))
@@ -532,10 +1039,14 @@ class MainApp(QMainWindow):
                 self.eventScriptEditor.set_species_list(self.parser.species)
 
             self.populate_static_dropdowns()
-            self.populate_trainer_dropdown()
             self.init_ai_flag_dropdown(self.parser.ai_flags)
+            self.populate_trainer_dropdown()        # viser første trener, så flaggene må finnes først
             self.original_trainers = self._snapshot_trainers()
+            self._remember_party_blocks()
+            self.history.clear()
+            self.open_journal(recover=True)
             self.populate_map_names()
+            self.refresh_trainer_xref()
 
             # Oppdater HTML-panelet hvis det finnes
             if hasattr(self.ui, "textProjectInfo"):
@@ -584,11 +1095,54 @@ class MainApp(QMainWindow):
         dest = os.path.join(self.project_folder, "graphics", "trainers", "front_pics")
         os.makedirs(dest, exist_ok=True)
 
-        for path in files:
-            shutil.copy(path, os.path.join(dest, os.path.basename(path)))
+        try:
+            writer = self._sprite_writer(self.checkConvertTrainerPics)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Palette", str(e))
+            return
+        result = run_copies(
+            plan_copies(files, dest), self._import_progress(len(files)), writer=writer
+        )
+        self._add_trainer_pics(
+            os.path.splitext(os.path.basename(p))[0] for p in result.copied
+        )
 
-        self.ui.debugLabel.setText(f"Imported {len(files)} trainer images.")
-        self.ui.debugLabel.setStyleSheet("color: green;")
+        text = f"Imported {len(result.copied)} trainer images"
+        if result.skipped:
+            text += f", {len(result.skipped)} unchanged"
+        if result.failed:
+            text += f", {len(result.failed)} failed"
+        self.ui.debugLabel.setText(text + ".")
+        self.ui.debugLabel.setStyleSheet("color: red;" if result.failed else "color: green;")
+
+    def _import_progress(self, total: int):
+        """Progress dialog for sprite imports; returns a run_copies callback."""
+        dialog = QProgressDialog("Importing sprites…", None, 0, total, self)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def update(done: int, _total: int) -> None:
+            dialog.setValue(done)
+            QApplication.processEvents()
+
+        return update
+
+    def _add_trainer_pics(self, filenames) -> None:
+        """Insert new front pics into comboTrainerPic and the lookup, keeping sort order."""
+        combo = self.ui.comboTrainerPic
+        lookup = getattr(self, "trainer_pic_lookup", {})
+        self.trainer_pic_lookup = lookup
+        names = [combo.itemText(i).casefold() for i in range(combo.count())]
+        combo.blockSignals(True)
+        for filename in filenames:
+            display_name = filename.replace("_", " ").title()
+            if display_name in lookup:
+                continue
+            lookup[display_name] = filename
+            pos = bisect.bisect_left(names, display_name.casefold())
+            names.insert(pos, display_name.casefold())
+            combo.insertItem(pos, display_name)
+        combo.blockSignals(False)
 
     def on_trainer_pic_changed(self, text: str):
         if text:
@@ -601,6 +1155,27 @@ class MainApp(QMainWindow):
             return
 
         trainer = self.trainers[idx]
+        # alt skjemaet skriver tilbake blir ett angresteg
+        with self.history.edit(f"edit {trainer.id}", self.trainers, [idx]):
+            self._write_form_to_trainer(trainer)
+        self._form_dirty = False
+
+    def _watch_trainer_form(self) -> None:
+        """Mark the form dirty on every change that update_trainer_fields did not make."""
+        ui = self.ui
+        ui.lineTrainerName.textChanged.connect(self._mark_form_dirty)
+        for cb in (ui.comboTrainerClass, ui.comboTrainerGender, ui.comboTrainerMusic, ui.comboAIFlags,
+                   ui.comboMugshot, ui.comboTrainerItem1, ui.comboTrainerItem2, ui.comboTrainerItem3):
+            cb.currentTextChanged.connect(self._mark_form_dirty)
+        # currentTextChanged på bildevalget kobles om i update_trainer_fields
+        ui.comboTrainerPic.editTextChanged.connect(self._mark_form_dirty)
+        ui.checkDoubleBattle.toggled.connect(self._mark_form_dirty)
+
+    def _mark_form_dirty(self, *_) -> None:
+        if not self._loading_form:
+            self._form_dirty = True
+
+    def _write_form_to_trainer(self, trainer: Trainer) -> None:
 
         trainer.name = self.ui.lineTrainerName.text().strip()
         trainer.class_ = self.ui.comboTrainerClass.currentText().strip()
@@ -612,38 +1187,46 @@ class MainApp(QMainWindow):
         display_name = self.ui.comboTrainerPic.currentText()
         trainer.pic = self.trainer_pic_lookup.get(display_name, display_name)
 
-        # AI-flagg (bare ett støttes nå)
+        # AI-flagg: skjemaet viser bare det første, resten beholdes
         text = self.ui.comboAIFlags.currentText().strip()
-        trainer.ai_flags = [text] if text else []
-        trainer.items = []
+        rest = [f for f in trainer.ai_flags[1:] if f != text]
+        trainer.ai_flags = ([text] if text else []) + rest
 
         # Mugshot
         text = self.ui.comboMugshot.currentText().strip()
         trainer.mugshot = text if text and text != "None" else None
 
-        # Items
-        trainer.items = []
+        # Items: tre felt i skjemaet, eventuelle flere beholdes
+        items = []
         for cb in (self.ui.comboTrainerItem1, self.ui.comboTrainerItem2, self.ui.comboTrainerItem3):
             val = cb.currentText().strip()
             if val and val != "None":
-                trainer.items.append(val)
+                items.append(val)
+        trainer.items = items + trainer.items[3:]
 
         # Pokémon-tabber → sync tilbake til .party
-        for i in range(self.party_tabs.count()):
+        for i in range(min(self.party_tabs.count(), len(trainer.party))):
             tab = self.party_tabs.widget(i)
-            if hasattr(tab, "apply_changes"):
-                tab.apply_changes()
+            if hasattr(tab, "write_to"):
+                tab.write_to(trainer.party[i])
+
+    def _form_roster(self) -> List[Trainer]:
+        """
+        The roster as reports should see it: unapplied form edits go into a
+        copy of the current trainer, so the model and undo history stay untouched.
+        """
+        idx = self.ui.comboTrainerDropdown.currentIndex()
+        if not self._form_dirty or idx < 0 or idx >= len(self.trainers):
+            return self.trainers
+        roster = list(self.trainers)
+        roster[idx] = copy.deepcopy(roster[idx])
+        self._write_form_to_trainer(roster[idx])
+        return roster
 
     #  SAVE  – exports trainers.party and updates include/constants/opponents.h
     # ------------------------------------------------------------------
     def save_to_file(self):
         # ① Validation --------------------------------------------------
-        def stat_line(vals, label):
-            names = ["HP", "Atk", "Def", "SpA", "SpD", "Spe"]
-            parts = [f"{v} {names[i]}" for i, v in enumerate(vals) if v is not None and v != 0]
-            if parts:
-                out.append(f"{label}: " + " / ".join(parts))
-
         if not self.project_folder:
             QMessageBox.warning(self, "Save", "No project folder loaded yet.")
             return
@@ -656,135 +1239,61 @@ class MainApp(QMainWindow):
         opponents_path = os.path.join(self.project_folder, "include", "constants", "opponents.h")
 
         # ② Build .party file ------------------------------------------
-        out = [SHOWDOWN_HEADER.rstrip(), ""]          # header + blank line
+        # uendrede trenere skrives tilbake nøyaktig slik de sto, så git-diffen bare viser endringene
+        party = self.parser.party_file
+        if party is not None and party.blocks:
+            out = [party.preamble] + [
+                block for key, block in party.blocks.items()
+                if key.startswith(("TRAINER_NONE", "TRAINER_XXXX"))
+            ]
+        else:
+            out = [SHOWDOWN_HEADER.rstrip() + "\n\n"]          # header + blank line
+        written = {}
 
         for tr in self.trainers:
             if tr.id in ("TRAINER_NONE", "") or tr.id.startswith("TRAINER_XXXX"):
                 continue
 
-            out += [
-                f"=== {tr.id} ===",
-                f"Name: {tr.name}",
-                f"Class: {tr.class_}",
-                f"Pic: {tr.pic}",
-                f"Gender: {tr.gender}",
-                f"Music: {tr.music}",
-                f"Double Battle: {'Yes' if tr.double_battle else 'No'}",
-            ]
-
-            # optional fields ------------------------------------------
-            if getattr(tr, "mugshot", None) and tr.mugshot not in ("", "None"):
-                out.append(f"Mugshot: {tr.mugshot}")
-
-            if tr.items:
-                good = [i for i in tr.items if i and i != "None"]
-                if good:
-                    out.append(f"Items: {' / '.join(good)}")
-
-            if tr.ai_flags and any(tr.ai_flags):
-                out.append(f"AI: {' / '.join(filter(None, tr.ai_flags))}")
-                out.append("")
-            else:
-                out.append("")  # bare en tom linje, ingen "AI:"
-
-            # ③ Pokémon -------------------------------------------------
-            for p in tr.party:
-                held = f" @ {p.held_item}" if p.held_item and p.held_item != "None" else ""
-                
-            # Bestem species-delen
-                if p.nickname:
-                    species_part = f"{p.nickname} ({p.species})"
-                else:
-                    species_part = p.species
-
-                # Bestem kjønn
-                if p.gender == "M":
-                    gender_part = " (M)"
-                elif p.gender == "F":
-                    gender_part = " (F)"
-                else:
-                    gender_part = ""
-
-                # Bestem item
-                held = f" @ {p.held_item}" if p.held_item and p.held_item != "None" else ""
-
-                # Sett sammen
-                out.append(f"{species_part}{gender_part}{held}")
-
-                out.append(f"Level: {p.level}")
-
-                # ability / nature / etc
-                if p.ability and p.ability != "None":
-                    out.append(f"Ability: {p.ability}")
-                if p.nature and p.nature != "None":
-                    out.append(f"Nature: {p.nature}")
-                if p.happiness is not None:
-                    out.append(f"Happiness: {p.happiness}")
-                if p.ball and p.ball != "None":
-                    out.append(f"Ball: {p.ball}")
-                if p.tera_type and p.tera_type != "None":
-                    out.append(f"Tera Type: {p.tera_type}")
-                if p.dynamax_level > 0:
-                    out.append(f"Dynamax Level: {p.dynamax_level}")
-                if p.is_shiny:
-                    out.append("Shiny: Yes")
-                if p.is_gigantamax:
-                    out.append("Gigantamax: Yes")
-                # IVs / EVs
-                stat_line(p.ivs, "IVs")
-                stat_line(p.evs, "EVs")
-
-                # moves
-                for m in p.moves:
-                    out.append(f"- {m}")
-                out.append("")  # blank line between mons
-
-            out.append("")      # blank line between trainers
-
-        # write file
+            formatted = "\n".join(format_trainer(tr)) + "\n"
+            saved = self.saved_blocks.get(tr.id)
+            block = saved[1] if saved is not None and saved[0] == formatted else formatted
+            if out[-1] and not out[-1].endswith("\n\n"):
+                out[-1] = out[-1].rstrip("\n") + "\n\n\n"     # forrige blokk var sist i fila
+            out.append(block)
+            written[tr.id] = (formatted, block)
+
+        # ③ Write trainers.party and opponents.h together ---------------
+        # begge filene byttes inn i én transaksjon: enten lagres begge, eller ingen
+        txn = FileTransaction()
+        txn.write(trainer_path, "".join(out).replace("\n", os.linesep))    # som tekstmodus før
+        if os.path.isfile(opponents_path):
+            opponents = None
+            try:
+                opponents = OpponentsHeader.open(opponents_path, self.parser.defines)
+                for tr in self.trainers:
+                    if tr.id.startswith("TRAINER_") and tr.id not in opponents:
+                        opponents.add(tr.id)
+                opponents.save(txn)
+            except ValueError as err:
+                # uten gyldige defines ville trainers.party peke på trenere opponents.h ikke kjenner
+                if opponents is not None:
+                    opponents.discard()
+                QMessageBox.critical(
+                    self, "Save error",
+                    f"Could not update opponents.h, so nothing was saved:\n{err}",
+                )
+                return
         try:
-            with open(trainer_path, "w", encoding="utf-8") as fh:
-                fh.write("\n".join(out))
-            QMessageBox.information(self, "Save", f"Trainers saved to:\n{trainer_path}")
+            txn.commit()
         except OSError as err:
             QMessageBox.critical(self, "Save error", str(err))
             return
+        QMessageBox.information(self, "Save", f"Trainers saved to:\n{trainer_path}")
+        self.saved_blocks = written
 
-        # ④ Update opponents.h -----------------------------------------
-        try:
-            if not os.path.isfile(opponents_path):
-                return  # file absent → silently skip
-
-            with open(opponents_path, encoding="utf-8") as fh:
-                lines = fh.readlines()
-
-            define_rx   = re.compile(r"#define\s+(TRAINER_[A-Z0-9_]+)\s+(\d+)")
-            existing    = {m.group(1): int(m.group(2)) for m in map(define_rx.match, lines) if m}
-            max_val     = max(existing.values()) if existing else -1
-            inserted    = False
-
-            for tr in self.trainers:
-                if tr.id.startswith("TRAINER_") and tr.id not in existing:
-                    max_val += 1
-                    lines.append(f"#define {tr.id} {max_val}\n")
-                    existing[tr.id] = max_val
-                    inserted = True
-
-            if inserted:
-                # update *_COUNT lines
-                for i, ln in enumerate(lines):
-                    if ln.startswith("#define TRAINERS_COUNT"):
-                        lines[i] = f"#define TRAINERS_COUNT                      {max_val+1}\n"
-                    if ln.startswith("#define MAX_TRAINERS_COUNT"):
-                        lines[i] = f"#define MAX_TRAINERS_COUNT                  {max_val+9}\n"
-
-                with open(opponents_path, "w", encoding="utf-8") as fh:
-                    fh.writelines(lines)
-        except OSError as err:
-            QMessageBox.warning(self, "Opponents.h", f"Could not update opponents.h:\n{err}")
-
-        # ⑤ Refresh snapshot → no unsaved changes now ------------------
+        # ④ Refresh snapshot → no unsaved changes now; the journal restarts from the saved file
         self.original_trainers = self._snapshot_trainers()
+        self.compact_journal(rebase=True)
 
     # ────────────────────────────────────────────────  DROPDOWNS  ──
     def populate_static_dropdowns(self):
@@ -850,10 +1359,15 @@ class MainApp(QMainWindow):
         idx = self.ui.comboTrainerDropdown.currentIndex()
         if idx < 0 or idx >= len(self.trainers):
             return
+        self._loading_form = True
+        try:
+            self._show_trainer(self.trainers[idx])
+        finally:
+            self._loading_form = False
+        self._form_dirty = False
 
-        trainer = self.trainers[idx]
-
-        self.ui.comboMugshot.setCurrentText(trainer.mugshot or "None")
+    def _show_trainer(self, trainer: Trainer) -> None:
+        self._show_combo_text(self.ui.comboMugshot, trainer.mugshot or "None")
 
         # all «vanlig» info
         self.ui.lineTrainerName.setText(trainer.name)
@@ -864,7 +1378,7 @@ class MainApp(QMainWindow):
         self.ui.checkDoubleBattle.setChecked(trainer.double_battle)
 
         # AI-flag
-        self.ui.comboAIFlags.setCurrentText(trainer.ai_flags[0] if trainer.ai_flags else "")
+        self._show_combo_text(self.ui.comboAIFlags, trainer.ai_flags[0] if trainer.ai_flags else "")
 
         # team-size dropdown
         self.ui.comboTeamSize.blockSignals(True)
@@ -885,6 +1399,7 @@ class MainApp(QMainWindow):
 
         # Pokémon-faner
         self.refresh_party_tabs(trainer)
+        self.show_trainer_uses(trainer.id)
 
     # ────────────────────────────────────────────────  TAB LOGIC  ──
     def refresh_party_tabs(self, trainer: Trainer):
@@ -903,8 +1418,14 @@ class MainApp(QMainWindow):
                 self.parser.balls,
                 self.parser.tera_types,
                 self.project_folder,
+                learnsets=self.parser.learnsets,
+                move_ids=self.parser.move_ids,
+                species_table=self.parser.species_table,
+                damage_calc=self.damage_calc(),
+                move_table=self.parser.move_table,
             )
             tab.species_changed.connect(lambda name, i=i: self.party_tabs.setTabText(i - 1, f"#{i} {name}"))
+            tab.edited.connect(self._mark_form_dirty)
             self.party_tabs.addTab(tab, f"#{i} {mon.species or 'Pokémon'}")
 
         self.ui.partyLayout.addWidget(self.party_tabs)
@@ -917,20 +1438,35 @@ class MainApp(QMainWindow):
             return
 
         trainer = self.trainers[trainer_idx]
+        if self._form_dirty:
+            self.apply_changes_to_current_trainer()     # ikke mist endringer i fanene
         current = len(trainer.party)
 
-        # utvid
-        if target_size > current:
-            for _ in range(target_size - current):
-                trainer.party.append(self.make_default_pokemon())
+        with self.history.edit(f"team size {current} → {target_size} for {trainer.id}", self.trainers, [trainer_idx]):
+            # utvid
+            if target_size > current:
+                for _ in range(target_size - current):
+                    trainer.party.append(self.make_default_pokemon())
 
-        # krymp
-        elif target_size < current:
-            trainer.party = trainer.party[:target_size]
+            # krymp
+            elif target_size < current:
+                trainer.party = trainer.party[:target_size]
 
         self.refresh_party_tabs(trainer)
 
     # ────────────────────────────────────────────────  HELPERS  ──
+    @staticmethod
+    def _show_combo_text(cb: QComboBox, text: str) -> None:
+        """setCurrentText that also shows values missing from a non-editable combo, and blank."""
+        if cb.isEditable():
+            cb.setCurrentText(text)
+        elif not text:
+            cb.setCurrentIndex(-1)
+        else:
+            if cb.findText(text) < 0:
+                cb.addItem(text)
+            cb.setCurrentText(text)
+
     def make_default_pokemon(self) -> Pokemon:
         """Returnerer en enkel Bulbasaur Lv 5 uten moves/items."""
         return Pokemon(
@@ -979,14 +1515,24 @@ class MainApp(QMainWindow):
 
             if reply == QMessageBox.StandardButton.Save:
                 self.save_to_file()
+                self.close_journal(discard=not self.has_unsaved_changes())
+                self._close_script_log()
                 event.accept()
             elif reply == QMessageBox.StandardButton.Discard:
+                self.close_journal(discard=True)
+                self._close_script_log()
                 event.accept()
             else:
-                event.ignore()
+                event.ignore()      # vinduet blir stående; loggen må være åpen
         else:
+            self.close_journal(discard=True)
+            self._close_script_log()
             event.accept()
 
+    def _close_script_log(self) -> None:
+        if hasattr(self, "eventScriptEditor"):
+            self.eventScriptEditor.close_log()
+
 
 # ─────────────────────────────── main ────────────────────────────────
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+Stamp = Optional[Tuple[float, int]]
+
+
+@dataclass
+class ObjectEvent:
+    graphics_id: str
+    x: int
+    y: int
+    script: str = ""
+    trainer_type: str = ""
+    flag: str = ""
+
+
+@dataclass
+class MapInfo:
+    name: str                 # folder name under data/maps, e.g. "Route101"
+    id: str = ""              # MAP_ROUTE101
+    group: str = ""           # gMapGroup_... from map_groups.json
+    object_events: List[ObjectEvent] = field(default_factory=list)
+    has_scripts: bool = False  # data/maps/<name>/scripts.pory exists
+
+
+def _stat(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def read_map_json(path: str) -> Tuple[str, List[ObjectEvent]]:
+    """MAP_ id and object events from one map.json; ("", []) if it is missing or broken."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return "", []
+    events = []
+    for ev in data.get("object_events") or []:
+        if not isinstance(ev, dict):
+            continue
+        events.append(ObjectEvent(
+            graphics_id=str(ev.get("graphics_id", "")),
+            x=int(ev.get("x", 0) or 0),
+            y=int(ev.get("y", 0) or 0),
+            script=str(ev.get("script", "") or ""),
+            trainer_type=str(ev.get("trainer_type", "") or ""),
+            flag=str(ev.get("flag", "") or ""),
+        ))
+    return str(data.get("id", "")), events
+
+
+class MapCatalogue:
+    """
+    Every map in data/maps, read once per project and kept up to date by mtime.
+
+    Groups come from map_groups.json. Folders it doesn't list are still
+    picked up, so trees without it work too. map.json files are parsed on a
+    thread pool. A refresh only re-reads the map.json files and the
+    map_groups.json whose mtime or size changed.
+    """
+
+    _shared: Dict[str, "MapCatalogue"] = {}
+
+    def __init__(self, project_folder: str):
+        self.project_folder = project_folder
+        self.maps_dir = os.path.join(project_folder, "data", "maps")
+        self.maps: Dict[str, MapInfo] = {}
+        self._order: List[str] = []
+        self.group_order: List[str] = []
+        self._groups_stamp: Stamp = None
+        self._group_of: Dict[str, str] = {}
+        self._json_stamps: Dict[str, Stamp] = {}
+
+    @classmethod
+    def for_project(cls, project_folder: str) -> "MapCatalogue":
+        key = os.path.abspath(project_folder)
+        catalogue = cls._shared.get(key)
+        if catalogue is None:
+            catalogue = cls._shared[key] = cls(project_folder)
+        catalogue.refresh()
+        return catalogue
+
+    # ------------------------------------------------------------------ #
+    def _load_groups(self) -> None:
+        path = os.path.join(self.maps_dir, "map_groups.json")
+        stamp = _stat(path)
+        if stamp == self._groups_stamp:
+            return
+        self._groups_stamp = stamp
+        self.group_order, self._group_of = [], {}
+        if stamp is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.group_order = [g for g in data.get("group_order", []) if isinstance(data.get(g), list)]
+        for group in self.group_order:
+            for name in data[group]:
+                self._group_of.setdefault(name, group)
+
+    def refresh(self) -> None:
+        if not os.path.isdir(self.maps_dir):
+            self.maps.clear()
+            self._order.clear()
+            self._json_stamps.clear()
+            return
+        self._load_groups()
+
+        names = list(self._group_of)
+        listed = set(names)
+        with os.scandir(self.maps_dir) as it:
+            names += sorted(e.name for e in it if e.is_dir() and e.name not in listed)
+
+        stale, present = [], set()
+        for name in names:
+            folder = os.path.join(self.maps_dir, name)
+            json_stamp = _stat(os.path.join(folder, "map.json"))
+            has_scripts = os.path.isfile(os.path.join(folder, "scripts.pory"))
+            if json_stamp is None and not has_scripts:
+                continue    # missing, or some other folder that is not a map
+            present.add(name)
+            info = self.maps.get(name)
+            if info is None:
+                info = self.maps[name] = MapInfo(name)
+            info.group = self._group_of.get(name, "")
+            info.has_scripts = has_scripts
+            if self._json_stamps.get(name, False) != json_stamp:
+                stale.append(name)
+                self._json_stamps[name] = json_stamp
+
+        self._order = [name for name in names if name in present]
+        for name in set(self.maps) - present:
+            del self.maps[name]
+            self._json_stamps.pop(name, None)
+
+        paths = [os.path.join(self.maps_dir, name, "map.json") for name in stale]
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+                parsed = list(pool.map(read_map_json, paths))
+        else:
+            parsed = [read_map_json(path) for path in paths]
+        for name, (map_id, events) in zip(stale, parsed):
+            self.maps[name].id = map_id
+            self.maps[name].object_events = events
+
+    # ------------------------------------------------------------------ #
+    def names(self) -> List[str]:
+        """Map names in map_groups.json order, then any unlisted folders."""
+        return list(self._order)
+
+    def script_maps(self) -> List[str]:
+        """Sorted names of maps that have a scripts.pory."""
+        return sorted(name for name, info in self.maps.items() if info.has_scripts)
+
+    def in_group(self, group: str) -> List[str]:
+        return [name for name in self._order if self.maps[name].group == group]
+
+    def get(self, name: str) -> Optional[MapInfo]:
+        return self.maps.get(name)
+
+    def by_id(self, map_id: str) -> Optional[MapInfo]:
+        return next((info for info in self.maps.values() if info.id == map_id), None)
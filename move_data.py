@@ -0,0 +1,185 @@
+"""
+Battle data for every move, read from ``src/data/moves_info.h``
+(``gMovesInfo``), or ``src/data/battle_moves.h`` (``gBattleMoves``) in older trees.
+
+Only the fields the editor needs are kept: power, type, category,
+accuracy, PP, priority, strike count and effect, as small NumPy columns
+with one row per ``MOVE_*`` constant (about 10 bytes a move). Text such as
+descriptions is skipped; tooltips are built from the columns on demand.
+Trees without a category field use the Gen 3 rule, where the move's type
+decides physical or special. Like :class:`species_data.SpeciesTable`,
+parsed tables are cached on disk, keyed by the hash of the header.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from disk_cache import DiskCache, content_key
+from species_data import first_branch, initializers, int_value
+from type_chart import type_label
+
+MOVE_SOURCES = ("src/data/moves_info.h", "src/data/battle_moves.h")
+
+PHYSICAL, SPECIAL, STATUS = 0, 1, 2
+CATEGORY_LABELS = ("Physical", "Special", "Status")
+# Gen 3: the type decides the category
+SPECIAL_TYPES = {
+    "TYPE_FIRE", "TYPE_WATER", "TYPE_GRASS", "TYPE_ELECTRIC",
+    "TYPE_PSYCHIC", "TYPE_ICE", "TYPE_DRAGON", "TYPE_DARK",
+}
+
+_TYPE_RX = re.compile(r"\bTYPE_\w+")
+_EFFECT_RX = re.compile(r"\bEFFECT_\w+")
+_NAME_RX = re.compile(r'"(.*?)"')
+
+
+class MoveTable:
+    """
+    ``power``, ``type`` (index into ``type_names``), ``category``,
+    ``accuracy``, ``pp``, ``priority``, ``strikes`` and ``effect`` (index
+    into ``effect_names``) hold one row per move.
+    """
+
+    _shared: Dict[str, Tuple[Tuple[float, int], "MoveTable"]] = {}
+    _store = DiskCache("moves")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.type_names: List[str] = ["TYPE_NONE"]
+        self.effect_names: List[str] = ["EFFECT_HIT"]
+        self.power = np.zeros(0, np.uint16)
+        self.type = np.zeros(0, np.uint8)
+        self.category = np.zeros(0, np.uint8)
+        self.accuracy = np.zeros(0, np.uint8)
+        self.pp = np.zeros(0, np.uint8)
+        self.priority = np.zeros(0, np.int8)
+        self.strikes = np.zeros(0, np.uint8)
+        self.effect = np.zeros(0, np.uint16)
+        self.index: Dict[str, int] = {}
+
+    @classmethod
+    def parse(cls, path: str) -> "MoveTable":
+        table = cls()
+        type_codes = {"TYPE_NONE": 0}
+        effect_codes = {"EFFECT_HIT": 0}
+        columns = []
+        for move, fields in initializers(path, "MOVE_"):
+            if move in table.index or move == "MOVE_NONE":
+                continue
+            name = _NAME_RX.search(fields.get("name", ""))
+            move_type = (_TYPE_RX.findall(first_branch(fields.get("type", ""))) or ["TYPE_NONE"])[0]
+            if move_type not in type_codes:
+                type_codes[move_type] = len(table.type_names)
+                table.type_names.append(move_type)
+            effect = (_EFFECT_RX.findall(first_branch(fields.get("effect", ""))) or ["EFFECT_HIT"])[0]
+            if effect not in effect_codes:
+                effect_codes[effect] = len(table.effect_names)
+                table.effect_names.append(effect)
+            power = int_value(fields.get("power", "0"))
+            category = first_branch(fields.get("category", fields.get("split", "")))
+            if "STATUS" in category or (not category and power == 0):
+                category_code = STATUS
+            elif "SPECIAL" in category or (not category and move_type in SPECIAL_TYPES):
+                category_code = SPECIAL
+            else:
+                category_code = PHYSICAL
+            table.index[move] = len(table.ids)
+            table.ids.append(move)
+            table.names.append(name.group(1) if name else move[len("MOVE_"):].replace("_", " ").title())
+            columns.append((
+                power,
+                type_codes[move_type],
+                category_code,
+                int_value(fields.get("accuracy", "0")),
+                int_value(fields.get("pp", "0")),
+                int_value(fields.get("priority", "0")),
+                max(1, int_value(fields.get("strikeCount", "1"), 1)),
+                effect_codes[effect],
+            ))
+
+        arr = np.array(columns, np.int64).reshape(len(columns), 8)
+        table.power = arr[:, 0].astype(np.uint16)
+        table.type = arr[:, 1].astype(np.uint8)
+        table.category = arr[:, 2].astype(np.uint8)
+        table.accuracy = arr[:, 3].astype(np.uint8)
+        table.pp = arr[:, 4].astype(np.uint8)
+        table.priority = arr[:, 5].astype(np.int8)
+        table.strikes = arr[:, 6].astype(np.uint8)
+        table.effect = arr[:, 7].astype(np.uint16)
+        return table
+
+    @classmethod
+    def load(cls, project_root: str) -> "MoveTable":
+        """Table for the project's move info header; empty if there is none."""
+        for rel in MOVE_SOURCES:
+            path = os.path.join(project_root, rel)
+            if os.path.isfile(path):
+                break
+        else:
+            return cls()
+        st = os.stat(path)
+        stamp = (st.st_mtime, st.st_size)
+        key = os.path.abspath(path)
+        shared = cls._shared.get(key)
+        if shared is not None and shared[0] == stamp:
+            return shared[1]
+
+        with open(path, "rb") as f:
+            digest = content_key(os.path.basename(path).encode(), f.read())
+        table = cls._store.get_or_compute(digest, lambda: cls.parse(path))
+        cls._shared[key] = (stamp, table)
+        return table
+
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, move: str) -> Optional[int]:
+        return self.index.get(move)
+
+    def move_for(self, name: str) -> Optional[str]:
+        """MOVE_* constant for a trainers.party move name such as "Vine Whip"."""
+        constant = "MOVE_" + re.sub(r"[^A-Za-z0-9]+", "_", name.replace("'", "")).strip("_").upper()
+        if constant in self.index:
+            return constant
+        folded = name.casefold()
+        for move, move_name in zip(self.ids, self.names):
+            if move_name.casefold() == folded:
+                return move
+        return None
+
+    def rows_for(self, names: List[str]) -> Dict[str, int]:
+        """name -> row for the names that have move info."""
+        rows = {}
+        for name in names:
+            move = self.move_for(name)
+            if move is not None:
+                rows[name] = self.index[move]
+        return rows
+
+    def describe(self, row: int) -> str:
+        """Tooltip text for one move, e.g. "Grass · Physical · 45 power · 100% · 25 PP"."""
+        parts = [type_label(self.type_names[self.type[row]]), CATEGORY_LABELS[self.category[row]]]
+        power, accuracy = int(self.power[row]), int(self.accuracy[row])
+        if power == 1:
+            parts.append("variable power")
+        elif power:
+            strikes = int(self.strikes[row])
+            parts.append(f"{power} power" + (f" x{strikes}" if strikes > 1 else ""))
+        parts.append(f"{accuracy}%" if accuracy else "never misses")
+        if self.pp[row]:
+            parts.append(f"{int(self.pp[row])} PP")
+        if self.priority[row]:
+            parts.append(f"priority {int(self.priority[row]):+d}")
+        text = f"{self.names[row]}\n" + " · ".join(parts)
+        effect = self.effect_names[self.effect[row]]
+        if effect != "EFFECT_HIT":
+            text += "\n" + effect[len("EFFECT_"):].replace("_", " ").capitalize()
+        return text
+
+    def is_damaging(self) -> np.ndarray:
+        """Moves with a fixed base power above 1 (variable-power moves use 1)."""
+        return (self.category != STATUS) & (self.power > 1)
@@ -0,0 +1,227 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from atomic_io import FileTransaction
+from define_table import DefineTable
+
+# Hard cap the editor has always enforced, on top of MAX_TRAINERS_COUNT.
+TRAINER_LIMIT = 1200
+
+_DEFINE_RX = re.compile(
+    r"^(?P<head>\s*#\s*define\s+(?P<name>TRAINER_\w+|TRAINERS_COUNT|MAX_TRAINERS_COUNT)(?!\()\s+)"
+    r"(?P<value>[^/\s][^/]*?)(?P<tail>\s*(?://.*)?)$"
+)
+
+
+class OpponentsHeader:
+    """
+    Parsed view of include/constants/opponents.h.
+
+    The file is parsed once into a dict of trainer ID → value plus a bitmap of
+    used values, so duplicate checks and ID allocation don't rescan the file.
+    New defines are queued in memory and :meth:`save` writes the whole file
+    through a :class:`FileTransaction` (temp file, fsync, ``os.replace``).
+    Use :meth:`open` to share one instance between the main window and the
+    event script editor.
+    """
+
+    _instances: Dict[str, "OpponentsHeader"] = {}
+
+    def __init__(self, path: str, defines: Optional[DefineTable] = None):
+        self.path = os.path.abspath(path)
+        self.defines = defines
+        self.lines: List[str] = []
+        self.values: Dict[str, int] = {}
+        self.line_of: Dict[str, int] = {}
+        self.trainers_count = 0
+        self.max_trainers_count = TRAINER_LIMIT
+        self._used = bytearray()
+        self._next_free = 1
+        self._last_trainer_line = -1
+        self._pending: List[Tuple[str, str]] = []
+        self._dirty_from: Optional[int] = None
+        self._value_column = 0
+        self._newline = "\n"
+        self._stat = (0.0, 0)
+        self.load()
+
+    @classmethod
+    def open(cls, path: str, defines: Optional[DefineTable] = None) -> "OpponentsHeader":
+        """Return the shared model for *path*, re-parsing it if it changed on disk."""
+        key = os.path.abspath(path)
+        header = cls._instances.get(key)
+        if header is None:
+            header = cls._instances[key] = cls(key, defines)
+        else:
+            if defines is not None:
+                header.defines = defines
+            if header._stat != header._disk_stat():
+                header.load()       # changed on disk: queued defines were planned against the old file
+        return header
+
+    # ------------------------------------------------------------------
+    def _disk_stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return (0.0, 0)
+        return (st.st_mtime, st.st_size)
+
+    def load(self) -> None:
+        """Parse the file; raises ValueError (UnicodeDecodeError) if it is not valid UTF-8."""
+        with open(self.path, encoding="utf-8", newline="") as f:
+            self.lines = f.readlines()
+        self._stat = self._disk_stat()
+        self._dirty_from = None
+        self._pending.clear()
+        if self.lines and self.lines[0].endswith("\r\n"):
+            self._newline = "\r\n"
+
+        self.values.clear()
+        self.line_of.clear()
+        pending = []
+        for i, line in enumerate(self.lines):
+            match = _DEFINE_RX.match(line.rstrip("\r\n"))
+            if not match:
+                continue
+            name, value = match.group("name"), match.group("value").strip()
+            self.line_of[name] = i
+            if not self._value_column:
+                self._value_column = len(match.group("head"))
+            if value[:1].isdigit():
+                self.values[name] = int(value, 0)
+            else:
+                pending.append((name, value))
+
+        for name, value in pending:
+            resolved = self.values.get(value)
+            if resolved is None and self.defines is not None:
+                self.defines.refresh()
+                resolved = self.defines.value(name)
+            if resolved is not None:
+                self.values[name] = resolved
+
+        self.trainers_count = self.values.pop("TRAINERS_COUNT", 0)
+        self.max_trainers_count = self.values.pop("MAX_TRAINERS_COUNT", TRAINER_LIMIT)
+
+        self._used = bytearray(max(self.capacity, self.trainers_count, 1))
+        for value in self.values.values():
+            if 0 <= value < len(self._used):
+                self._used[value] = 1
+        self._next_free = 1
+        self._last_trainer_line = max((self.line_of[n] for n in self.values), default=-1)
+
+    # ------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        return min(self.max_trainers_count, TRAINER_LIMIT)
+
+    def __contains__(self, trainer_id: str) -> bool:
+        return trainer_id in self.values
+
+    def value(self, trainer_id: str) -> Optional[int]:
+        return self.values.get(trainer_id)
+
+    def trainer_ids(self) -> List[str]:
+        """All trainer constants except TRAINER_NONE, in file order."""
+        return sorted(
+            (n for n in self.values if n != "TRAINER_NONE"),
+            key=lambda n: self.line_of.get(n, len(self.lines)),
+        )
+
+    def next_free_id(self) -> Optional[int]:
+        """Lowest unused trainer number below the capacity, or None if full."""
+        i = self._next_free
+        limit = self.capacity
+        while i < limit and i < len(self._used) and self._used[i]:
+            i += 1
+        self._next_free = i
+        return i if i < limit else None
+
+    # ------------------------------------------------------------------
+    def add(self, trainer_id: str) -> int:
+        """Allocate a number for *trainer_id* and queue its #define for :meth:`save`."""
+        if trainer_id in self.values:
+            raise ValueError(f"{trainer_id} already exists.")
+        new_id = self.next_free_id()
+        if new_id is None:
+            raise ValueError(f"Max number of trainers reached ({self.capacity}).")
+
+        if new_id >= len(self._used):
+            self._used.extend(bytes(new_id + 1 - len(self._used)))
+        self._used[new_id] = 1
+        self.values[trainer_id] = new_id
+        self._pending.append((trainer_id, self._format_define(trainer_id, new_id)))
+        self._mark_dirty(self._insert_at())
+
+        if new_id >= self.trainers_count:
+            self.trainers_count = new_id + 1
+            self._set_value("TRAINERS_COUNT", self.trainers_count)
+        return new_id
+
+    def _insert_at(self) -> int:
+        """New defines go right after the last existing trainer define."""
+        if self._last_trainer_line >= 0:
+            return self._last_trainer_line + 1
+        return self.line_of.get("TRAINERS_COUNT", len(self.lines))
+
+    def _format_define(self, name: str, value: int) -> str:
+        head = f"#define {name}"
+        return f"{head.ljust(max(self._value_column, len(head) + 1))}{value}{self._newline}"
+
+    def _set_value(self, name: str, value: int) -> None:
+        i = self.line_of.get(name)
+        if i is None:
+            return
+        line = self.lines[i]
+        ending = line[len(line.rstrip("\r\n")):]
+        match = _DEFINE_RX.match(line.rstrip("\r\n"))
+        self.lines[i] = f"{match.group('head')}{value}{match.group('tail')}{ending}"
+        self._mark_dirty(i)
+
+    def _mark_dirty(self, index: int) -> None:
+        if self._dirty_from is None or index < self._dirty_from:
+            self._dirty_from = index
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_from is not None
+
+    def discard(self) -> None:
+        """Drop queued changes and re-read the file."""
+        self.load()
+
+    def save(self, transaction: Optional[FileTransaction] = None) -> None:
+        """
+        Splice queued defines in and write the file.
+
+        With a *transaction* the text is staged there and written when the
+        caller commits; otherwise it is committed at once. Either way the
+        model reloads from disk if the write rolls back.
+        """
+        if self._dirty_from is None:
+            return
+        if self._pending:
+            at = self._insert_at()
+            for name, i in self.line_of.items():
+                if i >= at:
+                    self.line_of[name] = i + len(self._pending)
+            self.lines[at:at] = [text for _, text in self._pending]
+            for offset, (name, _) in enumerate(self._pending):
+                self.line_of[name] = at + offset
+            self._last_trainer_line = at + len(self._pending) - 1
+            self._pending.clear()
+
+        own = transaction is None
+        if own:
+            transaction = FileTransaction()
+        transaction.write(self.path, "".join(self.lines))
+        transaction.on_commit(self._mark_saved)
+        transaction.on_rollback(self.load)
+        if own:
+            transaction.commit()
+
+    def _mark_saved(self) -> None:
+        self._dirty_from = None
+        self._stat = self._disk_stat()
@@ -0,0 +1,368 @@
+"""
+Three-way merge of ``trainers.party`` at trainer and field granularity.
+
+Each version is split into ``=== TRAINER_X ===`` blocks, and every block is
+hashed. A trainer whose hash matches the base on one side takes the other
+side's block unchanged. Only trainers edited on both sides are split into
+fields (``Name``, ``AI``, ``#2 Level``, ``#2 Moves``...), and those fields
+are merged the same way. Party fields are keyed by slot, so they are only
+merged field by field while all three versions keep the same species in
+the same order; if a side added, removed or reordered members, the party is
+merged as a whole. What is left is a true conflict: the same field set to
+different values, a party changed on both sides, or a trainer edited on
+one side and deleted on the other.
+
+Usable as a git merge driver::
+
+    # .git/config (or ~/.gitconfig)
+    [merge "trainers-party"]
+        name = trainers.party trainer-level merge
+        driver = python /path/to/party_merge.py %O %A %B
+
+    # .gitattributes
+    src/data/trainers.party merge=trainers-party
+
+The merged text is written over ``%A``. Unresolved conflicts are written
+with the usual ``<<<<<<<`` markers and the exit status is 1, so git reports
+the file as conflicted. The editor's Merge trainers.party… dialog resolves
+them field by field.
+"""
+import hashlib
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+_HEADER_RX = re.compile(r"^===\s*(\S+)\s*===", re.MULTILINE)
+_FIELD_RX = re.compile(r"^([A-Za-z][A-Za-z ]*?):")
+
+MOVES = "Moves"
+PARTY = "#1 Party"          # the whole party, when it cannot be merged by slot
+_GENDER_RX = re.compile(r" \((?:M|F)\)$")
+_SPECIES_RX = re.compile(r"\(([^()]*)\)$")
+
+
+# ────────────────────────────── blocks ────────────────────────────────
+@dataclass
+class PartyFile:
+    """A trainers.party text as the part before the first trainer plus one block per trainer."""
+    preamble: str
+    blocks: Dict[str, str]          # trainer ID -> block text (header to next header), file order
+
+    @classmethod
+    def parse(cls, text: str) -> "PartyFile":
+        starts = [m.start() for m in _HEADER_RX.finditer(text)]
+        blocks: Dict[str, str] = {}
+        for start, end in zip(starts, starts[1:] + [len(text)]):
+            block = text[start:end]
+            trainer_id = _HEADER_RX.match(block).group(1)
+            key, n = trainer_id, 2
+            while key in blocks:            # keep duplicate IDs instead of dropping one
+                key, n = f"{trainer_id}#{n}", n + 1
+            blocks[key] = block
+        return cls(text[:starts[0]] if starts else text, blocks)
+
+    def text(self) -> str:
+        return self.preamble + "".join(self.blocks.values())
+
+    def digests(self) -> Dict[str, bytes]:
+        return {key: block_digest(block) for key, block in self.blocks.items()}
+
+
+def _normalized(text: str) -> str:
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+def block_digest(text: str) -> bytes:
+    """Hash of a block, ignoring trailing whitespace and blank lines."""
+    return hashlib.blake2b(_normalized(text).encode("utf-8"), digest_size=16).digest()
+
+
+# ────────────────────────────── fields ────────────────────────────────
+def block_fields(block: str) -> Dict[str, str]:
+    """
+    Field name -> the lines holding it. Trainer fields keep their name
+    ("Class"); party fields are prefixed with the slot ("#2 Level"). A
+    member's species line is "#2 Species" and its moves are "#2 Moves".
+    """
+    fields: Dict[str, str] = {}
+    slot = 0
+    for line in block.splitlines()[1:]:
+        line = line.rstrip()
+        if not line.strip():
+            continue
+        prefix = f"#{slot} " if slot else ""
+        if line.lstrip().startswith("- ") and slot:
+            key = prefix + MOVES
+            fields[key] = fields[key] + "\n" + line if key in fields else line
+            continue
+        if line.lstrip().startswith("/"):
+            key = prefix + "Comment"
+            fields[key] = fields[key] + "\n" + line if key in fields else line
+            continue
+        m = _FIELD_RX.match(line.strip())
+        if m is None:
+            slot += 1
+            fields[f"#{slot} Species"] = line
+            continue
+        key = prefix + m.group(1)
+        fields[key] = fields[key] + "\n" + line if key in fields else line
+    return fields
+
+
+def species_of(line: str) -> str:
+    """Species from a member line such as ``Rocky (Geodude) (M) @ Potion``."""
+    text = _GENDER_RX.sub("", line.strip().split(" @ ")[0])
+    nicknamed = _SPECIES_RX.search(text)
+    return (nicknamed.group(1) if nicknamed else text).strip()
+
+
+def _party_species(fields: Dict[str, str]) -> List[str]:
+    slots = sorted((_field_sort_key(k, 0)[0], v) for k, v in fields.items() if k.endswith(" Species"))
+    return [species_of(v) for _, v in slots]
+
+
+def _party_text(fields: Dict[str, str]) -> Optional[str]:
+    """The party fields rendered as one value, members separated by blank lines."""
+    position = {key: i for i, key in enumerate(fields)}
+    keys = sorted((k for k in fields if k.startswith("#")), key=lambda k: _field_sort_key(k, position[k]))
+    out, slot = [], 0
+    for key in keys:
+        this_slot = _field_sort_key(key, 0)[0]
+        if this_slot != slot and out:
+            out.append("")
+        slot = this_slot
+        out.append(fields[key])
+    return "\n".join(out) if out else None
+
+
+def _field_sort_key(key: str, position: int) -> Tuple[int, int, int]:
+    if not key.startswith("#"):
+        return (0, 0, position)
+    slot, _, name = key[1:].partition(" ")
+    rank = 0 if name == "Species" else 2 if name == MOVES else 1
+    return (int(slot), rank, position)
+
+
+def render_block(header: str, fields: Dict[str, Optional[str]]) -> str:
+    """Block text for *fields* in trainers.party layout; None values are left out."""
+    position = {key: i for i, key in enumerate(fields)}
+    keys = sorted(fields, key=lambda k: _field_sort_key(k, position[k]))
+    out = [header]
+    slot = 0
+    for key in keys:
+        value = fields[key]
+        if value is None:
+            continue
+        this_slot = _field_sort_key(key, 0)[0]
+        if this_slot != slot:
+            out.append("")
+            slot = this_slot
+        out.append(value)
+    return "\n".join(out) + "\n\n\n"
+
+
+# ────────────────────────────── merging ───────────────────────────────
+@dataclass
+class Conflict:
+    """
+    One unresolved difference. *field* is None for a whole trainer block
+    (edited on one side, deleted on the other) and *trainer* is "" for the
+    text before the first trainer. Values are None where a side removed it.
+    """
+    trainer: str
+    field: Optional[str]
+    base: Optional[str]
+    ours: Optional[str]
+    theirs: Optional[str]
+    resolution: Optional[str] = None
+    resolved: bool = False
+
+    def resolve(self, value: Optional[str]) -> None:
+        self.resolution = value
+        self.resolved = True
+
+    def markers(self) -> str:
+        ours = "" if self.ours is None else self.ours.rstrip("\n") + "\n"
+        theirs = "" if self.theirs is None else self.theirs.rstrip("\n") + "\n"
+        return f"<<<<<<< ours\n{ours}=======\n{theirs}>>>>>>> theirs\n"
+
+
+@dataclass
+class _FieldMerge:
+    header: str
+    fields: Dict[str, Optional[str]]
+    conflicts: Dict[str, Conflict]
+
+
+def _pick(base, ours, theirs) -> Tuple[bool, Optional[str]]:
+    """(clean, value) of the usual three-way rule."""
+    if ours == theirs:
+        return True, ours
+    if ours == base:
+        return True, theirs
+    if theirs == base:
+        return True, ours
+    return False, None
+
+
+@dataclass
+class MergeResult:
+    order: List[str]                                    # trainer IDs in output order
+    preamble: object                                    # str or Conflict
+    blocks: Dict[str, object] = field(default_factory=dict)     # str, _FieldMerge or Conflict
+    auto_merged: int = 0                                # trainers changed on both sides, merged by field
+
+    @property
+    def conflicts(self) -> List[Conflict]:
+        out = [self.preamble] if isinstance(self.preamble, Conflict) else []
+        for key in self.order:
+            block = self.blocks[key]
+            if isinstance(block, Conflict):
+                out.append(block)
+            elif isinstance(block, _FieldMerge):
+                out.extend(block.conflicts.values())
+        return out
+
+    @property
+    def clean(self) -> bool:
+        return all(c.resolved for c in self.conflicts)
+
+    def text(self) -> str:
+        """The merged file; unresolved conflicts appear between conflict markers."""
+        parts = [self._value(self.preamble) or ""]
+        for key in self.order:
+            block = self.blocks[key]
+            if isinstance(block, _FieldMerge):
+                fields = {}
+                for name, value in block.fields.items():
+                    conflict = block.conflicts.get(name)
+                    if conflict is None:
+                        fields[name] = value
+                    elif conflict.resolved:
+                        fields[name] = conflict.resolution
+                    else:
+                        fields[name] = conflict.markers().rstrip("\n")
+                parts.append(render_block(block.header, fields))
+            else:
+                parts.append(self._value(block) or "")
+        return "".join(parts)
+
+    @staticmethod
+    def _value(item) -> Optional[str]:
+        if not isinstance(item, Conflict):
+            return item
+        return item.resolution if item.resolved else item.markers()
+
+
+def merge_party(base: str, ours: str, theirs: str) -> MergeResult:
+    r"""
+    Three-way merge of three trainers.party texts.
+
+    Edits are never moved onto a different Pokémon. Here ours inserts a
+    member in front of Geodude while theirs gives Geodude an ability, so
+    the party is reported as one conflict (``python -m doctest party_merge.py``):
+
+    >>> base = "=== TRAINER_X ===\nName: X\n\nGeodude\nLevel: 5\n\nOnix\nLevel: 6\n"
+    >>> ours = base.replace("Geodude", "Zubat\nLevel: 4\n\nGeodude")
+    >>> theirs = base.replace("Level: 5", "Level: 5\nAbility: Sturdy")
+    >>> [c.field for c in merge_party(base, ours, theirs).conflicts]
+    ['Party']
+
+    If only one side touched the party, that side's party is taken whole:
+
+    >>> "Zubat" in merge_party(base, ours, base.replace("Name: X", "Name: Y")).text()
+    True
+    """
+    b, o, t = PartyFile.parse(base), PartyFile.parse(ours), PartyFile.parse(theirs)
+    bh, oh, th = b.digests(), o.digests(), t.digests()
+
+    clean, preamble = _pick(_normalized(b.preamble), _normalized(o.preamble), _normalized(t.preamble))
+    if clean:
+        preamble = o.preamble if preamble == _normalized(o.preamble) else t.preamble
+    else:
+        preamble = Conflict("", None, b.preamble, o.preamble, t.preamble)
+    result = MergeResult(order=[], preamble=preamble)
+
+    # our order, with trainers only they added placed after the trainer they follow
+    inserted: Dict[Optional[str], List[str]] = {}
+    previous: Optional[str] = None
+    for key in t.blocks:
+        if key not in o.blocks and key not in b.blocks:
+            inserted.setdefault(previous, []).append(key)
+        else:
+            previous = key
+    order = inserted.get(None, [])[:]
+    for key in o.blocks:
+        order.append(key)
+        order.extend(inserted.get(key, []))
+    for key in t.blocks:                # they added it after a trainer we deleted
+        if key not in o.blocks and key not in b.blocks and key not in order:
+            order.append(key)
+
+    # then trainers we deleted: dropped if they left them alone, else a conflict
+    for key in order + [k for k in b.blocks if k not in o.blocks]:
+        clean, digest = _pick(bh.get(key), oh.get(key), th.get(key))
+        if clean:
+            if digest is None:
+                continue                        # deleted
+            block = o.blocks[key] if digest == oh.get(key) else t.blocks[key]
+        elif key not in o.blocks or key not in t.blocks:
+            block = Conflict(key, None, b.blocks.get(key), o.blocks.get(key), t.blocks.get(key))
+        else:
+            block = _merge_fields(key, b.blocks.get(key, ""), o.blocks[key], t.blocks[key])
+            result.auto_merged += not block.conflicts
+        result.order.append(key)
+        result.blocks[key] = block
+    return result
+
+
+def _merge_fields(key: str, base: str, ours: str, theirs: str) -> _FieldMerge:
+    bf, of, tf = block_fields(base), block_fields(ours), block_fields(theirs)
+    merged: Dict[str, Optional[str]] = {}
+    conflicts: Dict[str, Conflict] = {}
+    by_slot = _party_species(bf) == _party_species(of) == _party_species(tf)
+    for name in dict.fromkeys(list(of) + list(tf) + list(bf)):
+        if name.startswith("#") and not by_slot:
+            continue
+        clean, value = _pick(bf.get(name), of.get(name), tf.get(name))
+        merged[name] = value
+        if not clean:
+            conflicts[name] = Conflict(key, name, bf.get(name), of.get(name), tf.get(name))
+    if not by_slot:
+        # slot N is not the same Pokémon on every side: take one side's party or report it
+        parties = [_party_text(f) for f in (bf, of, tf)]
+        clean, value = _pick(*parties)
+        if clean:
+            side = of if value == parties[1] else tf
+            merged.update((name, v) for name, v in side.items() if name.startswith("#"))
+        else:
+            merged[PARTY] = None
+            conflicts[PARTY] = Conflict(key, "Party", *parties)
+    return _FieldMerge(ours.splitlines()[0].rstrip(), merged, conflicts)
+
+
+def merge_files(base_path: str, ours_path: str, theirs_path: str) -> MergeResult:
+    texts = []
+    for path in (base_path, ours_path, theirs_path):
+        with open(path, encoding="utf-8", newline="") as f:
+            texts.append(f.read())
+    return merge_party(*texts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("usage: party_merge.py BASE OURS THEIRS   (result is written to OURS)")
+        sys.exit(2)
+    try:
+        merged = merge_files(*sys.argv[1:])
+        with open(sys.argv[2], "w", encoding="utf-8", newline="") as out:
+            out.write(merged.text())
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"party_merge: {e}", file=sys.stderr)
+        sys.exit(2)
+    conflicts = merged.conflicts
+    if conflicts:
+        names = sorted({c.trainer or "(file header)" for c in conflicts})
+        print(f"party_merge: {len(conflicts)} conflict(s) in {', '.join(names)}", file=sys.stderr)
+    sys.exit(1 if conflicts else 0)
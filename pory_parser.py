@@ -0,0 +1,237 @@
+"""
+Lossless, incremental parser for Poryscript files.
+
+A file is split into top-level blocks (``script``, ``text``, ``movement``,
+``mart``, ``mapscripts``, ``raw`` and ``const``). Everything between blocks
+(whitespace, comments) is kept as trivia. Joining all nodes gives back the
+file byte for byte. Offsets are in bytes, so a block can be written back at
+its exact position on disk.
+
+Editing one block re-parses only the new text of that block, converted to
+the file's line endings. The file is then rebuilt from the copy already
+held in memory and swapped in through :class:`atomic_io.FileTransaction`,
+so a crash never leaves it half-written. It is never re-read or re-parsed.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from atomic_io import FileTransaction
+
+_KEYWORD_RX = re.compile(
+    rb"(script|text|movement|mart|mapscripts)\b[ \t]*(?:\([^)\n]*\))?[ \t]*(\w+)[^{\n]*\s*\{"
+    rb"|(raw)[ \t]*`"
+    rb"|(const)[ \t]+(\w+)[^\n]*"
+)
+# characters that matter inside a braced body
+_BODY_RX = re.compile(rb'[{}"#/]')
+_SPACE_RX = re.compile(rb"\s+")
+
+
+@dataclass
+class Node:
+    kind: str           # block keyword, or "trivia"
+    name: str
+    start: int          # byte offsets into the file
+    end: int
+    line: int           # 1-based line of the first byte
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+def _skip_string(data: bytes, pos: int) -> int:
+    """*pos* is just past an opening quote; returns the index past the closing one."""
+    while True:
+        q = data.find(b'"', pos)
+        if q < 0:
+            return len(data)
+        backslashes = 0
+        while q - 1 - backslashes >= pos and data[q - 1 - backslashes] == 0x5C:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return q + 1
+        pos = q + 1
+
+
+def _skip_line(data: bytes, pos: int) -> int:
+    nl = data.find(b"\n", pos)
+    return len(data) if nl < 0 else nl + 1
+
+
+def _match_braces(data: bytes, pos: int) -> int:
+    """*pos* is just past an opening ``{``; returns the index past its partner."""
+    depth = 1
+    while depth:
+        m = _BODY_RX.search(data, pos)
+        if m is None:
+            raise ValueError("Unbalanced braces: block is never closed.")
+        ch = data[m.start()]
+        pos = m.end()
+        if ch == 0x7B:          # {
+            depth += 1
+        elif ch == 0x7D:        # }
+            depth -= 1
+        elif ch == 0x22:        # "
+            pos = _skip_string(data, pos)
+        elif ch == 0x23:        # #
+            pos = _skip_line(data, pos)
+        elif data[pos:pos + 1] == b"/":   # //
+            pos = _skip_line(data, pos)
+    return pos
+
+
+def parse(data: bytes, base: int = 0, line: int = 1) -> List[Node]:
+    """Split *data* into blocks and trivia. Offsets are shifted by *base*."""
+    nodes: List[Node] = []
+    pos = 0
+    trivia_start = 0
+
+    def flush_trivia(upto: int) -> None:
+        nonlocal line
+        if upto > trivia_start:
+            nodes.append(Node("trivia", "", base + trivia_start, base + upto, line))
+            line += data.count(b"\n", trivia_start, upto)
+
+    while pos < len(data):
+        m = _SPACE_RX.match(data, pos)
+        if m:
+            pos = m.end()
+            continue
+        if data.startswith(b"#", pos) or data.startswith(b"//", pos):
+            pos = _skip_line(data, pos)
+            continue
+        if data.startswith(b"/*", pos):
+            close = data.find(b"*/", pos + 2)
+            pos = len(data) if close < 0 else close + 2
+            continue
+
+        m = _KEYWORD_RX.match(data, pos)
+        if m is None:
+            # not something we understand; keep it as trivia up to the line end
+            pos = _skip_line(data, pos)
+            continue
+        flush_trivia(pos)
+        if m.group(1):
+            kind, name = m.group(1).decode(), m.group(2).decode()
+            end = _match_braces(data, m.end())
+        elif m.group(3):
+            close = data.find(b"`", m.end())
+            if close < 0:
+                raise ValueError("Unterminated raw block.")
+            kind, name, end = "raw", "", close + 1
+        else:
+            kind, name, end = "const", m.group(5).decode(), m.end()
+        nodes.append(Node(kind, name, base + pos, base + end, line))
+        line += data.count(b"\n", pos, end)
+        pos = trivia_start = end
+    flush_trivia(len(data))
+    return nodes
+
+
+def _stat(path: str) -> Tuple[float, int]:
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+
+class PoryDocument:
+    """One scripts.pory as a concrete syntax tree that can be edited block by block."""
+
+    _cache: Dict[str, "PoryDocument"] = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reload()
+
+    @classmethod
+    def open(cls, path: str) -> "PoryDocument":
+        """Shared document for *path*, re-parsed only if the file changed on disk."""
+        key = os.path.abspath(path)
+        doc = cls._cache.get(key)
+        if doc is None:
+            doc = cls._cache[key] = cls(path)
+        elif doc._stamp != _stat(path):
+            doc.reload()
+        return doc
+
+    def reload(self) -> None:
+        with open(self.path, "rb") as f:
+            self.data = f.read()
+        self.nodes = parse(self.data)
+        self._stamp = _stat(self.path)
+        first = self.data.find(b"\n")
+        self.newline = b"\r\n" if first > 0 and self.data[first - 1:first] == b"\r" else b"\n"
+
+    # ------------------------------------------------------------------ #
+    @property
+    def blocks(self) -> List[Node]:
+        return [n for n in self.nodes if n.kind != "trivia"]
+
+    def find(self, name: str, kind: Optional[str] = None) -> Optional[Node]:
+        for node in self.nodes:
+            if node.name == name and node.kind != "trivia" and (kind is None or node.kind == kind):
+                return node
+        return None
+
+    def block_text(self, node: Node) -> str:
+        return self.data[node.start:node.end].decode("utf-8")
+
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    # ------------------------------------------------------------------ #
+    def replace_block(self, node: Node, new_text: str) -> List[Node]:
+        """
+        Swap *node* for *new_text*, which must parse as top-level blocks only.
+
+        Only the new text is parsed. Later nodes are shifted, the change is
+        written to disk, and the new block nodes are returned. Raises
+        ValueError for bad input, or if the file changed on disk since it
+        was parsed.
+        """
+        index = self.nodes.index(node)
+        if self._stamp != _stat(self.path):
+            raise ValueError("scripts.pory changed on disk; reload it first.")
+
+        # the editor hands over LF text; keep the file's own line endings
+        new = new_text.strip().replace("\r\n", "\n").encode("utf-8").replace(b"\n", self.newline)
+        parsed = parse(new, base=node.start, line=node.line)
+        blocks = [n for n in parsed if n.kind != "trivia"]
+        if not blocks:
+            raise ValueError("The new text does not contain a script block.")
+        if any(n.kind == "trivia" and new[n.start - node.start:n.end - node.start].strip()
+               and not self._is_comment(new[n.start - node.start:n.end - node.start])
+               for n in parsed):
+            raise ValueError("The new text has content outside a script block.")
+
+        delta = len(new) - node.length
+        line_delta = new.count(b"\n") - self.data.count(b"\n", node.start, node.end)
+        start = node.start
+        self._write_span(start, node.end, new)
+
+        self.data = self.data[:start] + new + self.data[node.end:]
+        for later in self.nodes[index + 1:]:
+            later.start += delta
+            later.end += delta
+            later.line += line_delta
+        self.nodes[index:index + 1] = parsed
+        self._stamp = _stat(self.path)
+        return blocks
+
+    @staticmethod
+    def _is_comment(chunk: bytes) -> bool:
+        return all(
+            not line.strip() or line.strip().startswith((b"#", b"//"))
+            for line in chunk.splitlines()
+        )
+
+    def _write_span(self, start: int, end: int, new: bytes) -> None:
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            if f.read(end - start) != self.data[start:end]:
+                raise ValueError("scripts.pory changed on disk; reload it first.")
+        transaction = FileTransaction()
+        transaction.write(self.path, (self.data[:start] + new + self.data[end:]).decode("utf-8"))
+        transaction.commit()
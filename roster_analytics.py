@@ -0,0 +1,288 @@
+"""
+Balance report over every trainer party in the project.
+
+The roster is held as columns: one array entry per party member (level, IV
+and EV totals, species / item / trainer codes) and one per trainer (class,
+map, AI flags). Every figure in the report is a grouped NumPy aggregation
+over those columns (sort + ``reduceat`` or ``bincount``).
+
+Columns are kept per trainer and keyed by a signature of the fields that
+matter. :meth:`RosterAnalytics.update` only rebuilds trainers that were
+edited since the last run; the rest of the report is recomputed from the
+cached columns.
+"""
+import html
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stat_engine import DEFAULT_IV
+
+MAX_EV_TOTAL = 510
+# a level this many standard deviations from its map's (or class's) mean is an outlier
+OUTLIER_Z = 2.5
+MIN_GROUP = 5
+NO_MAP = "(not placed on a map)"
+
+
+@dataclass
+class Table:
+    title: str
+    headers: List[str]
+    rows: List[Sequence] = field(default_factory=list)
+
+
+@dataclass
+class BalanceReport:
+    summary: List[str]
+    tables: List[Table]
+
+    def to_html(self) -> str:
+        parts = ["<h2>Roster balance report</h2>", "<ul>"]
+        parts += [f"<li>{html.escape(line)}</li>" for line in self.summary]
+        parts.append("</ul>")
+        for table in self.tables:
+            parts.append(f"<h3>{html.escape(table.title)}</h3>")
+            if not table.rows:
+                parts.append("<p><i>Nothing to report.</i></p>")
+                continue
+            parts.append("<table border='1' cellspacing='0' cellpadding='3'><tr>")
+            parts += [f"<th>{html.escape(h)}</th>" for h in table.headers]
+            parts.append("</tr>")
+            for row in table.rows:
+                cells = "".join(f"<td>{html.escape(_fmt(v))}</td>" for v in row)
+                parts.append(f"<tr>{cells}</tr>")
+            parts.append("</table>")
+        return "\n".join(parts)
+
+
+def _fmt(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.1f}"
+    return str(value)
+
+
+@dataclass
+class GroupStats:
+    keys: np.ndarray        # group code per output row
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    median: np.ndarray
+    max: np.ndarray
+
+
+def group_stats(keys: np.ndarray, values: np.ndarray) -> GroupStats:
+    """Count/mean/std/min/median/max of *values* per distinct key, via one sort."""
+    if len(keys) == 0:
+        empty = np.zeros(0)
+        return GroupStats(np.zeros(0, np.int64), empty, empty, empty, empty, empty, empty)
+    order = np.lexsort((values, keys))
+    k, v = keys[order], values[order].astype(np.float64)
+    starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+    counts = np.diff(np.r_[starts, len(k)])
+    sums = np.add.reduceat(v, starts)
+    squares = np.add.reduceat(v * v, starts)
+    mean = sums / counts
+    std = np.sqrt(np.maximum(squares / counts - mean * mean, 0.0))
+    last = starts + counts - 1
+    median = (v[starts + (counts - 1) // 2] + v[starts + counts // 2]) / 2
+    return GroupStats(k[starts], counts, mean, std, v[starts], median, v[last])
+
+
+class _Codes:
+    """String <-> small int, shared by all trainers so columns can be concatenated."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __call__(self, name: str) -> int:
+        code = self._index.get(name)
+        if code is None:
+            code = self._index[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+@dataclass
+class _Block:
+    """One trainer's columns."""
+    signature: Tuple
+    levels: np.ndarray
+    iv_totals: np.ndarray
+    ev_totals: np.ndarray
+    species: np.ndarray
+    items: np.ndarray
+    klass: int
+    map: int
+    flags: List[int]
+
+
+def _signature(trainer, map_name: str) -> Tuple:
+    return (
+        trainer.class_, map_name, tuple(trainer.ai_flags),
+        tuple((m.species, m.level, m.held_item, tuple(m.ivs), tuple(m.evs)) for m in trainer.party),
+    )
+
+
+class RosterAnalytics:
+    def __init__(self):
+        self.species = _Codes()
+        self.items = _Codes()
+        self.classes = _Codes()
+        self.maps = _Codes()
+        self.flags = _Codes()
+        self._blocks: Dict[str, _Block] = {}
+        self._order: List[str] = []
+
+    def update(self, trainers: Iterable, map_of: Callable[[str], str] = lambda _id: "") -> int:
+        """Sync with *trainers*; returns how many had to be rebuilt."""
+        rebuilt = 0
+        order = []
+        for trainer in trainers:
+            if trainer.id == "TRAINER_NONE":
+                continue
+            map_name = map_of(trainer.id) or NO_MAP
+            sig = _signature(trainer, map_name)
+            order.append(trainer.id)
+            block = self._blocks.get(trainer.id)
+            if block is not None and block.signature == sig:
+                continue
+            party = trainer.party
+            self._blocks[trainer.id] = _Block(
+                signature=sig,
+                levels=np.array([m.level for m in party], np.int16),
+                iv_totals=np.array([sum(DEFAULT_IV if v is None else v for v in m.ivs) for m in party], np.int16),
+                ev_totals=np.array([sum(v or 0 for v in m.evs) for m in party], np.int16),
+                species=np.array([self.species(m.species or "?") for m in party], np.int32),
+                items=np.array([self.items(m.held_item or "") for m in party], np.int32),
+                klass=self.classes(trainer.class_ or "?"),
+                map=self.maps(map_name),
+                flags=[self.flags(f) for f in trainer.ai_flags if f],
+            )
+            rebuilt += 1
+        for gone in set(self._blocks) - set(order):
+            del self._blocks[gone]
+        self._order = order
+        return rebuilt
+
+    # ------------------------------------------------------------------ #
+    def report(self, top: int = 15) -> BalanceReport:
+        blocks = [self._blocks[t] for t in self._order]
+        sizes = np.array([len(b.levels) for b in blocks], np.int64)
+        owner = np.repeat(np.arange(len(blocks)), sizes)       # trainer row per mon
+        slot = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+        def column(name: str, dtype) -> np.ndarray:
+            arrays = [getattr(b, name) for b in blocks]
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype)
+
+        levels = column("levels", np.int64)
+        ivs = column("iv_totals", np.int64)
+        evs = column("ev_totals", np.int64)
+        species = column("species", np.int64)
+        items = column("items", np.int64)
+        t_class = np.array([b.klass for b in blocks], np.int64)
+        t_map = np.array([b.map for b in blocks], np.int64)
+        m_class, m_map = t_class[owner], t_map[owner]
+        ids = self._order
+
+        placed_maps = np.unique(t_map[t_map != self._no_map_code()])
+        summary = [
+            f"{len(blocks)} trainers, {len(levels)} Pokémon, "
+            f"{len(np.unique(species))} species, {len(placed_maps)} maps.",
+        ]
+        if len(levels):
+            summary.append(f"Levels {levels.min()}–{levels.max()}, mean {levels.mean():.1f}, "
+                           f"median {np.median(levels):.0f}.")
+            summary.append(f"{(evs > 0).mean() * 100:.0f}% of Pokémon have EVs; "
+                           f"{(ivs >= 6 * 31).mean() * 100:.0f}% have perfect IVs.")
+
+        tables = [
+            self._level_table("Levels by trainer class", group_stats(m_class, levels), self.classes.names),
+            self._level_table("Levels by map", group_stats(m_map, levels), self.maps.names),
+            self._investment_table(m_class, ivs, evs),
+            self._usage_table("Held items", items, self.items.names, top, len(levels), skip=""),
+            self._flag_table(blocks),
+            self._usage_table("Most used species", species, self.species.names, top, len(levels)),
+            self._outlier_table(levels, evs, species, m_map, m_class, owner, slot, ids),
+        ]
+        return BalanceReport(summary, tables)
+
+    @staticmethod
+    def _level_table(title: str, stats: GroupStats, names: List[str]) -> Table:
+        table = Table(title, ["Group", "Pokémon", "Min", "Median", "Mean", "Max", "Std dev"])
+        for i in np.argsort(stats.mean, kind="stable"):
+            table.rows.append((names[stats.keys[i]], int(stats.count[i]), int(stats.min[i]),
+                               float(stats.median[i]), float(stats.mean[i]), int(stats.max[i]),
+                               float(stats.std[i])))
+        return table
+
+    def _investment_table(self, m_class: np.ndarray, ivs: np.ndarray, evs: np.ndarray) -> Table:
+        table = Table("EV / IV investment by trainer class",
+                      ["Class", "Pokémon", "Mean EV total", "With EVs %", "Mean IV total", "Max IVs %"])
+        n = len(self.classes.names)
+        counts = np.bincount(m_class, minlength=n)
+        ev_sum = np.bincount(m_class, weights=evs, minlength=n)
+        with_ev = np.bincount(m_class, weights=evs > 0, minlength=n)
+        iv_sum = np.bincount(m_class, weights=ivs, minlength=n)
+        max_iv = np.bincount(m_class, weights=ivs >= 6 * 31, minlength=n)
+        for c in np.flatnonzero(counts)[np.argsort(-ev_sum[counts > 0] / counts[counts > 0], kind="stable")]:
+            table.rows.append((self.classes.names[c], int(counts[c]), float(ev_sum[c] / counts[c]),
+                               float(with_ev[c] / counts[c] * 100), float(iv_sum[c] / counts[c]),
+                               float(max_iv[c] / counts[c] * 100)))
+        return table
+
+    @staticmethod
+    def _usage_table(title: str, codes: np.ndarray, names: List[str], top: int,
+                     total: int, skip: Optional[str] = None) -> Table:
+        table = Table(title, ["Name", "Count", "% of Pokémon"])
+        counts = np.bincount(codes, minlength=len(names))
+        for code in np.argsort(-counts, kind="stable"):
+            if counts[code] == 0 or len(table.rows) >= top:
+                break
+            if skip is not None and names[code] == skip:
+                continue
+            table.rows.append((names[code], int(counts[code]), float(counts[code] / max(total, 1) * 100)))
+        return table
+
+    def _flag_table(self, blocks: List[_Block]) -> Table:
+        table = Table("AI flag usage", ["Flag", "Trainers", "% of trainers"])
+        flat = np.array([f for b in blocks for f in b.flags], np.int64)
+        counts = np.bincount(flat, minlength=len(self.flags.names))
+        for code in np.argsort(-counts, kind="stable"):
+            if counts[code]:
+                table.rows.append((self.flags.names[code], int(counts[code]),
+                                   float(counts[code] / max(len(blocks), 1) * 100)))
+        no_flags = sum(1 for b in blocks if not b.flags)
+        if no_flags:
+            table.rows.append(("(none)", no_flags, no_flags / len(blocks) * 100))
+        return table
+
+    def _no_map_code(self) -> int:
+        return self.maps.names.index(NO_MAP) if NO_MAP in self.maps.names else -1
+
+    def _outlier_table(self, levels, evs, species, m_map, m_class, owner, slot, ids) -> Table:
+        """Levels far from their map's mean (or their class's when not placed), and EV overflows."""
+        table = Table("Outliers", ["Trainer", "Slot", "Species", "Level", "Expected", "Why"])
+        if not len(levels):
+            return table
+        placed = m_map != self._no_map_code()
+        # group by map when placed, otherwise by class (offset so codes do not collide)
+        groups = np.where(placed, m_map, m_class + len(self.maps.names))
+        stats = group_stats(groups, levels)
+        lookup = np.searchsorted(stats.keys, groups)
+        mean, std, count = stats.mean[lookup], stats.std[lookup], stats.count[lookup]
+        z = np.divide(levels - mean, std, out=np.zeros(len(levels)), where=std > 0)
+        flagged = np.flatnonzero((np.abs(z) > OUTLIER_Z) & (count >= MIN_GROUP))
+        for i in flagged[np.argsort(-np.abs(z[flagged]), kind="stable")]:
+            where = "map" if placed[i] else "class"
+            table.rows.append((ids[owner[i]], int(slot[i]) + 1, self.species.names[species[i]],
+                               int(levels[i]), float(mean[i]), f"{z[i]:+.1f} σ from its {where}"))
+        for i in np.flatnonzero(evs > MAX_EV_TOTAL):
+            table.rows.append((ids[owner[i]], int(slot[i]) + 1, self.species.names[species[i]],
+                               int(levels[i]), "", f"EV total {int(evs[i])} > {MAX_EV_TOTAL}"))
+        return table
@@ -0,0 +1,184 @@
+"""
+Poryscript snippets for trainer battles, dialogs, starter choices and any
+other type in the template registry (:mod:`script_templates`).
+
+The renderers are plain functions, shared by the Event Script Editor forms
+and by batch generation from a JSON/CSV spec (:func:`run_batch`).
+"""
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from atomic_io import FileTransaction
+from map_catalogue import MapCatalogue
+from script_index import ScriptIndex, scan_text
+from script_log import ScriptLog
+from script_templates import registry
+
+
+@dataclass
+class GeneratedScript:
+    kind: str
+    map_rel: str
+    ids: List[str]        # script IDs to paste into PoryMap, main one first
+    script: str
+    desc: str
+
+    @property
+    def sid(self) -> str:
+        return self.ids[0]
+
+
+@dataclass
+class ScriptSpec:
+    kind: str
+    map_rel: str
+    name: str
+    values: Dict[str, str] = field(default_factory=dict)   # template field -> value
+
+
+# ────────────────────────────── renderers ─────────────────────────────
+def render(spec: ScriptSpec) -> GeneratedScript:
+    """Render through the template registry; raises ValueError for unknown types or bad IDs."""
+    ids, script, desc = registry().get(spec.kind).render(spec.map_rel, spec.name, spec.values)
+    return GeneratedScript(spec.kind, spec.map_rel, ids, script, desc)
+
+
+def render_trainer(map_rel: str, prefix: str, trainer_id: str,
+                   intro: str, defeat: str, post: str) -> GeneratedScript:
+    return render(ScriptSpec("trainer", map_rel, prefix, {
+        "trainer_id": trainer_id, "intro": intro, "defeat": defeat, "post": post,
+    }))
+
+
+def render_dialog(map_rel: str, prefix: str, dialog: str) -> GeneratedScript:
+    return render(ScriptSpec("dialog", map_rel, prefix, {"text": dialog}))
+
+
+def render_starter(map_rel: str, prefix: str, s1: str, s2: str, s3: str) -> GeneratedScript:
+    return render(ScriptSpec("starter", map_rel, prefix, {"s1": s1, "s2": s2, "s3": s3}))
+
+
+# ──────────────────────────────── batch ───────────────────────────────
+# older column names -> template field keys
+_ALIASES = {
+    "trainer": "trainer_id", "dialog": "text",
+    "starter1": "s1", "starter2": "s2", "starter3": "s3",
+}
+
+
+def _spec_from_row(row: Dict[str, object]) -> ScriptSpec:
+    values: Dict[str, str] = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        key = str(key).strip().lower()
+        values[_ALIASES.get(key, key)] = str(value).strip()
+
+    starters = values.pop("starters", "")
+    for i, species in enumerate((s.strip() for s in starters.split("/") if s.strip()), start=1):
+        values.setdefault(f"s{i}", species)
+    kind = (values.pop("kind", "") or values.pop("type", "")).lower()
+    return ScriptSpec(kind, values.pop("map", ""), values.pop("name", ""), values)
+
+
+def parse_script_specs(text: str) -> List[ScriptSpec]:
+    """
+    Read a batch spec: a JSON list of objects (or ``{"scripts": [...]}``),
+    or a CSV with a header row.
+
+    Keys / columns: ``kind`` (any registered script type), ``map``,
+    ``name``, then the type's template fields. The built-ins also accept
+    ``trainer``, ``dialog``, ``starter1``-``starter3`` and ``starters``
+    ("A/B/C").
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(("[", "{")):
+        data = json.loads(stripped)
+        rows = data.get("scripts", []) if isinstance(data, dict) else data
+        if not all(isinstance(r, dict) for r in rows):
+            raise ValueError("Every script in the JSON spec must be an object.")
+    else:
+        rows = list(csv.DictReader(io.StringIO(stripped), skipinitialspace=True))
+    return [_spec_from_row(row) for row in rows]
+
+
+def validate_batch(
+    specs: List[ScriptSpec],
+    scripts: List[GeneratedScript],
+    index: ScriptIndex,
+    catalogue: MapCatalogue,
+) -> List[str]:
+    """Every problem in the batch, checked before anything is written."""
+    problems = []
+    map_names = set(catalogue.script_maps())
+    seen: Dict[str, int] = {}
+    for row, (spec, script) in enumerate(zip(specs, scripts), start=1):
+        if spec.map_rel not in map_names:
+            problems.append(f"#{row}: map '{spec.map_rel}' has no scripts.pory.")
+        if not spec.name:
+            problems.append(f"#{row}: missing name.")
+        labels = [sym.name for sym in scan_text(script.script)]
+        for name, sym in index.collisions(labels).items():
+            problems.append(f"#{row}: {name} already exists ({sym.where(index.project_folder)}).")
+        for name in labels:
+            if name in seen:
+                problems.append(f"#{row}: {name} is also generated by #{seen[name]}.")
+            else:
+                seen[name] = row
+    return problems
+
+
+def write_batch(project_folder: str, scripts: List[GeneratedScript]) -> List[str]:
+    """
+    Append the scripts to their maps' scripts.pory, grouped so each file is
+    written once, all in one :class:`FileTransaction`. Returns the written paths.
+    """
+    by_map: Dict[str, List[str]] = {}
+    for script in scripts:
+        by_map.setdefault(script.map_rel, []).append(script.script.strip())
+
+    transaction = FileTransaction()
+    paths = []
+    for map_rel, bodies in by_map.items():
+        path = os.path.join(project_folder, "data", "maps", map_rel, "scripts.pory")
+        transaction.append(path, "".join(f"\n\n{body}\n" for body in bodies))
+        paths.append(path)
+    transaction.commit()
+    return paths
+
+
+def run_batch(project_folder: str, spec_text: str, log: Optional[ScriptLog] = None) -> List[GeneratedScript]:
+    """
+    Parse, render, validate and write a whole batch.
+
+    Raises ValueError listing every problem if anything fails validation.
+    In that case no file is touched.
+    """
+    specs = parse_script_specs(spec_text)
+    if not specs:
+        raise ValueError("The spec contains no scripts.")
+    problems = []
+    scripts = []
+    for row, spec in enumerate(specs, start=1):
+        try:
+            scripts.append(render(spec))
+        except ValueError as e:
+            problems.append(f"#{row}: {e}")
+    if problems:
+        raise ValueError("\n".join(problems))
+
+    index = ScriptIndex.for_project(project_folder)
+    catalogue = MapCatalogue.for_project(project_folder)
+    problems = validate_batch(specs, scripts, index, catalogue)
+    if problems:
+        raise ValueError("\n".join(problems))
+
+    for path in write_batch(project_folder, scripts):
+        index.refresh_file(path)
+    if log is not None:
+        log.append(scripts)     # one buffered write for the whole batch
+    return scripts
@@ -0,0 +1,179 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# top-level Poryscript blocks: script / text / movement / mart / mapscripts,
+# optionally with a scope such as script(local)
+_PORY_RX = re.compile(
+    r"^[ \t]*(script|text|movement|mart|mapscripts)\b[ \t]*(?:\([^)\n]*\))?[ \t]*(\w+)",
+    re.M,
+)
+# assembler labels in .inc files: Label:: or Label:
+_INC_RX = re.compile(r"^(\w+)::?", re.M)
+
+
+@dataclass(frozen=True)
+class ScriptSymbol:
+    name: str
+    kind: str       # script, text, movement, mart, mapscripts or label
+    path: str
+    line: int       # 1-based
+
+    def where(self, root: str = "") -> str:
+        path = os.path.relpath(self.path, root) if root else self.path
+        return f"{path.replace(os.sep, '/')}:{self.line}"
+
+
+def scan_text(text: str, path: str = "", kind_of_file: str = ".pory") -> List[ScriptSymbol]:
+    """All labels defined in one Poryscript (or .inc) source."""
+    symbols = []
+    line, pos = 1, 0
+    if kind_of_file == ".inc":
+        matches = ((m.start(), "label", m.group(1)) for m in _INC_RX.finditer(text))
+    else:
+        matches = ((m.start(), m.group(1), m.group(2)) for m in _PORY_RX.finditer(text))
+    for start, kind, name in matches:
+        line += text.count("\n", pos, start)
+        pos = start
+        symbols.append(ScriptSymbol(name, kind, path, line))
+    return symbols
+
+
+def scan_file(path: str) -> List[ScriptSymbol]:
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    return scan_text(text, path, os.path.splitext(path)[1])
+
+
+def script_files(project_folder: str) -> List[str]:
+    """
+    Every file that can define a global script label.
+
+    That means data/maps/*/scripts.pory, or scripts.inc for maps that have
+    no .pory (the .inc is generated from it otherwise), plus .pory and .inc
+    files under data/scripts.
+    """
+    files = []
+    maps_dir = os.path.join(project_folder, "data", "maps")
+    if os.path.isdir(maps_dir):
+        for root, _, names in os.walk(maps_dir):
+            root = os.path.normpath(root)
+            if "scripts.pory" in names:
+                files.append(os.path.join(root, "scripts.pory"))
+            elif "scripts.inc" in names:
+                files.append(os.path.join(root, "scripts.inc"))
+    scripts_dir = os.path.join(project_folder, "data", "scripts")
+    if os.path.isdir(scripts_dir):
+        for root, _, names in os.walk(scripts_dir):
+            root = os.path.normpath(root)
+            stems = {os.path.splitext(n)[0] for n in names if n.endswith(".pory")}
+            for name in names:
+                stem, ext = os.path.splitext(name)
+                if ext == ".pory" or (ext == ".inc" and stem not in stems):
+                    files.append(os.path.join(root, name))
+    return files
+
+
+def _stat(path: str) -> Optional[Tuple[float, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+class ScriptIndex:
+    """
+    Project-wide table of Poryscript labels: name -> where it is defined.
+
+    Files are scanned on a thread pool the first time. After that,
+    :meth:`refresh` only rescans files whose mtime or size changed, and
+    :meth:`refresh_file` rescans a single file after the editor wrote to it.
+    Lookups are dict hits.
+    """
+
+    _shared: Dict[str, "ScriptIndex"] = {}
+
+    def __init__(self, project_folder: str):
+        self.project_folder = project_folder
+        self._stamps: Dict[str, Tuple[float, int]] = {}
+        self._by_file: Dict[str, List[ScriptSymbol]] = {}
+        self._by_name: Dict[str, List[ScriptSymbol]] = {}
+
+    @classmethod
+    def for_project(cls, project_folder: str) -> "ScriptIndex":
+        """Shared, refreshed index for *project_folder*."""
+        key = os.path.abspath(project_folder)
+        index = cls._shared.get(key)
+        if index is None:
+            index = cls._shared[key] = cls(project_folder)
+        index.refresh()
+        return index
+
+    # ------------------------------------------------------------------ #
+    def refresh(self) -> List[str]:
+        """Rescan new or modified files and drop deleted ones. Returns the rescanned paths."""
+        current = {path: _stat(path) for path in script_files(self.project_folder)}
+        current = {path: stamp for path, stamp in current.items() if stamp}
+        for path in set(self._stamps) - set(current):
+            self._replace(path, [])
+            del self._stamps[path]
+
+        stale = [path for path, stamp in current.items() if self._stamps.get(path) != stamp]
+        if len(stale) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+                scanned = list(pool.map(self._scan_or_empty, stale))
+        else:
+            scanned = [self._scan_or_empty(path) for path in stale]
+        for path, symbols in zip(stale, scanned):
+            self._replace(path, symbols)
+            self._stamps[path] = current[path]
+        return stale
+
+    def refresh_file(self, path: str) -> None:
+        path = os.path.normpath(path)
+        stamp = _stat(path)
+        if stamp is None:
+            self._replace(path, [])
+            self._stamps.pop(path, None)
+        elif self._stamps.get(path) != stamp:
+            self._replace(path, self._scan_or_empty(path))
+            self._stamps[path] = stamp
+
+    @staticmethod
+    def _scan_or_empty(path: str) -> List[ScriptSymbol]:
+        try:
+            return scan_file(path)
+        except OSError:
+            return []
+
+    def _replace(self, path: str, symbols: List[ScriptSymbol]) -> None:
+        for old in self._by_file.pop(path, []):
+            entries = self._by_name.get(old.name)
+            if entries:
+                entries[:] = [s for s in entries if s.path != path]
+                if not entries:
+                    del self._by_name[old.name]
+        if symbols:
+            self._by_file[path] = symbols
+            for symbol in symbols:
+                self._by_name.setdefault(symbol.name, []).append(symbol)
+
+    # ------------------------------------------------------------------ #
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def lookup(self, name: str) -> List[ScriptSymbol]:
+        return list(self._by_name.get(name, ()))
+
+    def collisions(self, names: Iterable[str]) -> Dict[str, ScriptSymbol]:
+        """The first existing definition of every name in *names* that is already taken."""
+        return {name: self._by_name[name][0] for name in names if name in self._by_name}
+
+    def symbols_in(self, path: str) -> List[ScriptSymbol]:
+        return list(self._by_file.get(path, ()))
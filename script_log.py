@@ -0,0 +1,274 @@
+"""
+Append-only log of every generated event script.
+
+Records are JSON lines in ``generated_scripts.jsonl`` next to the editor.
+When the active file passes :data:`ROTATE_BYTES` it is sealed as
+``generated_scripts-00001.jsonl`` (and so on) and a fresh one is started.
+Sealed segments never change, so each gets a ``.idx`` sidecar holding the
+byte offset, length, ID, map and type of every record. On start-up only the
+tail of the active file past its last indexed offset is parsed. Records are
+read back by slicing a memory-mapped segment at the stored offset.
+
+The old free-form ``generated_scripts.txt`` is imported once, the first
+time the new log is created.
+"""
+import glob
+import json
+import mmap
+import os
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROTATE_BYTES = 8 * 1024 * 1024
+ACTIVE_NAME = "generated_scripts.jsonl"
+LEGACY_NAME = "generated_scripts.txt"
+
+_LEGACY_RX = re.compile(
+    r"^\[(?P<time>[^\]]+)\] (?:TYPE|Type): (?P<kind>\w+) \| ID: (?P<id>\S*)\n"
+    r"(?:DESC|Description): (?P<desc>.*?)\n-{40}\n(?P<script>.*?)\n={60}\n",
+    re.S | re.M,
+)
+
+
+@dataclass(frozen=True)
+class LogEntry:
+    segment: int        # 0 = active file, 1.. = sealed segments
+    offset: int
+    length: int
+    id: str
+    map: str
+    kind: str
+    time: str
+
+
+class ScriptLog:
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.entries: List[LogEntry] = []
+        self.by_id: Dict[str, List[int]] = {}
+        self.by_map: Dict[str, List[int]] = {}
+        self.by_kind: Dict[str, List[int]] = {}
+        self._buffer: List[Tuple[bytes, Dict]] = []
+        self._active_indexed = 0
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._load()
+
+    # ------------------------------------------------------------------ #
+    #  Paths                                                             #
+    # ------------------------------------------------------------------ #
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.folder, ACTIVE_NAME)
+
+    def segment_path(self, segment: int) -> str:
+        if segment == 0:
+            return self.active_path
+        stem = os.path.splitext(ACTIVE_NAME)[0]
+        return os.path.join(self.folder, f"{stem}-{segment:05d}.jsonl")
+
+    def _sealed_segments(self) -> List[int]:
+        stem = os.path.splitext(ACTIVE_NAME)[0]
+        found = []
+        for path in glob.glob(os.path.join(self.folder, f"{stem}-*.jsonl")):
+            tail = os.path.basename(path)[len(stem) + 1:-len(".jsonl")]
+            if tail.isdigit():
+                found.append(int(tail))
+        return sorted(found)
+
+    # ------------------------------------------------------------------ #
+    #  Index                                                             #
+    # ------------------------------------------------------------------ #
+    def _add(self, entry: LogEntry) -> None:
+        i = len(self.entries)
+        self.entries.append(entry)
+        self.by_id.setdefault(entry.id, []).append(i)
+        self.by_map.setdefault(entry.map, []).append(i)
+        self.by_kind.setdefault(entry.kind, []).append(i)
+
+    def _scan(self, segment: int, start: int = 0) -> List[LogEntry]:
+        """Index records in *segment* from byte *start*; returns the new entries."""
+        found = []
+        path = self.segment_path(segment)
+        if not os.path.isfile(path):
+            return found
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # half-written tail; it is picked up once complete
+                try:
+                    rec = json.loads(line)
+                    found.append(LogEntry(segment, offset, len(line), rec.get("id", ""),
+                                          rec.get("map", ""), rec.get("kind", ""), rec.get("time", "")))
+                except ValueError:
+                    pass
+                offset += len(line)
+        return found
+
+    def _read_sidecar(self, segment: int) -> Optional[List[LogEntry]]:
+        try:
+            with open(self.segment_path(segment) + ".idx", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return [LogEntry(segment, *row) for row in rows]
+
+    def _write_sidecar(self, segment: int, entries: Iterable[LogEntry]) -> None:
+        rows = [[e.offset, e.length, e.id, e.map, e.kind, e.time] for e in entries]
+        tmp = self.segment_path(segment) + ".idx.tmp~"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f, separators=(",", ":"))
+            os.replace(tmp, self.segment_path(segment) + ".idx")
+        except OSError:
+            pass
+
+    def _load(self) -> None:
+        fresh = not os.path.exists(self.active_path) and not self._sealed_segments()
+        for segment in self._sealed_segments():
+            entries = self._read_sidecar(segment)
+            if entries is None:
+                entries = self._scan(segment)
+                self._write_sidecar(segment, entries)
+            for entry in entries:
+                self._add(entry)
+
+        active = self._read_sidecar(0) or []
+        size = os.path.getsize(self.active_path) if os.path.exists(self.active_path) else 0
+        if active and active[-1].offset + active[-1].length > size:
+            active = []     # file was replaced behind our back
+        start = active[-1].offset + active[-1].length if active else 0
+        for entry in active + self._scan(0, start):
+            self._add(entry)
+        self._active_indexed = size
+
+        legacy = os.path.join(self.folder, LEGACY_NAME)
+        if fresh and os.path.isfile(legacy):
+            self.import_legacy(legacy)
+
+    # ------------------------------------------------------------------ #
+    #  Writing                                                           #
+    # ------------------------------------------------------------------ #
+    def append(self, scripts: Iterable, flush: bool = True) -> None:
+        """Buffer one record per GeneratedScript; by default write them all at once."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for s in scripts:
+            self._push({
+                "time": now, "kind": s.kind, "id": s.sid, "ids": s.ids,
+                "map": s.map_rel, "desc": s.desc, "script": s.script.strip(),
+            })
+        if flush:
+            self.flush()
+
+    def _push(self, record: Dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._buffer.append((line, record))
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = b"".join(line for line, _ in self._buffer)
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.active_path, "ab") as f:
+            offset = f.tell()
+            f.write(data)
+        self._drop_map(0)
+        for line, rec in self._buffer:
+            self._add(LogEntry(0, offset, len(line), rec["id"], rec["map"], rec["kind"], rec["time"]))
+            offset += len(line)
+        self._buffer.clear()
+        self._active_indexed = offset
+        if self._active_indexed >= ROTATE_BYTES:
+            self.rotate()
+
+    def rotate(self) -> None:
+        """Seal the active file as the next numbered segment."""
+        self.flush()
+        if not os.path.exists(self.active_path):
+            return
+        segment = (self._sealed_segments() or [0])[-1] + 1
+        self._drop_map(0)
+        os.replace(self.active_path, self.segment_path(segment))
+        self.entries = [replace(e, segment=segment) if e.segment == 0 else e for e in self.entries]
+        self._write_sidecar(segment, (e for e in self.entries if e.segment == segment))
+        try:
+            os.remove(self.active_path + ".idx")
+        except OSError:
+            pass
+        self._active_indexed = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._write_sidecar(0, (e for e in self.entries if e.segment == 0))
+        for segment in list(self._maps):
+            self._drop_map(segment)
+
+    def import_legacy(self, path: str) -> int:
+        """Copy entries from the old text log; returns how many were imported."""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        for m in _LEGACY_RX.finditer(text):
+            self._push({
+                "time": m.group("time"), "kind": m.group("kind").lower(), "id": m.group("id"),
+                "ids": [m.group("id")], "map": "", "desc": m.group("desc"),
+                "script": m.group("script"),
+            })
+        count = len(self._buffer)
+        self.flush()
+        return count
+
+    # ------------------------------------------------------------------ #
+    #  Reading                                                           #
+    # ------------------------------------------------------------------ #
+    def _mapped(self, segment: int) -> mmap.mmap:
+        view = self._maps.get(segment)
+        if view is None or (segment == 0 and len(view) < self._active_indexed):
+            self._drop_map(segment)
+            with open(self.segment_path(segment), "rb") as f:
+                view = self._maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return view
+
+    def _drop_map(self, segment: int) -> None:
+        view = self._maps.pop(segment, None)
+        if view is not None:
+            view.close()
+
+    def record(self, entry: LogEntry) -> Dict:
+        view = self._mapped(entry.segment)
+        return json.loads(view[entry.offset:entry.offset + entry.length])
+
+    def search(self, text: str = "", map_rel: str = "", kind: str = "", limit: int = 500) -> List[LogEntry]:
+        """Newest first. *text* matches anywhere in the script ID, case-insensitively."""
+        if map_rel and kind:
+            kinds = set(self.by_kind.get(kind, []))
+            pool = [i for i in self.by_map.get(map_rel, []) if i in kinds]
+        elif map_rel:
+            pool = self.by_map.get(map_rel, [])
+        elif kind:
+            pool = self.by_kind.get(kind, [])
+        else:
+            pool = range(len(self.entries))
+        needle = text.lower()
+        out = []
+        for i in reversed(pool):
+            entry = self.entries[i]
+            if needle and needle not in entry.id.lower():
+                continue
+            out.append(entry)
+            if len(out) >= limit:
+                break
+        return out
+
+    def latest(self, script_id: str) -> Optional[Dict]:
+        hits = self.by_id.get(script_id)
+        return self.record(self.entries[hits[-1]]) if hits else None
+
+    def maps(self) -> List[str]:
+        return sorted(m for m in self.by_map if m)
+
+    def kinds(self) -> List[str]:
+        return sorted(k for k in self.by_kind if k)
+
@@ -0,0 +1,450 @@
+"""
+Species info table read from ``src/data/pokemon/species_info/gen_*_families.h``.
+
+The designated initializers (``[SPECIES_X] = { .baseHP = 45, ... }``) are
+streamed line by line, one entry at a time. Preprocessor conditionals keep
+their first branch, which in pokeemerald-expansion is the newest generation
+(``#if P_UPDATED_STATS >= GEN_6``). Ternaries are read the same way.
+
+The result is a column table: base stats, integer-coded types and
+abilities, gender ratio and so on live in NumPy arrays with one row per
+species constant. Learnset and form-table symbol names and evolution targets
+are kept as plain lists. Tables are cached on disk keyed by the hash of the header files, so
+only the first load of a given set of headers is parsed.
+"""
+import glob
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from disk_cache import DiskCache, content_key
+
+# struct field order in SpeciesInfo; columns of SpeciesTable.stats
+STAT_FIELDS = ("baseHP", "baseAttack", "baseDefense", "baseSpAttack", "baseSpDefense", "baseSpeed")
+STAT_LABELS = ("HP", "Atk", "Def", "SpA", "SpD", "Spe")
+
+MON_MALE, MON_FEMALE, MON_GENDERLESS = 0, 254, 255
+
+_ENTRY_RX = re.compile(r"^\s*\[(SPECIES_\w+)\]\s*=")
+_NAME_RX = re.compile(r'_\(\s*"(.*?)"\s*\)')
+_TYPE_RX = re.compile(r"\bTYPE_\w+")
+_ABILITY_RX = re.compile(r"\bABILITY_\w+")
+_EVO_TARGET_RX = re.compile(r"\bSPECIES_(?!NONE\b)\w+")
+_SYMBOL_RX = re.compile(r"^[A-Za-z_]\w*$")
+_PERCENT_RX = re.compile(r"PERCENT_FEMALE\(\s*([\d.]+)\s*\)")
+_BLOCK_COMMENT_RX = re.compile(r"/\*.*?\*/")
+_MACRO_RX = re.compile(r"#\s*define\s+(\w+)\(([^)]*)\)(.*)$", re.S)
+
+
+@dataclass
+class SpeciesInfo:
+    species: str
+    name: str
+    stats: Tuple[int, ...]          # in STAT_LABELS order
+    types: Tuple[str, str]
+    abilities: Tuple[str, str, str]
+    gender_ratio: int
+    catch_rate: int
+    exp_yield: int
+    level_up_learnset: str
+    teachable_learnset: str
+    egg_learnset: str
+    form_table: str
+    evolutions: Tuple[str, ...]
+
+    @property
+    def bst(self) -> int:
+        return sum(self.stats)
+
+
+# ────────────────────────────── parsing ───────────────────────────────
+def species_files(folder: str) -> List[str]:
+    """gen_*_families.h in *folder* or its species_info/ subfolder, by generation."""
+    paths = glob.glob(os.path.join(folder, "gen_*_families.h"))
+    paths += glob.glob(os.path.join(folder, "species_info", "gen_*_families.h"))
+
+    def gen(path: str) -> Tuple[int, str]:
+        digits = re.findall(r"\d+", os.path.basename(path))
+        return (int(digits[0]) if digits else 0, path)
+
+    return sorted(paths, key=gen)
+
+
+def _strip_comment(line: str) -> str:
+    if "/*" in line:
+        line = _BLOCK_COMMENT_RX.sub(" ", line)
+    cut = line.find("//")
+    if cut < 0:
+        return line
+    if '"' not in line[:cut]:
+        return line[:cut]
+    in_string = False
+    for i, ch in enumerate(line):
+        if ch == '"' and (i == 0 or line[i - 1] != "\\"):
+            in_string = not in_string
+        elif not in_string and line.startswith("//", i):
+            return line[:i]
+    return line
+
+
+def active_lines(path: str, macros: Optional[Dict[str, Tuple[List[str], str]]] = None) -> Iterator[str]:
+    """
+    Lines of *path* outside skipped preprocessor branches, comments removed.
+
+    Function-like ``#define``s are stored in *macros* (name -> params, body),
+    since some species (Unown, Arceus, Vivillon...) are initialized through one.
+    """
+    if macros is None:
+        macros = {}
+    skipping: List[bool] = []       # one flag per open #if: is this branch skipped?
+    define: List[str] = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.strip()
+            if define:                          # body of a multi-line #define
+                define.append(_strip_comment(line.rstrip("\\")))
+                if not line.endswith("\\"):
+                    _store_macro(" ".join(define), macros)
+                    define = []
+                continue
+            if line.startswith("#"):
+                directive = line[1:].lstrip().split(None, 1)[0] if len(line) > 1 else ""
+                if directive.startswith("if"):
+                    skipping.append(False)
+                elif directive in ("else", "elif") and skipping:
+                    skipping[-1] = True
+                elif directive == "endif" and skipping:
+                    skipping.pop()
+                elif directive == "define" and not any(skipping):
+                    if line.endswith("\\"):
+                        define = [_strip_comment(line.rstrip("\\"))]
+                    else:
+                        _store_macro(_strip_comment(line), macros)
+                continue
+            if any(skipping):
+                continue
+            line = _strip_comment(line).strip()
+            if line:
+                yield line
+
+
+def _store_macro(text: str, macros: Dict[str, Tuple[List[str], str]]) -> None:
+    m = _MACRO_RX.match(text)
+    if m and "{" in m.group(3):
+        params = [p.strip() for p in m.group(2).split(",") if p.strip()]
+        macros[m.group(1)] = (params, m.group(3).strip())
+
+
+def _expand(call: str, macros: Dict[str, Tuple[List[str], str]]) -> Optional[str]:
+    """Expand ``NAME(args)`` if NAME is a known initializer macro."""
+    name, _, rest = call.partition("(")
+    macro = macros.get(name.strip())
+    if macro is None or not rest.rstrip().endswith(")"):
+        return None
+    params, body = macro
+    args = _split_top(rest.rstrip()[:-1])
+    for param, arg in zip(params, args):
+        param = re.escape(param)
+        body = re.sub(rf"(?<!#)#\s*{param}\b(?!\s*#)", f'"{arg}"', body)
+        body = re.sub(rf"\b{param}\b", arg.replace("\\", r"\\"), body)
+    return re.sub(r"\s*##\s*", "", body)
+
+
+def _split_top(text: str, sep: str = ",") -> List[str]:
+    """Split on *sep* outside brackets and strings."""
+    parts, depth, start, in_string = [], 0, 0, False
+    for i, ch in enumerate(text):
+        if ch == '"' and (i == 0 or text[i - 1] != "\\"):
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif ch in "({[":
+            depth += 1
+        elif ch in ")}]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def first_branch(value: str) -> str:
+    """``(cond) ? a : b`` -> ``a``; anything else unchanged."""
+    pieces = _split_top(value, "?")
+    if len(pieces) < 2:
+        return value
+    return _split_top(pieces[1], ":")[0]
+
+
+def int_value(value: str, default: int = 0) -> int:
+    value = first_branch(value).strip()
+    while value.startswith("(") and value.endswith(")"):
+        value = value[1:-1].strip()
+    try:
+        return int(value, 0)
+    except ValueError:
+        return default
+
+
+def _gender(value: str) -> int:
+    value = first_branch(value)
+    if "MON_GENDERLESS" in value:
+        return MON_GENDERLESS
+    if "MON_FEMALE" in value:
+        return MON_FEMALE
+    if "MON_MALE" in value:
+        return MON_MALE
+    m = _PERCENT_RX.search(value)
+    if m:
+        return min(254, int(float(m.group(1)) * 255 / 100))
+    return int_value(value, MON_GENDERLESS)
+
+
+def _symbol(value: str) -> str:
+    value = first_branch(value).strip()
+    return value if _SYMBOL_RX.match(value) and value != "NULL" else ""
+
+
+def _fields(text: str) -> Dict[str, str]:
+    """``.name = value`` pairs of an initializer body (without the outer braces)."""
+    fields: Dict[str, str] = {}
+    for part in _split_top(text):
+        name, eq, value = part.partition("=")
+        if eq and name.strip().startswith("."):
+            fields[name.strip()[1:]] = value.strip()
+    return fields
+
+
+def initializers(path: str, prefix: str = "SPECIES_") -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    (constant, {field: raw value}) for each ``[PREFIX_X] = { ... }``
+    initializer in *path*; also used for move info.
+    """
+    entry_rx = _ENTRY_RX if prefix == "SPECIES_" else re.compile(rf"^\s*\[({prefix}\w+)\]\s*=")
+    macros: Dict[str, Tuple[List[str], str]] = {}
+    lines = active_lines(path, macros)
+    for line in lines:
+        m = entry_rx.match(line)
+        if m is None:
+            continue
+        rest = line[m.end():].strip() or next(lines, "")
+        if rest.startswith("{"):
+            depth = rest.count("{") - rest.count("}")
+            chunks = [rest]
+            while depth > 0:
+                nxt = next(lines, None)
+                if nxt is None:
+                    break
+                depth += nxt.count("{") - nxt.count("}")
+                chunks.append(nxt)
+            text = " ".join(chunks)
+        else:
+            # SPECIES_INFO_MACRO(args), possibly over several lines
+            chunks = [rest]
+            depth = rest.count("(") - rest.count(")")
+            while depth > 0:
+                nxt = next(lines, None)
+                if nxt is None:
+                    break
+                depth += nxt.count("(") - nxt.count(")")
+                chunks.append(nxt)
+            text = _expand(" ".join(chunks).rstrip(", "), macros)
+            if text is None:
+                continue
+        text = text.strip()
+        yield m.group(1), _fields(text[1:text.rfind("}")])
+
+
+# ─────────────────────────────── table ────────────────────────────────
+class SpeciesTable:
+    """
+    One row per species constant, in header order.
+
+    ``stats`` is ``(n, 6)`` uint8 in :data:`STAT_LABELS` order. ``types``
+    ``(n, 2)`` and ``abilities`` ``(n, 3)`` hold indexes into
+    ``type_names`` / ``ability_names``. Single-typed species repeat their
+    type, as the game does.
+    """
+
+    _shared: Dict[str, Tuple[List[Tuple[float, int]], "SpeciesTable"]] = {}
+    _store = DiskCache("species")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.type_names: List[str] = ["TYPE_NONE"]
+        self.ability_names: List[str] = ["ABILITY_NONE"]
+        self.level_up_learnsets: List[str] = []
+        self.teachable_learnsets: List[str] = []
+        self.egg_learnsets: List[str] = []
+        self.form_tables: List[str] = []
+        self.evolutions: List[Tuple[str, ...]] = []     # species each row evolves into
+        self.stats = np.zeros((0, 6), np.uint8)
+        self.types = np.zeros((0, 2), np.uint8)
+        self.abilities = np.zeros((0, 3), np.uint16)
+        self.gender_ratio = np.zeros(0, np.uint8)
+        self.catch_rate = np.zeros(0, np.uint8)
+        self.exp_yield = np.zeros(0, np.uint16)
+        self.index: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def parse(cls, paths: List[str]) -> "SpeciesTable":
+        table = cls()
+        type_codes = {name: i for i, name in enumerate(table.type_names)}
+        ability_codes = {name: i for i, name in enumerate(table.ability_names)}
+
+        def code(vocab: List[str], codes: Dict[str, int], name: str) -> int:
+            if name not in codes:
+                codes[name] = len(vocab)
+                vocab.append(name)
+            return codes[name]
+
+        stats, types, abilities, misc = [], [], [], []
+        for path in paths:
+            for species, fields in initializers(path):
+                if species in table.index or "speciesName" not in fields:
+                    continue
+                name = _NAME_RX.search(fields["speciesName"])
+                table.index[species] = len(table.ids)
+                table.ids.append(species)
+                table.names.append(name.group(1) if name else species)
+                stats.append([min(255, int_value(fields.get(f, "0"))) for f in STAT_FIELDS])
+
+                found = _TYPE_RX.findall(first_branch(fields.get("types", ""))) or ["TYPE_NONE"]
+                found = (found + found)[:2]
+                types.append([code(table.type_names, type_codes, t) for t in found])
+
+                found = _ABILITY_RX.findall(first_branch(fields.get("abilities", "")))
+                found = (found + ["ABILITY_NONE"] * 3)[:3]
+                abilities.append([code(table.ability_names, ability_codes, a) for a in found])
+
+                misc.append((
+                    _gender(fields.get("genderRatio", "MON_GENDERLESS")),
+                    min(255, int_value(fields.get("catchRate", "0"))),
+                    int_value(fields.get("expYield", "0")),
+                ))
+                table.level_up_learnsets.append(_symbol(fields.get("levelUpLearnset", "")))
+                table.teachable_learnsets.append(_symbol(fields.get("teachableLearnset", "")))
+                table.egg_learnsets.append(_symbol(fields.get("eggMoveLearnset", "")))
+                table.form_tables.append(_symbol(fields.get("formSpeciesIdTable", "")))
+                table.evolutions.append(tuple(dict.fromkeys(
+                    _EVO_TARGET_RX.findall(first_branch(fields.get("evolutions", "")))
+                )))
+
+        n = len(table.ids)
+        table.stats = np.array(stats, np.uint8).reshape(n, 6)
+        table.types = np.array(types, np.uint8).reshape(n, 2)
+        table.abilities = np.array(abilities, np.uint16).reshape(n, 3)
+        misc_arr = np.array(misc, np.int64).reshape(n, 3)
+        table.gender_ratio = misc_arr[:, 0].astype(np.uint8)
+        table.catch_rate = misc_arr[:, 1].astype(np.uint8)
+        table.exp_yield = misc_arr[:, 2].astype(np.uint16)
+        return table
+
+    @classmethod
+    def load(cls, folder: str) -> "SpeciesTable":
+        """
+        Table for the species headers under *folder*.
+
+        Unchanged files (same mtime and size) return the table already in
+        memory. Otherwise the files are hashed and the disk cache is tried
+        before parsing.
+        """
+        paths = species_files(folder)
+        stamps = []
+        for path in paths:
+            st = os.stat(path)
+            stamps.append((st.st_mtime, st.st_size))
+        key = os.path.abspath(folder)
+        shared = cls._shared.get(key)
+        if shared is not None and shared[0] == stamps:
+            return shared[1]
+
+        parts = []
+        for path in paths:
+            with open(path, "rb") as f:
+                parts.append(os.path.basename(path).encode() + b"\0" + f.read())
+        table = cls._store.get_or_compute(content_key(*parts), lambda: cls.parse(paths))
+        cls._shared[key] = (stamps, table)
+        return table
+
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, species: str) -> bool:
+        return species in self.index
+
+    def row(self, species: str) -> Optional[int]:
+        return self.index.get(species)
+
+    def rows_named(self, name: str) -> List[int]:
+        """Rows whose display name is *name* (a species and its forms share one)."""
+        folded = name.casefold()
+        return [i for i, n in enumerate(self.names) if n.casefold() == folded]
+
+    def info(self, species: str) -> Optional[SpeciesInfo]:
+        i = self.index.get(species)
+        if i is None:
+            return None
+        return SpeciesInfo(
+            species=species,
+            name=self.names[i],
+            stats=tuple(int(v) for v in self.stats[i]),
+            types=tuple(self.type_names[t] for t in self.types[i]),
+            abilities=tuple(self.ability_names[a] for a in self.abilities[i]),
+            gender_ratio=int(self.gender_ratio[i]),
+            catch_rate=int(self.catch_rate[i]),
+            exp_yield=int(self.exp_yield[i]),
+            level_up_learnset=self.level_up_learnsets[i],
+            teachable_learnset=self.teachable_learnsets[i],
+            egg_learnset=self.egg_learnsets[i],
+            form_table=self.form_tables[i],
+            evolutions=self.evolutions[i],
+        )
+
+    def forms_of(self, species: str) -> List[str]:
+        """Species sharing *species*' formSpeciesIdTable, itself included."""
+        i = self.index.get(species)
+        if i is None:
+            return []
+        table = self.form_tables[i]
+        if not table:
+            return [species]
+        return [s for s, t in zip(self.ids, self.form_tables) if t == table]
+
+    def pre_evolutions(self) -> Dict[str, str]:
+        """species -> the species that evolves into it."""
+        return {target: species
+                for species, targets in zip(self.ids, self.evolutions)
+                for target in targets if target in self.index}
+
+    def species_for(self, name: str) -> Optional[str]:
+        """
+        Species constant for a trainers.party name such as "Vulpix-Alola" or
+        "Mr. Mime"; falls back to the first species with that display name.
+        """
+        folded = unicodedata.normalize("NFKD", name)
+        folded = "".join(c for c in folded if not unicodedata.combining(c)).replace("'", "")
+        constant = "SPECIES_" + re.sub(r"[^A-Za-z0-9]+", "_", folded).strip("_").upper()
+        if constant in self.index:
+            return constant
+        rows = self.rows_named(name)
+        return self.ids[rows[0]] if rows else None
+
+    def type_code(self, type_name: str) -> int:
+        try:
+            return self.type_names.index(type_name)
+        except ValueError:
+            return -1
+
+    def with_type(self, type_name: str) -> np.ndarray:
+        """Boolean mask of species having *type_name* as either type."""
+        code = self.type_code(type_name)
+        return (self.types == code).any(axis=1)
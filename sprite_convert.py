@@ -0,0 +1,231 @@
+"""
+Convert RGBA sprites into 16-colour indexed sprites the GBA can use.
+
+Index 0 of every palette is the transparent colour. Sprites can either get
+their own palette, built by median cut and a few k-means passes, or be
+remapped by nearest colour onto an existing project palette (.pal / .gbapal).
+Output is a 4-bit indexed PNG plus matching ``.pal`` (JASC) and ``.gbapal``
+(BGR555) files.
+
+Run ``python sprite_convert.py SRC_DIR DEST_DIR [PALETTE]`` to batch-convert
+a folder.
+"""
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+PALETTE_SIZE = 16
+TRANSPARENT_FALLBACK = (255, 0, 255)
+
+
+# ───────────────────────────── image I/O ──────────────────────────────
+def load_rgba(path: str) -> np.ndarray:
+    """Load any image Qt can read as an (H, W, 4) uint8 array."""
+    img = QImage(path)
+    if img.isNull():
+        raise ValueError(f"Could not read image: {path}")
+    img = img.convertToFormat(QImage.Format.Format_RGBA8888)
+    bits = img.constBits()
+    bits.setsize(img.sizeInBytes())
+    rows = np.frombuffer(bits, np.uint8).reshape(img.height(), img.bytesPerLine())
+    return rows[:, : img.width() * 4].reshape(img.height(), img.width(), 4).copy()
+
+
+def encode_indexed_png(indices: np.ndarray, palette: np.ndarray) -> bytes:
+    """4-bit indexed PNG with palette index 0 marked transparent."""
+    h, w = indices.shape
+    padded = indices.astype(np.uint8)
+    if w % 2:
+        padded = np.pad(padded, ((0, 0), (0, 1)))
+    packed = (padded[:, 0::2] << 4) | padded[:, 1::2]
+    raw = np.hstack([np.zeros((h, 1), np.uint8), packed]).tobytes()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 4, 3, 0, 0, 0)),
+        chunk(b"PLTE", palette.astype(np.uint8).tobytes()),
+        chunk(b"tRNS", b"\x00"),
+        chunk(b"IDAT", zlib.compress(raw, 9)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def encode_jasc_pal(palette: np.ndarray) -> bytes:
+    lines = ["JASC-PAL", "0100", str(len(palette))]
+    lines += [f"{r} {g} {b}" for r, g, b in palette.tolist()]
+    return ("\r\n".join(lines) + "\r\n").encode("ascii")
+
+
+def encode_gbapal(palette: np.ndarray) -> bytes:
+    c = palette.astype(np.uint16) >> 3
+    return (c[:, 0] | (c[:, 1] << 5) | (c[:, 2] << 10)).astype("<u2").tobytes()
+
+
+def read_palette(path: str) -> np.ndarray:
+    """Read a JASC .pal or a binary .gbapal into a (16, 3) uint8 array."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"JASC-PAL"):
+        rows = data.decode("ascii").split()[3:]
+        colors = np.array(rows, dtype=np.int32).reshape(-1, 3)
+    else:
+        words = np.frombuffer(data[: len(data) // 2 * 2], "<u2").astype(np.int32)
+        five_bit = np.stack([words & 31, (words >> 5) & 31, (words >> 10) & 31], axis=1)
+        colors = (five_bit << 3) | (five_bit >> 2)
+    out = np.zeros((PALETTE_SIZE, 3), np.uint8)
+    out[: min(len(colors), PALETTE_SIZE)] = colors[:PALETTE_SIZE]
+    return out
+
+
+# ──────────────────────────── quantization ────────────────────────────
+def to_gba_colors(rgb: np.ndarray) -> np.ndarray:
+    """Snap 8-bit channels to the 5-bit values the GBA can show."""
+    c = rgb.astype(np.uint8) & 0xF8
+    return c | (c >> 5)
+
+
+def transparent_mask(rgba: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+    """Pixels that become index 0, plus the colour stored there."""
+    mask = rgba[..., 3] < 128
+    if mask.any():
+        return mask, TRANSPARENT_FALLBACK
+    # fully opaque sheets use the top-left pixel as background colour
+    key = rgba[0, 0, :3]
+    return np.all(rgba[..., :3] == key, axis=-1), tuple(int(v) for v in key)
+
+
+def _median_cut(colors: np.ndarray, weights: np.ndarray, k: int) -> np.ndarray:
+    boxes = [np.arange(len(colors))]
+    while len(boxes) < k:
+        spans = [np.ptp(colors[b], axis=0).max() if len(b) > 1 else -1 for b in boxes]
+        i = int(np.argmax(spans))
+        if spans[i] <= 0:
+            break
+        box = boxes.pop(i)
+        axis = int(np.argmax(np.ptp(colors[box], axis=0)))
+        order = box[np.argsort(colors[box, axis], kind="stable")]
+        cum = np.cumsum(weights[order])
+        cut = int(np.clip(np.searchsorted(cum, cum[-1] / 2), 1, len(order) - 1))
+        boxes += [order[:cut], order[cut:]]
+    return np.array([np.average(colors[b], axis=0, weights=weights[b]) for b in boxes])
+
+
+def _nearest(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    d = ((colors[:, None, :].astype(np.int32) - palette[None, :, :].astype(np.int32)) ** 2).sum(-1)
+    return d.argmin(axis=1)
+
+
+def build_palette(colors: np.ndarray, weights: np.ndarray, k: int, iterations: int = 6) -> np.ndarray:
+    """Median cut on the unique colours, refined with weighted k-means."""
+    centers = _median_cut(colors.astype(np.float64), weights.astype(np.float64), k)
+    for _ in range(iterations):
+        labels = _nearest(colors, centers)
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        sums = np.stack([
+            np.bincount(labels, weights=colors[:, c] * weights, minlength=len(centers))
+            for c in range(3)
+        ], axis=1)
+        keep = totals > 0
+        centers[keep] = sums[keep] / totals[keep, None]
+    return to_gba_colors(np.rint(centers).clip(0, 255))
+
+
+def quantize(rgba: np.ndarray, palette: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce an RGBA image to (indices, palette) with at most 16 colours.
+
+    If *palette* is given, opaque pixels are mapped to its nearest entry among
+    indices 1-15 and the palette is returned unchanged.
+    """
+    mask, key = transparent_mask(rgba)
+    rgb = to_gba_colors(rgba[..., :3])
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    uniq, inverse, counts = np.unique(packed[~mask], return_inverse=True, return_counts=True)
+    colors = np.stack([(uniq >> 16) & 255, (uniq >> 8) & 255, uniq & 255], axis=1).astype(np.int32)
+
+    if palette is not None:
+        palette = np.asarray(palette, np.uint8)[:PALETTE_SIZE]
+        lut = _nearest(colors, palette[1:]) + 1 if len(colors) else np.zeros(0, np.int64)
+    else:
+        palette = np.zeros((PALETTE_SIZE, 3), np.uint8)
+        palette[0] = to_gba_colors(np.array(key))
+        if len(colors) <= PALETTE_SIZE - 1:
+            palette[1: len(colors) + 1] = colors
+            lut = np.arange(1, len(colors) + 1)
+        else:
+            centers = build_palette(colors, counts, PALETTE_SIZE - 1)
+            palette[1: len(centers) + 1] = centers
+            lut = _nearest(colors, palette[1: len(centers) + 1]) + 1
+
+    indices = np.zeros(mask.shape, np.uint8)
+    indices[~mask] = np.asarray(lut, np.uint8)[inverse.ravel()]
+    return indices, palette
+
+
+# ──────────────────────────── conversion ──────────────────────────────
+def convert_sprite(src: str, dest_png: str, palette: Optional[np.ndarray] = None) -> bool:
+    """
+    Write the indexed PNG, .pal and .gbapal for *src*.
+
+    Returns False if all three outputs were already byte-identical on disk.
+    """
+    indices, pal = quantize(load_rgba(src), palette)
+    stem = os.path.splitext(dest_png)[0]
+    outputs = {
+        dest_png: encode_indexed_png(indices, pal),
+        stem + ".pal": encode_jasc_pal(pal),
+        stem + ".gbapal": encode_gbapal(pal),
+    }
+    changed = False
+    for path, data in outputs.items():
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    continue
+        with open(path, "wb") as f:
+            f.write(data)
+        changed = True
+    return changed
+
+
+class SpriteConverter:
+    """Writer for :func:`sprite_import.run_copies` that converts instead of copying."""
+
+    def __init__(self, palette_path: Optional[str] = None):
+        self.palette = read_palette(palette_path) if palette_path else None
+
+    def __call__(self, src: str, dest: str) -> bool:
+        return convert_sprite(src, dest, self.palette)
+
+
+def convert_folder(
+    src_dir: str,
+    dest_dir: str,
+    palette_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """Convert every PNG in *src_dir* into *dest_dir*; returns the files written."""
+    os.makedirs(dest_dir, exist_ok=True)
+    converter = SpriteConverter(palette_path)
+    names = sorted(n for n in os.listdir(src_dir) if n.lower().endswith(".png"))
+    jobs = [(os.path.join(src_dir, n), os.path.join(dest_dir, n)) for n in names]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        changed = list(pool.map(lambda job: converter(*job), jobs))
+    return [dest for (_, dest), did in zip(jobs, changed) if did]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("usage: sprite_convert.py SRC_DIR DEST_DIR [PALETTE]")
+        sys.exit(2)
+    written = convert_folder(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else None)
+    print(f"Converted {len(written)} sprite(s).")
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+ProgressCallback = Callable[[int, int], None]
+# writer(src, dest) -> False if dest was already up to date
+Writer = Callable[[str, str], bool]
+
+
+def file_digest(path: str, chunk_size: int = 1 << 16) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def same_content(a: str, b: str) -> bool:
+    """True if both files exist and are byte-identical (size checked before hashing)."""
+    try:
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+    except OSError:
+        return False
+    return file_digest(a) == file_digest(b)
+
+
+@dataclass
+class CopyJob:
+    src: str
+    dest: str
+
+
+@dataclass
+class ImportResult:
+    copied: List[str] = field(default_factory=list)     # destination paths written
+    skipped: List[str] = field(default_factory=list)    # identical file already there
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (source, error)
+
+
+def plan_copies(sources: Iterable[str], dest_dir: str) -> List[CopyJob]:
+    return [CopyJob(src, os.path.join(dest_dir, os.path.basename(src))) for src in sources]
+
+
+def copy_if_changed(src: str, dest: str) -> bool:
+    """Copy one file; returns False when the destination was already identical."""
+    if os.path.exists(dest) and same_content(src, dest):
+        return False
+    shutil.copyfile(src, dest)
+    return True
+
+
+def run_copies(
+    jobs: List[CopyJob],
+    progress: Optional[ProgressCallback] = None,
+    max_workers: Optional[int] = None,
+    writer: Writer = copy_if_changed,
+) -> ImportResult:
+    """
+    Copy files on a thread pool, skipping destinations that are byte-identical.
+
+    Pass a different *writer* (e.g. a sprite converter) to transform the
+    files instead of copying them.
+
+    *progress* is called as ``progress(done, total)`` from the calling thread
+    after each file finishes, so a GUI can update a progress bar from it.
+    """
+    result = ImportResult()
+    if not jobs:
+        return result
+    workers = max_workers or min(8, (os.cpu_count() or 2) * 2, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(writer, job.src, job.dest): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            job = futures[future]
+            try:
+                if future.result():
+                    result.copied.append(job.dest)
+                else:
+                    result.skipped.append(job.dest)
+            except (OSError, ValueError) as e:
+                result.failed.append((job.src, str(e)))
+            if progress:
+                progress(done, len(jobs))
+    return result
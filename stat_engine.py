@@ -0,0 +1,152 @@
+"""
+Final battle stats for trainer Pokémon, computed for a whole roster at once.
+
+Inputs are ``(mons, 6)`` arrays in HP/Atk/Def/SpA/SpD/Spe order, the same
+order as species_data.STAT_LABELS and the IV/EV lists in trainers.party. The
+formula follows the game's integer maths:
+
+    HP    = (2*Base + IV + EV//4) * Level // 100 + Level + 10
+    other = ((2*Base + IV + EV//4) * Level // 100 + 5) * Nature // 100
+
+Nature is 90, 100 or 110 per stat, taken from :func:`nature_matrix`.
+"""
+import csv
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from species_data import STAT_LABELS, SpeciesTable
+
+# in NATURE_* constant order
+NATURES = (
+    "Hardy", "Lonely", "Brave", "Adamant", "Naughty",
+    "Bold", "Docile", "Relaxed", "Impish", "Lax",
+    "Timid", "Hasty", "Serious", "Jolly", "Naive",
+    "Modest", "Mild", "Quiet", "Bashful", "Rash",
+    "Calm", "Gentle", "Sassy", "Careful", "Quirky",
+)
+NEUTRAL = len(NATURES)          # row used for a missing or unknown nature
+# trainerproc fills IVs left out of trainers.party with 31, as Showdown does
+DEFAULT_IV = 31
+
+_NATURE_INDEX = {name.lower(): i for i, name in enumerate(NATURES)}
+# natures raise/lower Atk, Def, Spe, SpA, SpD in that order; map to our columns
+_NATURE_COLUMNS = (1, 2, 5, 3, 4)
+
+
+def nature_matrix() -> np.ndarray:
+    """``(26, 6)`` int32 percentages; row ``NEUTRAL`` is all 100."""
+    matrix = np.full((len(NATURES) + 1, 6), 100, np.int32)
+    for n in range(len(NATURES)):
+        up, down = _NATURE_COLUMNS[n // 5], _NATURE_COLUMNS[n % 5]
+        if up != down:
+            matrix[n, up] = 110
+            matrix[n, down] = 90
+    return matrix
+
+
+NATURE_MATRIX = nature_matrix()
+
+
+def nature_index(name: Optional[str]) -> int:
+    return _NATURE_INDEX.get((name or "").strip().lower(), NEUTRAL)
+
+
+def compute_stats(
+    base: np.ndarray,
+    ivs: np.ndarray,
+    evs: np.ndarray,
+    levels: np.ndarray,
+    natures: np.ndarray,
+    hp_is_one: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Final stats, ``(mons, 6)`` int32. *hp_is_one* marks Shedinja-like rows."""
+    base = base.astype(np.int32, copy=False)
+    level = levels.astype(np.int32, copy=False)[:, None]
+    core = (2 * base + ivs + evs // 4) * level // 100
+    stats = (core + 5) * NATURE_MATRIX[natures] // 100
+    stats[:, 0] = core[:, 0] + level[:, 0] + 10
+    if hp_is_one is not None:
+        stats[hp_is_one, 0] = 1
+    return stats
+
+
+# ─────────────────────────────── roster ───────────────────────────────
+@dataclass
+class StatSheet:
+    """Final stats for every party member; ``rows[i]`` describes ``stats[i]``."""
+    rows: List[Tuple[str, int, str, int, str]]      # trainer, slot, species, level, nature
+    stats: np.ndarray                                # (mons, 6); -1 where the species is unknown
+
+    def write_csv(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Trainer", "Slot", "Species", "Level", "Nature", *STAT_LABELS, "Total"])
+            totals = self.stats.sum(axis=1)
+            for row, stats, total in zip(self.rows, self.stats.tolist(), totals.tolist()):
+                known = stats[0] >= 0
+                writer.writerow([*row, *(stats if known else [""] * 6), total if known else ""])
+
+
+def _stat_list(values: Iterable[Optional[int]], default: int) -> List[int]:
+    out = [default if v is None else v for v in list(values)[:6]]
+    return out + [default] * (6 - len(out))
+
+
+def roster_stats(trainers: Iterable, table: SpeciesTable) -> StatSheet:
+    """Stats for every Pokémon in *trainers* (``Trainer`` objects with a ``party``)."""
+    return party_stats(
+        ((trainer.id, slot, mon) for trainer in trainers
+         for slot, mon in enumerate(trainer.party, start=1)),
+        table,
+    )
+
+
+def party_stats(members: Iterable[Tuple[str, int, object]], table: SpeciesTable) -> StatSheet:
+    """
+    Stats for ``(trainer ID, slot, Pokemon)`` triples. Only gathering the
+    inputs runs per mon; the maths is one array pass.
+    """
+    rows: List[Tuple[str, int, str, int, str]] = []
+    species_rows: List[int] = []
+    ivs: List[List[int]] = []
+    evs: List[List[int]] = []
+    levels: List[int] = []
+    natures: List[int] = []
+    lookup: Dict[str, int] = {}
+
+    for trainer_id, slot, mon in members:
+        if mon.species not in lookup:
+            constant = table.species_for(mon.species) if mon.species else None
+            lookup[mon.species] = table.row(constant) if constant else -1
+        rows.append((trainer_id, slot, mon.species, mon.level, mon.nature or ""))
+        species_rows.append(lookup[mon.species])
+        ivs.append(_stat_list(mon.ivs, DEFAULT_IV))
+        evs.append(_stat_list(mon.evs, 0))
+        levels.append(mon.level)
+        natures.append(nature_index(mon.nature))
+
+    n = len(rows)
+    species_idx = np.array(species_rows, np.int64)
+    known = species_idx >= 0
+    base = np.zeros((n, 6), np.int32)
+    if len(table):
+        base[known] = table.stats[species_idx[known]]
+    shedinja = table.row("SPECIES_SHEDINJA")
+    stats = compute_stats(
+        base,
+        np.array(ivs, np.int32).reshape(n, 6),
+        np.array(evs, np.int32).reshape(n, 6),
+        np.array(levels, np.int32),
+        np.array(natures, np.int64),
+        species_idx == shedinja if shedinja is not None else None,
+    )
+    stats[~known] = -1
+    return StatSheet(rows, stats)
+
+
+def mon_stats(mon, table: SpeciesTable) -> Optional[Tuple[int, ...]]:
+    """Final stats of one Pokémon, or None if its species is not in *table*."""
+    stats = party_stats([("", 1, mon)], table).stats[0]
+    return None if stats[0] < 0 else tuple(int(v) for v in stats)
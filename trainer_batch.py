@@ -0,0 +1,144 @@
+import copy
+import csv
+import io
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from atomic_io import FileTransaction
+from define_table import DefineTable
+from opponents_header import OpponentsHeader
+from trainer_parser import Pokemon, Trainer, format_trainer
+
+
+@dataclass
+class TrainerSpec:
+    name: str
+    template: str = ""        # trainer ID whose class, pic and party are copied
+    class_: str = ""
+    pic: str = ""
+
+
+_ID_RX = re.compile(r"TRAINER_[A-Z0-9_]+")
+
+
+def trainer_id_for(name: str) -> str:
+    """C constant for a display name: "Mr. Fuji" -> TRAINER_MR_FUJI, "Zoë" -> TRAINER_ZOE."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return "TRAINER_" + re.sub(r"[^A-Z0-9]+", "_", ascii_name.upper()).strip("_")
+
+
+def default_trainer(trainer_id: str, name: str) -> Trainer:
+    """The stock trainer the New Trainer page has always created."""
+    return Trainer(
+        id=trainer_id,
+        name=name,
+        class_="Pkmn Trainer 1",
+        pic="Hiker",
+        gender="Male",
+        music="Male",
+        party=[Pokemon(species="Bulbasaur", level=50)],
+    )
+
+
+def parse_trainer_specs(text: str) -> List[TrainerSpec]:
+    """
+    Read a list of names, one per line, or a CSV with a header row.
+
+    Recognised CSV columns are ``name``, ``template``, ``class`` and ``pic``.
+    Without a header, a line may still carry a template after a comma:
+    ``Joey, TRAINER_YOUNGSTER_CALVIN_1``.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    first = text.splitlines()[0]
+    columns = [c.strip().lower() for c in first.split(",")]
+
+    specs = []
+    if "name" in columns:
+        for row in csv.DictReader(io.StringIO(text), skipinitialspace=True):
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            if row.get("name"):
+                specs.append(TrainerSpec(
+                    name=row["name"],
+                    template=row.get("template", ""),
+                    class_=row.get("class", ""),
+                    pic=row.get("pic", ""),
+                ))
+        return specs
+
+    for line in text.splitlines():
+        parts = [p.strip() for p in line.split(",")]
+        if parts[0]:
+            specs.append(TrainerSpec(name=parts[0], template=parts[1] if len(parts) > 1 else ""))
+    return specs
+
+
+def create_trainers(
+    project_folder: str,
+    specs: List[TrainerSpec],
+    templates: Dict[str, Trainer],
+    defines: Optional[DefineTable] = None,
+) -> List[Trainer]:
+    """
+    Create every trainer in *specs* in one go.
+
+    IDs are allocated in memory from the opponents.h model. opponents.h and
+    trainers.party are then written together in one :class:`FileTransaction`,
+    so a failure leaves both files as they were. Returns the new
+    :class:`Trainer` objects so callers can extend their roster in place.
+    Raises ValueError on names that give no usable ID, duplicates, unknown
+    templates or a full table.
+    """
+    opp_path = os.path.join(project_folder, "include", "constants", "opponents.h")
+    party_path = os.path.join(project_folder, "src", "data", "trainers.party")
+    if not os.path.isfile(opp_path) or not os.path.isfile(party_path):
+        raise ValueError("Missing opponents.h or trainers.party.")
+
+    opponents = OpponentsHeader.open(opp_path, defines)
+    if opponents.dirty:
+        opponents.discard()
+
+    ids = [trainer_id_for(spec.name) for spec in specs]
+    problems = []
+    seen = set()
+    for spec, trainer_id in zip(specs, ids):
+        if not _ID_RX.fullmatch(trainer_id):
+            problems.append(f"{spec.name!r} does not give a valid trainer ID.")
+            continue
+        if trainer_id in opponents or trainer_id in seen:
+            problems.append(f"{trainer_id} already exists.")
+        if spec.template and spec.template not in templates:
+            problems.append(f"Unknown template {spec.template}.")
+        seen.add(trainer_id)
+    if problems:
+        raise ValueError("\n".join(problems))
+
+    created: List[Trainer] = []
+    try:
+        for spec, trainer_id in zip(specs, ids):
+            opponents.add(trainer_id)
+            if spec.template:
+                trainer = copy.deepcopy(templates[spec.template])
+                trainer.id, trainer.name = trainer_id, spec.name
+            else:
+                trainer = default_trainer(trainer_id, spec.name)
+            trainer.class_ = spec.class_ or trainer.class_
+            trainer.pic = spec.pic or trainer.pic
+            created.append(trainer)
+    except ValueError:
+        opponents.discard()
+        raise
+
+    blocks = []
+    for trainer in created:
+        blocks += format_trainer(trainer)
+
+    transaction = FileTransaction()
+    opponents.save(transaction)
+    transaction.append(party_path, "\n" + "\n".join(blocks))
+    transaction.commit()
+    return created
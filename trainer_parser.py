@@ -1,8 +1,16 @@
 import os
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
+from define_table import DefineTable
+from header_scanner import HeaderScanner
+from learnsets import LearnsetIndex
+from move_data import MoveTable
+from party_merge import PartyFile
+from species_data import SpeciesTable
+from type_chart import TypeChart
+
 @dataclass
 class Pokemon:
     nickname: Optional[str] = ""
@@ -39,25 +47,36 @@ class Trainer:
 class TrainerParser:
     def __init__(self):
         self.trainers: List[Trainer] = []
+        self.party_file: Optional[PartyFile] = None     # trainers.party as last read, split into blocks
         self.ai_flags: List[str] = []
         self.music_tracks: List[str] = []
         self.classes: List[str] = []
         self.pics: List[str] = []
 
         self.species: List[str] = []
+        self.species_table = SpeciesTable()
+        self.learnsets: Optional[LearnsetIndex] = None
+        self.type_chart = TypeChart.standard()
         self.moves: List[str] = []
+        self.move_table = MoveTable()
         self.items: List[str] = []
         self.natures: List[str] = []
         self.abilities: List[str] = []
         self.balls: List[str] = []
         self.tera_types: List[str] = []
 
+        # every include/constants header is read once and shared by the loaders below
+        self.headers = HeaderScanner()
+        self.defines = DefineTable(self.headers)
+        self.move_ids: Dict[str, int] = {}
+
     def load_trainers(self, path: str):
         if not os.path.exists(path):
             raise FileNotFoundError("Could not find trainers.party file")
 
         with open(path, encoding="utf-8") as f:
             data = f.read()
+        self.party_file = PartyFile.parse(data)
 
         blocks = re.split(r"^===\s*", data, flags=re.MULTILINE)
         self.trainers.clear()
@@ -119,32 +138,7 @@ class TrainerParser:
                     # Parse nickname, species, gender og held item
                     mon.nickname, mon.species, mon.gender, mon.held_item = self._parse_mon_line(line)
                 elif mon:
-                    if line.startswith("Level:"):
-                        mon.level = int(line[6:].strip())
-                    elif line.startswith("Ability:"):
-                        mon.ability = line[8:].strip()
-                    elif line.startswith("Nature:"):
-                        mon.nature = line[7:].strip()
-                    elif line.startswith("Ball:"):
-                        mon.ball = line[5:].strip()
-                    elif line.startswith("Tera Type:"):
-                        mon.tera_type = line[10:].strip()
-                    elif line.startswith("Dynamax Level:"):
-                        mon.dynamax_level = int(line[15:].strip())
-                    elif line.startswith("Shiny:"):
-                        mon.is_shiny = "yes" in line.lower()
-                    elif line.startswith("Gigantamax:"):
-                        mon.is_gigantamax = "yes" in line.lower()
-                    elif line.startswith("Happiness:"):
-                        mon.happiness = int(line[10:].strip())
-                    elif line.startswith("IVs:"):
-                        mon.ivs = self._parse_stat_line(line[4:].strip())
-                    elif line.startswith("EVs:"):
-                        mon.evs = self._parse_stat_line(line[4:].strip())
-                    elif line.startswith("- "):
-                        move = line[2:].strip()
-                        if move:
-                            mon.moves.append(move)
+                    self._parse_mon_field(mon, line)
 
             if mon:
                 trainer.party.append(mon)
@@ -155,6 +149,56 @@ class TrainerParser:
         self.classes = sorted(seen_class)
         self.pics = sorted(seen_pic)
 
+    def _parse_mon_field(self, mon: Pokemon, line: str) -> None:
+        """One ``Key: value`` or ``- Move`` line of a party member."""
+        if line.startswith("Level:"):
+            mon.level = int(line[6:].strip())
+        elif line.startswith("Ability:"):
+            mon.ability = line[8:].strip()
+        elif line.startswith("Nature:"):
+            mon.nature = line[7:].strip()
+        elif line.startswith("Ball:"):
+            mon.ball = line[5:].strip()
+        elif line.startswith("Tera Type:"):
+            mon.tera_type = line[10:].strip()
+        elif line.startswith("Dynamax Level:"):
+            mon.dynamax_level = int(line[15:].strip())
+        elif line.startswith("Shiny:"):
+            mon.is_shiny = "yes" in line.lower()
+        elif line.startswith("Gigantamax:"):
+            mon.is_gigantamax = "yes" in line.lower()
+        elif line.startswith("Happiness:"):
+            mon.happiness = int(line[10:].strip())
+        elif line.startswith("IVs:"):
+            mon.ivs = self._parse_stat_line(line[4:].strip())
+        elif line.startswith("EVs:"):
+            mon.evs = self._parse_stat_line(line[4:].strip())
+        elif line.startswith("- "):
+            move = line[2:].strip()
+            if move:
+                mon.moves.append(move)
+
+    def parse_party(self, text: str) -> List[Pokemon]:
+        """
+        Pokémon in a block of trainers.party text, without the trainer header.
+        Raises ValueError naming the first line with a bad number.
+        """
+        party: List[Pokemon] = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if ":" not in line and not line.startswith("- "):
+                party.append(Pokemon())
+                mon = party[-1]
+                mon.nickname, mon.species, mon.gender, mon.held_item = self._parse_mon_line(line)
+            elif party:
+                try:
+                    self._parse_mon_field(party[-1], line)
+                except ValueError:
+                    raise ValueError(f"Line {number}: {line!r} is not a valid value.") from None
+        return party
+
     def _parse_mon_line(self, line: str):
         pattern = re.compile(
             r'^(?:(?P<nickname>.*?) \((?P<species1>.*?)\)|(?P<species2>.*?))'
@@ -183,68 +227,86 @@ class TrainerParser:
         return result
 
     def load_species(self, folder_path: str):
+        """Species display names; the full table is kept in ``self.species_table``."""
         self.species.clear()
-        pattern = re.compile(r'\.speciesName\s*=\s*_\("(.+?)"\)')
-        for filename in os.listdir(folder_path):
-            if filename.startswith("gen_") and filename.endswith("_families.h"):
-                with open(os.path.join(folder_path, filename), encoding="utf-8") as f:
-                    for line in f:
-                        match = pattern.search(line)
-                        if match:
-                            self.species.append(match.group(1))
+        self.species_table = SpeciesTable.load(folder_path)
+        self.species.extend(self.species_table.names)
         self.species.sort()
 
 
+    def load_learnsets(self, folder_path: str):
+        """Legal-move bitsets per species; call after load_species and load_moves."""
+        self.defines.refresh()
+        self.learnsets = LearnsetIndex.load(folder_path, self.species_table, self.defines.value)
+
+    def load_type_chart(self, project_root: str):
+        """Type effectiveness matrix from the battle source; the standard chart if not found."""
+        header = os.path.join(project_root, "include", "constants", "pokemon.h")
+        type_ids: Dict[str, int] = {}
+        if os.path.exists(header):
+            self.defines.refresh()
+            for define in self.headers.scan(header).with_prefix("TYPE_"):
+                value = self.defines.value(define.name)
+                if value is not None:
+                    type_ids[define.name] = value
+        self.type_chart = TypeChart.load(project_root, type_ids)
+
+    def load_move_info(self, project_root: str):
+        """Power, type and category of every move, for the damage calculator."""
+        self.move_table = MoveTable.load(project_root)
+
+    def load_defines(self, project_root: str):
+        """Build the #define symbol table over include/constants and include/config."""
+        self.defines.load_include_dirs(project_root)
+
+    def constant(self, name: str) -> Optional[int]:
+        self.defines.refresh()
+        return self.defines.value(name)
+
     def load_moves(self, filepath: str):
         self.moves.clear()
+        self.move_ids.clear()
         if not os.path.exists(filepath):
             print(f"Could not find moves.h: {filepath}")
             return
 
-        move_regex = re.compile(r"#define\s+MOVE_([A-Z0-9_]+)\s+\d+")
-        seen = set()
+        if os.path.abspath(filepath) not in self.defines.paths:
+            self.defines.load_headers(self.defines.paths + [filepath])
+        self.defines.refresh()
+        moves_count = self.defines.value("MOVES_COUNT")
+        seen_ids = set()
 
-        with open(filepath, encoding="utf-8") as f:
-            for line in f:
-                match = move_regex.match(line)
-                if match:
-                    raw_name = match.group(1)
-
-                    if '//' in line or 'MOVE_' in raw_name:
-                        continue
-
-                    formatted = re.sub(r"_", " ", raw_name.lower()).title()
+        for define in self.headers.scan(filepath).with_prefix("MOVE_"):
+            if define.comment:
+                continue
+            move_id = self.defines.value(define.name)
+            if move_id is None or move_id in seen_ids:
+                continue  # not a constant, or an alias of a move already listed
+            if moves_count is not None and move_id >= moves_count:
+                continue  # sentinels such as MOVE_UNAVAILABLE
 
-                    if formatted not in seen:
-                        self.moves.append(formatted)
-                        seen.add(formatted)
+            formatted = define.suffix.lower().replace("_", " ").title()
+            self.moves.append(formatted)
+            self.move_ids[formatted] = move_id
+            seen_ids.add(move_id)
 
         self.moves.sort(key=str.lower)
         print(f"Loaded {len(self.moves)} moves.")
 
-
-
-
     def load_items(self, filepath: str):
         self.items.clear()
         self.balls.clear()
         if not os.path.exists(filepath):
             return
-        pattern = re.compile(r"#define\s+ITEM_([A-Z0-9_]+)\s+\d+")
-        in_ball_section = False
-        with open(filepath, encoding="utf-8") as f:
-            for line in f:
-                if "// Poké Balls" in line:
-                    in_ball_section = True
-                elif "// Medicine" in line:
-                    in_ball_section = False
-
-                match = pattern.match(line)
-                if match:
-                    name = match.group(1).replace("_", " ").title()
-                    self.items.append(name)
-                    if in_ball_section:
-                        self.balls.append(name)
+        scan = self.headers.scan(filepath)
+        ball_span = scan.span("Poké Balls", "Medicine")
+        for define in scan.with_prefix("ITEM_"):
+            if not define.is_numeric:
+                continue
+            name = define.suffix.replace("_", " ").title()
+            self.items.append(name)
+            if ball_span and ball_span[0] <= define.line < ball_span[1]:
+                self.balls.append(name)
         self.items.sort()
         self.balls.sort()
 
@@ -252,54 +314,120 @@ class TrainerParser:
         self.natures.clear()
         if not os.path.exists(filepath):
             return
-        pattern = re.compile(r"#define\s+NATURE_([A-Z_]+)\s+\d+")
-        inside = False
-        with open(filepath, encoding="utf-8") as f:
-            for line in f:
-                if "// Pokémon natures" in line:
-                    inside = True
-                    continue
-                elif "// Pokémon stats" in line:
-                    break
-                if inside:
-                    match = pattern.match(line)
-                    if match:
-                        raw = match.group(1)
-                        name = raw.lower().replace("_", " ").title()
-                        self.natures.append(name)
+        scan = self.headers.scan(filepath)
+        span = scan.span("Pokémon natures", "Pokémon stats")
+        if span is None:
+            return      # no section comment: the rest of the header is not natures
+        for define in scan.with_prefix("NATURE_", span):
+            if define.is_numeric:
+                self.natures.append(define.suffix.lower().replace("_", " ").title())
         self.natures.sort()
 
     def load_abilities(self, filepath: str):
         self.abilities.clear()
         if not os.path.exists(filepath):
             return
-        pattern = re.compile(r"#define\s+ABILITY_([A-Z_]+)\s+\d+")
-        with open(filepath, encoding="utf-8") as f:
-            for line in f:
-                match = pattern.match(line)
-                if match:
-                    name = match.group(1).replace("_", " ").title()
-                    self.abilities.append(name)
+        for define in self.headers.scan(filepath).with_prefix("ABILITY_"):
+            if define.is_numeric:
+                self.abilities.append(define.suffix.replace("_", " ").title())
         self.abilities.sort()
 
     def load_tera_types(self, filepath: str):
         self.tera_types.clear()
         if not os.path.exists(filepath):
             return
-        pattern = re.compile(r"#define\s+TYPE_([A-Z_]+)\s+\d+")
-        inside = False
-        with open(filepath, encoding="utf-8") as f:
-            for line in f:
-                if "// Pokémon types" in line:
-                    inside = True
-                    continue
-                elif "// Pokémon egg groups" in line:
-                    break
-                if inside:
-                    match = pattern.match(line)
-                    if match:
-                        raw = match.group(1)
-                        if raw == "NONE":
-                            continue
-                        self.tera_types.append(raw.replace("_", " ").title())
+        scan = self.headers.scan(filepath)
+        span = scan.span("Pokémon types", "Pokémon egg groups")
+        if span is None:
+            return      # without the section, TYPE_MYSTERY, TYPE_MUL_* etc. would slip in
+        for define in scan.with_prefix("TYPE_", span):
+            if define.is_numeric and define.suffix != "NONE":
+                self.tera_types.append(define.suffix.replace("_", " ").title())
         self.tera_types.sort()
+
+
+def format_trainer(tr: Trainer) -> List[str]:
+    """Lines of one trainers.party block, ending with the blank trainer separator."""
+    def stat_line(vals, label):
+        names = ["HP", "Atk", "Def", "SpA", "SpD", "Spe"]
+        parts = [f"{v} {names[i]}" for i, v in enumerate(vals) if v is not None and v != 0]
+        if parts:
+            out.append(f"{label}: " + " / ".join(parts))
+
+    out = [
+        f"=== {tr.id} ===",
+        f"Name: {tr.name}",
+        f"Class: {tr.class_}",
+        f"Pic: {tr.pic}",
+        f"Gender: {tr.gender}",
+        f"Music: {tr.music}",
+        f"Double Battle: {'Yes' if tr.double_battle else 'No'}",
+    ]
+
+    # optional fields
+    if getattr(tr, "mugshot", None) and tr.mugshot not in ("", "None"):
+        out.append(f"Mugshot: {tr.mugshot}")
+
+    if tr.items:
+        good = [i for i in tr.items if i and i != "None"]
+        if good:
+            out.append(f"Items: {' / '.join(good)}")
+
+    if tr.ai_flags and any(tr.ai_flags):
+        out.append(f"AI: {' / '.join(filter(None, tr.ai_flags))}")
+        out.append("")
+    else:
+        out.append("")  # bare en tom linje, ingen "AI:"
+
+    # Pokémon
+    for p in tr.party:
+        # Bestem species-delen
+        if p.nickname:
+            species_part = f"{p.nickname} ({p.species})"
+        else:
+            species_part = p.species
+
+        # Bestem kjønn
+        if p.gender == "M":
+            gender_part = " (M)"
+        elif p.gender == "F":
+            gender_part = " (F)"
+        else:
+            gender_part = ""
+
+        # Bestem item
+        held = f" @ {p.held_item}" if p.held_item and p.held_item != "None" else ""
+
+        # Sett sammen
+        out.append(f"{species_part}{gender_part}{held}")
+
+        out.append(f"Level: {p.level}")
+
+        # ability / nature / etc
+        if p.ability and p.ability != "None":
+            out.append(f"Ability: {p.ability}")
+        if p.nature and p.nature != "None":
+            out.append(f"Nature: {p.nature}")
+        if p.happiness is not None:
+            out.append(f"Happiness: {p.happiness}")
+        if p.ball and p.ball != "None":
+            out.append(f"Ball: {p.ball}")
+        if p.tera_type and p.tera_type != "None":
+            out.append(f"Tera Type: {p.tera_type}")
+        if p.dynamax_level > 0:
+            out.append(f"Dynamax Level: {p.dynamax_level}")
+        if p.is_shiny:
+            out.append("Shiny: Yes")
+        if p.is_gigantamax:
+            out.append("Gigantamax: Yes")
+        # IVs / EVs
+        stat_line(p.ivs, "IVs")
+        stat_line(p.evs, "EVs")
+
+        # moves
+        for m in p.moves:
+            out.append(f"- {m}")
+        out.append("")  # blank line between mons
+
+    out.append("")      # blank line between trainers
+    return out
@@ -0,0 +1,192 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from disk_cache import DiskCache, content_key
+from map_catalogue import read_map_json
+from script_index import scan_text, script_files
+
+# constants that share the prefix but are not trainer IDs
+_NOT_IDS = ("TYPE_", "PIC_", "BACK_PIC_", "CLASS_", "ENCOUNTER_MUSIC_", "PARTY_", r"PARTY\b")
+_TRAINER_RX = re.compile(r"\bTRAINER_(?!" + "|".join(_NOT_IDS) + r")\w+")
+
+# (trainer ID, enclosing label, line)
+Ref = Tuple[str, str, int]
+# (script label, object event number, x, y, trainer_type)
+EventRef = Tuple[str, int, int, int, str]
+Stamp = Tuple[float, int]
+
+
+def _stat(path: str) -> Optional[Stamp]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+@dataclass
+class ObjectUse:
+    map: str
+    number: int         # 1-based object event number in PoryMap
+    x: int
+    y: int
+
+
+@dataclass
+class TrainerUse:
+    trainer: str
+    map: str            # map folder, or "" for shared scripts under data/scripts
+    label: str          # script label the trainer ID appears in
+    path: str
+    line: int
+    objects: List[ObjectUse] = field(default_factory=list)
+
+
+def scan_script_refs(path: str) -> List[Ref]:
+    """Every trainer ID in a script file, tagged with the label it sits under."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    labels = scan_text(text, path, os.path.splitext(path)[1])
+    refs: List[Ref] = []
+    li, current = 0, ""
+    line, pos = 1, 0
+    for m in _TRAINER_RX.finditer(text):
+        line += text.count("\n", pos, m.start())
+        pos = m.start()
+        while li < len(labels) and labels[li].line <= line:
+            current = labels[li].name
+            li += 1
+        refs.append((m.group(0), current, line))
+    return refs
+
+
+def scan_map_events(path: str) -> List[EventRef]:
+    _, events = read_map_json(path)
+    return [(ev.script, i, ev.x, ev.y, ev.trainer_type)
+            for i, ev in enumerate(events, start=1) if ev.script]
+
+
+class TrainerXref:
+    """
+    Which maps, script labels and object events use each TRAINER_* ID.
+
+    Script files (see :func:`script_index.script_files`) are scanned for
+    trainer IDs under their labels, and every map.json for the object events
+    that run those labels. Per-file results are stored on disk together with
+    each file's mtime and size. Opening a project again, or refreshing, only
+    rescans files that changed, on a thread pool.
+    """
+
+    _shared: Dict[str, "TrainerXref"] = {}
+
+    def __init__(self, project_folder: str):
+        self.project_folder = project_folder
+        self._store = DiskCache("xref")
+        # the pattern is part of the key, so changing it drops refs scanned with the old one
+        self._key = content_key(os.path.abspath(project_folder).encode(), _TRAINER_RX.pattern.encode())
+        saved = self._store.get(self._key) or {}
+        self._scripts: Dict[str, Tuple[Stamp, List[Ref]]] = saved.get("scripts", {})
+        self._maps: Dict[str, Tuple[Stamp, List[EventRef]]] = saved.get("maps", {})
+        self._uses: Dict[str, List[TrainerUse]] = {}
+        self._built = False
+
+    @classmethod
+    def for_project(cls, project_folder: str) -> "TrainerXref":
+        key = os.path.abspath(project_folder)
+        xref = cls._shared.get(key)
+        if xref is None:
+            xref = cls._shared[key] = cls(project_folder)
+        xref.refresh()
+        return xref
+
+    # ------------------------------------------------------------------ #
+    def _map_json_files(self) -> List[str]:
+        maps_dir = os.path.join(self.project_folder, "data", "maps")
+        if not os.path.isdir(maps_dir):
+            return []
+        with os.scandir(maps_dir) as it:
+            folders = [e.path for e in it if e.is_dir()]
+        return [p for p in (os.path.join(f, "map.json") for f in folders) if os.path.isfile(p)]
+
+    @staticmethod
+    def _update(table: Dict, paths: List[str], scanner) -> bool:
+        stamps = {p: _stat(p) for p in paths}
+        stamps = {p: s for p, s in stamps.items() if s}
+        changed = False
+        for gone in set(table) - set(stamps):
+            del table[gone]
+            changed = True
+        stale = [p for p, s in stamps.items() if p not in table or table[p][0] != s]
+        if not stale:
+            return changed
+
+        def safe(path):
+            try:
+                return scanner(path)
+            except OSError:
+                return []
+
+        with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+            for path, refs in zip(stale, pool.map(safe, stale)):
+                table[path] = (stamps[path], refs)
+        return True
+
+    def refresh(self) -> None:
+        changed = self._update(self._scripts, script_files(self.project_folder), scan_script_refs)
+        changed |= self._update(self._maps, self._map_json_files(), scan_map_events)
+        if changed or not self._built:
+            self._rebuild()
+        if changed:
+            self._store.put(self._key, {"scripts": self._scripts, "maps": self._maps})
+
+    def _map_of(self, path: str) -> str:
+        maps_dir = os.path.join(self.project_folder, "data", "maps")
+        rel = os.path.relpath(path, maps_dir)
+        return "" if rel.startswith("..") else rel.split(os.sep)[0]
+
+    def _rebuild(self) -> None:
+        objects: Dict[str, List[ObjectUse]] = {}
+        for path, (_, events) in self._maps.items():
+            map_name = self._map_of(path)
+            for label, number, x, y, _trainer_type in events:
+                objects.setdefault(label, []).append(ObjectUse(map_name, number, x, y))
+
+        uses: Dict[str, List[TrainerUse]] = {}
+        for path, (_, refs) in self._scripts.items():
+            map_name = self._map_of(path)
+            for trainer, label, line in refs:
+                uses.setdefault(trainer, []).append(
+                    TrainerUse(trainer, map_name, label, path, line, objects.get(label, []))
+                )
+        for entries in uses.values():
+            entries.sort(key=lambda u: (u.map, u.path, u.line))
+        self._uses = uses
+        self._built = True
+
+    # ------------------------------------------------------------------ #
+    def uses(self, trainer_id: str) -> List[TrainerUse]:
+        return list(self._uses.get(trainer_id, ()))
+
+    def referenced(self) -> set:
+        return set(self._uses)
+
+    def orphans(self, defined: Iterable[str]) -> List[str]:
+        """Trainer IDs from *defined* that no script references (TRAINER_NONE excluded)."""
+        return [t for t in defined if t != "TRAINER_NONE" and t not in self._uses]
+
+    def maps_using(self, trainer_id: str) -> List[str]:
+        return sorted({u.map for u in self._uses.get(trainer_id, ()) if u.map})
+
+
+def describe_uses(uses: List[TrainerUse], limit: Optional[int] = None) -> List[str]:
+    """One line per use, e.g. ``Route104 · Route104_EventScript_Ivan (object 3 at 12,7)``."""
+    lines = []
+    for use in uses[:limit]:
+        where = use.map or os.path.basename(use.path)
+        objs = ", ".join(f"object {o.number} at {o.x},{o.y}" for o in use.objects if o.map == use.map)
+        label = use.label or f"line {use.line}"
+        lines.append(f"{where} · {label}" + (f" ({objs})" if objs else ""))
+    return lines
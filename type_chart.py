@@ -0,0 +1,270 @@
+"""
+Type effectiveness as a NumPy matrix, and party type coverage for the whole
+roster in one batched pass.
+
+The chart is read from the project's battle source:
+
+* the expansion's ``[NUMBER_OF_MON_TYPES][NUMBER_OF_MON_TYPES]`` table of
+  ``X(0.5)`` / ``______`` entries (rows and columns in type ID order), or
+* vanilla pokeemerald's ``gTypeEffectiveness`` list of
+  ``TYPE_ATK, TYPE_DEF, TYPE_MUL_*`` triplets.
+
+If neither is found the standard Gen 6+ chart is used. ``matrix[a, d]`` is
+the multiplier of attacking type *a* against defending type *d*.
+"""
+import glob
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from species_data import SpeciesTable, active_lines
+
+CHART_SOURCES = (
+    "src/data/types_info.h",
+    "src/data/type_effectiveness.h",
+    "src/battle_util.c",
+    "src/battle_main.c",
+)
+# types that never appear on a species or a damaging move
+NON_BATTLE_TYPES = {"TYPE_NONE", "TYPE_MYSTERY", "TYPE_STELLAR"}
+TYPE_MULTIPLIERS = {
+    "TYPE_MUL_NO_EFFECT": 0.0,
+    "TYPE_MUL_NOT_EFFECTIVE": 0.5,
+    "TYPE_MUL_NORMAL": 1.0,
+    "TYPE_MUL_SUPER_EFFECTIVE": 2.0,
+}
+
+_MATRIX_RX = re.compile(r"TypeEffectiveness\w*\s*\[[^\]]*\]\s*\[[^\]]*\]\s*=")
+_TRIPLET_RX = re.compile(r"\bgTypeEffectiveness\s*\[[^\]]*\]\s*=")
+_ROW_RX = re.compile(r"\{([^{}]*)\}")
+_NUMBER_RX = re.compile(r"\d+(?:\.\d+)?")
+
+# attacker: (super effective against, not very effective against, no effect on)
+_STANDARD = {
+    "NORMAL": ((), ("ROCK", "STEEL"), ("GHOST",)),
+    "FIGHTING": (("NORMAL", "ROCK", "STEEL", "ICE", "DARK"),
+                 ("FLYING", "POISON", "BUG", "PSYCHIC", "FAIRY"), ("GHOST",)),
+    "FLYING": (("FIGHTING", "BUG", "GRASS"), ("ROCK", "STEEL", "ELECTRIC"), ()),
+    "POISON": (("GRASS", "FAIRY"), ("POISON", "GROUND", "ROCK", "GHOST"), ("STEEL",)),
+    "GROUND": (("POISON", "ROCK", "STEEL", "FIRE", "ELECTRIC"), ("BUG", "GRASS"), ("FLYING",)),
+    "ROCK": (("FLYING", "BUG", "FIRE", "ICE"), ("FIGHTING", "GROUND", "STEEL"), ()),
+    "BUG": (("GRASS", "PSYCHIC", "DARK"),
+            ("FIGHTING", "FLYING", "POISON", "GHOST", "STEEL", "FIRE", "FAIRY"), ()),
+    "GHOST": (("GHOST", "PSYCHIC"), ("DARK",), ("NORMAL",)),
+    "STEEL": (("ROCK", "ICE", "FAIRY"), ("STEEL", "FIRE", "WATER", "ELECTRIC"), ()),
+    "FIRE": (("BUG", "STEEL", "GRASS", "ICE"), ("ROCK", "FIRE", "WATER", "DRAGON"), ()),
+    "WATER": (("GROUND", "ROCK", "FIRE"), ("WATER", "GRASS", "DRAGON"), ()),
+    "GRASS": (("GROUND", "ROCK", "WATER"),
+              ("FLYING", "POISON", "BUG", "STEEL", "FIRE", "GRASS", "DRAGON"), ()),
+    "ELECTRIC": (("FLYING", "WATER"), ("GRASS", "ELECTRIC", "DRAGON"), ("GROUND",)),
+    "PSYCHIC": (("FIGHTING", "POISON"), ("STEEL", "PSYCHIC"), ("DARK",)),
+    "ICE": (("FLYING", "GROUND", "GRASS", "DRAGON"), ("STEEL", "FIRE", "WATER", "ICE"), ()),
+    "DRAGON": (("DRAGON",), ("STEEL",), ("FAIRY",)),
+    "DARK": (("GHOST", "PSYCHIC"), ("FIGHTING", "DARK", "FAIRY"), ()),
+    "FAIRY": (("FIGHTING", "DRAGON", "DARK"), ("POISON", "STEEL", "FIRE"), ()),
+}
+
+
+def type_label(name: str) -> str:
+    return name[len("TYPE_"):].replace("_", " ").title() if name.startswith("TYPE_") else name
+
+
+@dataclass
+class TypeChart:
+    names: List[str]            # TYPE_* constants, one per row/column
+    matrix: np.ndarray          # (types, types) float32, attacker x defender
+    source: str = "built-in"
+
+    def __post_init__(self):
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+
+    @property
+    def battle_types(self) -> List[int]:
+        return [i for i, n in enumerate(self.names) if n not in NON_BATTLE_TYPES]
+
+    def multiplier(self, attacker: str, defender: Iterable[str]) -> float:
+        a = self.index[attacker]
+        result = 1.0
+        for d in dict.fromkeys(defender):
+            result *= float(self.matrix[a, self.index[d]])
+        return result
+
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def standard(cls) -> "TypeChart":
+        names = ["TYPE_" + t for t in _STANDARD]
+        chart = cls(names, np.ones((len(names), len(names)), np.float32))
+        for attacker, groups in _STANDARD.items():
+            a = chart.index["TYPE_" + attacker]
+            for value, defenders in zip((2.0, 0.5, 0.0), groups):
+                for d in defenders:
+                    chart.matrix[a, chart.index["TYPE_" + d]] = value
+        return chart
+
+    @classmethod
+    def load(cls, project_root: str, type_ids: Dict[str, int]) -> "TypeChart":
+        """
+        Chart from the project's source. *type_ids* maps TYPE_* constants to
+        their numeric values (include/constants/pokemon.h).
+        """
+        ordered = [n for n, v in sorted(type_ids.items(), key=lambda kv: kv[1])
+                   if not n.startswith(("TYPE_MUL_", "NUMBER_OF"))]
+        paths = [os.path.join(project_root, p) for p in CHART_SOURCES]
+        paths += glob.glob(os.path.join(project_root, "src", "data", "*type*.h"))
+        for path in dict.fromkeys(paths):
+            if not os.path.isfile(path):
+                continue
+            chart = _parse_matrix(path, ordered) or _parse_triplets(path)
+            if chart is not None:
+                return chart
+        return cls.standard()
+
+
+def _parse_matrix(path: str, ordered: List[str]) -> Optional[TypeChart]:
+    lines = active_lines(path)
+    for line in lines:
+        if _MATRIX_RX.search(line):
+            break
+    else:
+        return None
+    rows: List[Tuple[Optional[str], List[float]]] = []
+    for line in lines:
+        if line.startswith("};"):
+            break
+        designator = re.match(r"\[(TYPE_\w+)\]", line)
+        m = _ROW_RX.search(line)
+        if m is None:
+            continue
+        values = []
+        for token in m.group(1).split(","):
+            token = token.strip()
+            if not token:
+                continue
+            number = _NUMBER_RX.search(token.replace("4_12", ""))
+            values.append(float(number.group(0)) if number else 1.0)
+        rows.append((designator.group(1) if designator else None, values))
+    if not rows:
+        return None
+    size = max(len(rows), max(len(v) for _, v in rows))
+    names = ordered[:size] + [f"TYPE_{i}" for i in range(len(ordered), size)]
+    matrix = np.ones((size, size), np.float32)
+    for i, (designator, values) in enumerate(rows):
+        row = names.index(designator) if designator in names else i
+        matrix[row, :len(values)] = values[:size]
+    return TypeChart(names, matrix, path)
+
+
+def _parse_triplets(path: str) -> Optional[TypeChart]:
+    lines = active_lines(path)
+    for line in lines:
+        if _TRIPLET_RX.search(line):
+            break
+    else:
+        return None
+    tokens: List[str] = []
+    for line in lines:
+        if line.startswith("};"):
+            break
+        tokens += re.findall(r"\bTYPE_\w+", line)
+    triplets = [tuple(tokens[i:i + 3]) for i in range(0, len(tokens) - 2, 3)]
+    triplets = [t for t in triplets if t[0] not in ("TYPE_FORESIGHT", "TYPE_ENDTABLE")]
+    names = list(TypeChart.standard().names)
+    for attacker, defender, _ in triplets:
+        names += [t for t in (attacker, defender) if t not in names]
+    matrix = np.ones((len(names), len(names)), np.float32)
+    index = {n: i for i, n in enumerate(names)}
+    for attacker, defender, mul in triplets:
+        matrix[index[attacker], index[defender]] = TYPE_MULTIPLIERS.get(mul, 1.0)
+    return TypeChart(names, matrix, path)
+
+
+# ─────────────────────────────── coverage ─────────────────────────────
+def defensive_multipliers(chart: TypeChart, type_codes: np.ndarray) -> np.ndarray:
+    """``(mons, 2)`` chart codes -> ``(mons, types)`` damage taken from each attacking type."""
+    first = chart.matrix[:, type_codes[:, 0]].T
+    second = chart.matrix[:, type_codes[:, 1]].T
+    mono = (type_codes[:, 0] == type_codes[:, 1])[:, None]
+    return first * np.where(mono, 1.0, second)
+
+
+@dataclass
+class RosterCoverage:
+    """Per-party counts; rows follow ``trainers``, columns follow ``chart.names``."""
+    chart: TypeChart
+    trainers: List[str]
+    sizes: np.ndarray           # party members with known species
+    weak: np.ndarray            # (parties, types) members taking > 1x
+    resist: np.ndarray          # (parties, types) members taking < 1x
+    super_effective: np.ndarray  # (parties, types) party STAB types hitting each type for > 1x
+
+    def shared_weaknesses(self, i: int, share: float = 0.5) -> List[Tuple[str, int]]:
+        """Attacking types that more than *share* of party *i* is weak to, worst first."""
+        if not self.sizes[i]:
+            return []
+        cols = [c for c in self.chart.battle_types
+                if self.weak[i, c] > share * self.sizes[i] and self.weak[i, c] > self.resist[i, c]]
+        cols.sort(key=lambda c: -self.weak[i, c])
+        return [(self.chart.names[c], int(self.weak[i, c])) for c in cols]
+
+    def uncovered(self, i: int) -> List[str]:
+        """Defending types none of party *i*'s STAB types hits super-effectively."""
+        if not self.sizes[i]:
+            return []
+        return [self.chart.names[c] for c in self.chart.battle_types if self.super_effective[i, c] == 0]
+
+
+def roster_coverage(
+    trainers: List,
+    table: SpeciesTable,
+    chart: TypeChart,
+    attack_types: Optional[np.ndarray] = None,
+) -> RosterCoverage:
+    """
+    Coverage for every party in one call.
+
+    Defence: each party member's row of :func:`defensive_multipliers`,
+    summed per party. Offence: the ``(parties, types)`` incidence of
+    attacking types times the ``(types, types)`` super-effective matrix.
+    By default the attacking types are the members' own types (STAB). Pass
+    *attack_types* (a boolean ``(parties, types)`` array) to use move types instead.
+    """
+    to_chart = np.array([chart.index.get(n, -1) for n in table.type_names] or [-1], np.int64)
+    lookup: Dict[str, int] = {}
+    rows: List[int] = []
+    sizes = np.zeros(len(trainers), np.int64)
+    for p, trainer in enumerate(trainers):
+        for mon in trainer.party:
+            if mon.species not in lookup:
+                constant = table.species_for(mon.species) if mon.species else None
+                lookup[mon.species] = table.row(constant) if constant else -1
+            row = lookup[mon.species]
+            if row >= 0 and (to_chart[table.types[row]] >= 0).all():
+                rows.append(row)
+                sizes[p] += 1
+
+    n_types = len(chart.names)
+    codes = to_chart[table.types[np.array(rows, np.int64)]] if rows else np.zeros((0, 2), np.int64)
+    taken = defensive_multipliers(chart, codes)
+    starts = np.cumsum(sizes) - sizes
+    filled = sizes > 0
+
+    def per_party(values: np.ndarray) -> np.ndarray:
+        out = np.zeros((len(trainers), n_types), values.dtype)
+        if len(values):
+            out[filled] = np.add.reduceat(values, starts[filled], axis=0)
+        return out
+
+    weak = per_party((taken > 1).astype(np.int64))
+    resist = per_party((taken < 1).astype(np.int64))
+    if attack_types is None:
+        stab = np.zeros((len(rows), n_types), np.int64)
+        if len(rows):
+            stab[np.arange(len(rows)), codes[:, 0]] = 1
+            stab[np.arange(len(rows)), codes[:, 1]] = 1
+        attack_types = per_party(stab) > 0
+    super_effective = attack_types.astype(np.float32) @ (chart.matrix > 1).astype(np.float32)
+    return RosterCoverage(chart, [t.id for t in trainers], sizes, weak, resist,
+                          super_effective.astype(np.int64))